@@ -0,0 +1,445 @@
+"""
+Columnar DictSet
+
+The dictset functions are generators over dictionaries, so each query over a
+dataset pays the cost of the interpreter visiting every record. Where the
+same data is queried repeatedly (e.g. a day of data loaded once and queried
+many times) it is faster to load the data into columns and apply each
+operation to a whole column at a time.
+
+ColumnarDictSet holds each column as a NumPy array, strings are dictionary
+encoded (each distinct string is held once, in sorted order, and the column
+holds the position of the string in the dictionary) and nulls are held in a
+separate mask. Columns of integers, floats (integers mixed with floats are
+held as floats), booleans and strings are held in arrays, other values (e.g.
+dates, lists) are held as Python objects and operations on them fall back to
+Python.
+
+Operations return a new ColumnarDictSet so they can be chained:
+
+    day = ColumnarDictSet(reader)
+    errors = day.filter('level', '==', 'ERROR').select(['host', 'duration'])
+    slowest = errors.group_aggregate('host', {'duration': 'max'}).sort('max_duration', descending=True)
+    records = slowest.to_records()
+
+Records with missing fields are returned with the fields set to None.
+"""
+import operator
+import numpy  # type:ignore
+from typing import Iterable, Iterator, List, Union, Dict, Any, Optional
+from .internals import Accumulators
+
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge}
+
+
+class _Column():
+    """
+    A column of values, 'values' is the array of values (or dictionary
+    positions for strings), 'valid' is None or a mask which is False for nulls.
+    """
+    __slots__ = ('values', 'valid', 'dictionary')
+
+    def __init__(self, values, valid=None, dictionary=None):
+        self.values = values
+        self.valid = valid
+        self.dictionary = dictionary
+
+    @classmethod
+    def from_values(cls, values: list):
+        valid = numpy.array([value is not None for value in values], dtype=bool)
+        types = {type(value) for value in values if value is not None}
+        if valid.all():
+            valid = None  # type:ignore
+
+        if types == {str}:
+            present = [value for value in values if value is not None]
+            dictionary, positions = numpy.unique(numpy.array(present, dtype=str), return_inverse=True)
+            codes = numpy.full(len(values), -1, dtype=numpy.int64)
+            codes[valid if valid is not None else slice(None)] = positions.reshape(-1)
+            return cls(codes, valid, dictionary)
+
+        dtype: Any = object
+        fill: Any = None
+        if types == {bool}:
+            dtype, fill = bool, False
+        elif types == {int}:
+            dtype, fill = numpy.int64, 0
+        elif types and types <= {int, float}:
+            dtype, fill = numpy.float64, 0.0
+        if dtype is not object:
+            try:
+                filled = values if valid is None else [fill if value is None else value for value in values]
+                return cls(numpy.array(filled, dtype=dtype), valid)
+            except OverflowError:
+                # integers too large for the array are held as objects
+                pass
+
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+        return cls(array, valid)
+
+    @property
+    def encoded(self) -> bool:
+        return self.dictionary is not None
+
+    @property
+    def numeric(self) -> bool:
+        return not self.encoded and self.values.dtype.kind in 'bif'
+
+    def valid_mask(self):
+        if self.valid is None:
+            return numpy.ones(len(self.values), dtype=bool)
+        return self.valid
+
+    def take(self, indices):
+        valid = None if self.valid is None else self.valid[indices]
+        return _Column(self.values[indices], valid, self.dictionary)
+
+    def to_list(self) -> list:
+        if self.encoded:
+            # position -1 (null) selects the None on the end of the dictionary
+            lookup = numpy.append(self.dictionary.astype(object), [None])
+            return lookup[self.values].tolist()
+        if self.valid is None:
+            return self.values.tolist()
+        values = self.values.astype(object)
+        values[~self.valid] = None
+        return values.tolist()
+
+    def codes(self):
+        """
+        Integers which are the same for equal values, used to group values,
+        nulls are -1.
+        """
+        if self.encoded:
+            return self.values
+        valid = self.valid_mask()
+        codes = numpy.full(len(self.values), -1, dtype=numpy.int64)
+        if self.numeric:
+            codes[valid] = numpy.unique(self.values[valid], return_inverse=True)[1].reshape(-1)
+            return codes
+        positions: dict = {}
+        codes[valid] = [positions.setdefault(value, len(positions)) for value in self.values[valid]]
+        return codes
+
+    def ranks(self):
+        """
+        Numbers in the same order as the values, used to sort values.
+        """
+        if self.encoded:
+            return self.values
+        if self.numeric:
+            return self.values.astype(numpy.float64 if self.values.dtype.kind == 'f' else numpy.int64)
+        valid = self.valid_mask()
+        ranks = numpy.zeros(len(self.values), dtype=numpy.int64)
+        present = self.values[valid]
+        ordered = {value: rank for rank, value in enumerate(sorted(set(present)))}
+        ranks[valid] = [ordered[value] for value in present]
+        return ranks
+
+    def compare(self, comparison: str, value: Any):
+        """
+        Compare each value in the column, nulls never match.
+        """
+        if comparison == 'in':
+            values = list(value)
+            if self.encoded:
+                matches = numpy.isin(self.dictionary, [v for v in values if isinstance(v, str)])
+            elif self.numeric:
+                matches = numpy.isin(self.values, [v for v in values if isinstance(v, (int, float))])
+            else:
+                matches = numpy.array([item is not None and item in values for item in self.values], dtype=bool)
+        else:
+            function = COMPARISONS.get(comparison)
+            if function is None:
+                raise ValueError(F"ColumnarDictSet: unknown operator '{comparison}', must be one of {', '.join(COMPARISONS)} or in")
+            if value is None:
+                return numpy.zeros(len(self.values), dtype=bool)
+            if self.encoded:
+                matches = numpy.asarray(function(self.dictionary, value), dtype=bool)
+            elif self.numeric:
+                matches = numpy.asarray(function(self.values, value), dtype=bool)
+            else:
+                matches = numpy.array([item is not None and function(item, value) for item in self.values], dtype=bool)
+
+        if self.encoded:
+            # the comparison was made with the dictionary, look up each value,
+            # position -1 (null) selects the False on the end
+            return numpy.append(matches, False)[self.values]
+        if self.valid is not None:
+            matches = matches & self.valid
+        return matches
+
+
+class ColumnarDictSet():
+
+    def __init__(
+            self,
+            dictset: Iterable[dict] = []):
+        """
+        Load a dictset into columns.
+
+        Parameters:
+            dictset: iterable of dictionaries
+                The dictset to load
+        """
+        columns: Dict[str, list] = {}
+        count = 0
+        for record in dictset:
+            for key in record:
+                if key not in columns:
+                    columns[key] = [None] * count
+            for key, values in columns.items():
+                values.append(record.get(key))
+            count += 1
+        self.count = count
+        self.columns = {name: _Column.from_values(values) for name, values in columns.items()}
+
+    @classmethod
+    def _from_columns(cls, columns: Dict[str, _Column], count: int):
+        dataset = cls.__new__(cls)
+        dataset.columns = columns
+        dataset.count = count
+        return dataset
+
+    def _take(self, indices):
+        indices = numpy.asarray(indices)
+        count = int(indices.sum()) if indices.dtype == bool else len(indices)
+        return ColumnarDictSet._from_columns(
+                {name: column.take(indices) for name, column in self.columns.items()},
+                count)
+
+    def _column(self, name: str) -> _Column:
+        column = self.columns.get(name)
+        if column is None:
+            raise ValueError(F"ColumnarDictSet: unknown column '{name}'")
+        return column
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self) -> Iterator[dict]:
+        names = list(self.columns)
+        for values in zip(*[column.to_list() for column in self.columns.values()]):
+            yield dict(zip(names, values))
+
+    def to_records(self) -> List[dict]:
+        """
+        Convert the columns back to a list of dictionaries.
+        """
+        return list(iter(self))
+
+    def select(
+            self,
+            columns: Union[str, List[str]]):
+        """
+        Select a subset of the columns, the columns aren't copied.
+
+        Parameters:
+            columns: string or list of strings
+                The columns to select
+
+        Returns:
+            ColumnarDictSet
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        return ColumnarDictSet._from_columns({name: self._column(name) for name in columns}, self.count)
+
+    def filter(
+            self,
+            column: str,
+            comparison: str,
+            value: Any):
+        """
+        Select the records where the column matches the comparison, records
+        where the column is null don't match.
+
+        Parameters:
+            column: string
+                The column to compare
+            comparison: string
+                The comparison, one of ==, !=, <, <=, >, >= or in
+            value: any
+                The value to compare to, for 'in' a collection of values
+
+        Returns:
+            ColumnarDictSet
+        """
+        return self._take(self._column(column).compare(comparison, value))
+
+    def limit(
+            self,
+            limit: int):
+        """
+        Select up to the first limit records.
+
+        Returns:
+            ColumnarDictSet
+        """
+        return self._take(numpy.arange(min(max(limit, 0), self.count)))
+
+    def sort(
+            self,
+            columns: Union[str, List[str]],
+            descending: Union[bool, List[bool]] = False,
+            nulls_first: bool = False):
+        """
+        Order the records by one or more columns, the sort is stable.
+
+        Parameters:
+            columns: string or list of strings
+                The column, or columns, to sort by
+            descending: boolean or list of booleans (optional)
+                The direction to sort each column, the default is ascending
+            nulls_first: boolean (optional)
+                Place nulls before other values, the default is to place them
+                after other values
+
+        Returns:
+            ColumnarDictSet
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        if isinstance(descending, bool):
+            descending = [descending] * len(columns)
+        if len(descending) != len(columns):
+            raise ValueError('sort: a direction is needed for each column')
+
+        # lexsort sorts by the last key first, each column is sorted by
+        # whether it is null and then by its value
+        keys = []
+        for name, reverse in reversed(list(zip(columns, descending))):
+            column = self._column(name)
+            ranks = column.ranks()
+            if reverse:
+                ranks = -ranks
+            nulls = ~column.valid_mask()
+            if column.valid is not None:
+                ranks = numpy.where(nulls, 0, ranks)
+            keys.append(ranks)
+            keys.append(~nulls if nulls_first else nulls)
+        return self._take(numpy.lexsort(keys))
+
+    def group_aggregate(
+            self,
+            by: Union[str, List[str]],
+            aggs: dict):
+        """
+        Aggregate the records by the values in one or more columns.
+
+        Parameters:
+            by: string or list of strings
+                The column, or columns, to group by
+            aggs: dictionary
+                The aggregations to perform on each column, as for
+                dictset.aggregate, e.g. {'*': 'count', 'value': ['min', 'max']}
+
+        Returns:
+            ColumnarDictSet
+                A record for each group, ordered by the group by columns, with
+                the aggregations named {aggregation}_{column} (e.g. 'max_value')
+        """
+        if isinstance(by, str):
+            by = [by]
+        accumulators = Accumulators(aggs)
+        group_columns = [self._column(name) for name in by]
+
+        if self.count == 0:
+            empty = _Column.from_values([])
+            return ColumnarDictSet._from_columns({name: empty for name in by + accumulators.names}, 0)
+
+        group_ids, groups = self._group_ids(group_columns)
+
+        # the group by values are taken from the first record in each group
+        first = numpy.full(groups, self.count, dtype=numpy.int64)
+        numpy.minimum.at(first, group_ids, numpy.arange(self.count))
+        results: Dict[str, _Column] = {name: column.take(first) for name, column in zip(by, group_columns)}
+
+        for name, (column_name, aggregation) in zip(accumulators.names, accumulators.plan):
+            if column_name == '*':
+                values = numpy.bincount(group_ids, minlength=groups).tolist()
+            else:
+                values = self._aggregate(self._column(column_name), column_name, aggregation, group_ids, groups)
+            results[name] = _Column.from_values(values)
+        return ColumnarDictSet._from_columns(results, groups)
+
+    def _group_ids(self, group_columns: List[_Column]):
+        # the codes of the columns are combined into a single integer, the
+        # first column is the most significant so the groups are in order
+        keys = numpy.zeros(self.count, dtype=numpy.int64)
+        size = 1
+        for column in group_columns:
+            codes = column.codes() + 1  # nulls (-1) become 0
+            radix = int(codes.max()) + 1
+            size *= radix
+            if size >= 2 ** 62:
+                # too many combinations for an integer, group on the codes
+                codes = numpy.stack([column.codes() for column in group_columns], axis=1)
+                unique, group_ids = numpy.unique(codes, axis=0, return_inverse=True)
+                return group_ids.reshape(-1), len(unique)
+            keys = keys * radix + codes
+
+        if size <= 4 * self.count:
+            # number the keys which are present without sorting them
+            present = numpy.bincount(keys, minlength=size) > 0
+            positions = numpy.cumsum(present) - 1
+            return positions[keys], int(present.sum())
+        unique, group_ids = numpy.unique(keys, return_inverse=True)
+        return group_ids.reshape(-1), len(unique)
+
+    def _aggregate(
+            self,
+            column: _Column,
+            column_name: str,
+            aggregation: str,
+            group_ids,
+            groups: int) -> list:
+
+        if not column.numeric and not (column.encoded and aggregation in ('count', 'min', 'max')):
+            # aggregate values which aren't in arrays with the accumulators
+            accumulators = Accumulators({column_name: aggregation})
+            states = [accumulators.new() for group in range(groups)]
+            for group, value in zip(group_ids.tolist(), column.to_list()):
+                accumulators.update(states[group], {column_name: value})
+            return [accumulators.result(state)[accumulators.names[0]] for state in states]
+
+        valid = column.valid_mask()
+        ids = group_ids[valid]
+        counts = numpy.bincount(ids, minlength=groups)
+        if aggregation == 'count':
+            return counts.tolist()
+
+        values = column.values[valid]
+        result: Optional[Any] = None
+        if column.values.dtype.kind == 'b':
+            values = values.astype(numpy.int64)
+        if aggregation in ('sum', 'mean'):
+            result = numpy.zeros(groups, dtype=values.dtype)
+            numpy.add.at(result, ids, values)
+            if aggregation == 'mean':
+                result = result / numpy.maximum(counts, 1)
+        elif aggregation == 'min':
+            result = numpy.full(groups, values.max() if len(values) else 0, dtype=values.dtype)
+            numpy.minimum.at(result, ids, values)
+        else:
+            result = numpy.full(groups, values.min() if len(values) else 0, dtype=values.dtype)
+            numpy.maximum.at(result, ids, values)
+
+        if column.encoded:
+            result = numpy.append(column.dictionary.astype(object), [None])[numpy.where(counts > 0, result, -1)]
+        elif column.values.dtype.kind == 'b' and aggregation in ('min', 'max'):
+            result = result.astype(bool)
+        output = result.tolist()
+        # groups without values have a null result
+        return [value if count else None for value, count in zip(output, counts.tolist())]
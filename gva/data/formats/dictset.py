@@ -13,14 +13,25 @@ iterate again they need to be regenerated. If you know you're going
 to need to iterate more than once, you can use list() or similar to cache the
 values, however this may cause problems if the list is large.
 """
-from typing import Iterator, Any, List, Callable
+import os
+import heapq
+import random
+from typing import Iterator, Any, List, Callable, Union, Optional
 from ...utils.json import serialize, parse
 from .group_by import Groups
+from .internals import sort_key, SpillFile, merge_runs, distinct_records, aggregate_records
+from .internals import JOIN_TYPES, hash_join, merge_join
+from .internals import Reservoir, reservoir_sample
+from .internals import fixed_windows, session_windows, to_seconds
+from .internals import parallel_chunks
+from .internals import partition_records
 
 
 class JOINS(object):
     INNER_JOIN = 'INNER'
     LEFT_JOIN = 'LEFT'
+    RIGHT_JOIN = 'RIGHT'
+    FULL_JOIN = 'FULL'
 
 
 def select_record_fields(
@@ -60,39 +71,66 @@ def order(
 def join(
         left: Iterator[dict],
         right: Iterator[dict],
-        column: str,
-        join_type=JOINS.INNER_JOIN) -> Iterator[dict]:
+        column: Union[str, List[str]],
+        join_type=JOINS.INNER_JOIN,
+        method: str = 'hash',
+        cache_size: int = 100000) -> Iterator[dict]:
     """
-    Iterates over the left dictset, matching records fron the right dictset. 
-    Dictsets provided to this method are expected to be bounded.
+    Iterates over the left dictset, matching records fron the right dictset.
+    Every pair of matching records is returned, so a left record which
+    matches three right records is returned three times. Records with a null
+    in any of the join columns don't match any records.
 
     INNER_JOIN, the default, will discard records unless they appear in both
     tables, LEFT_JOIN will keep all the records fron the left table and add
-    records for the right table if a match is found.
+    records for the right table if a match is found, RIGHT_JOIN will keep all
+    of the records from the right table and FULL_JOIN will keep all of the
+    records from both tables.
+
+    The 'hash' method loads the right table into memory to perform the
+    matching, so it is recommended that the left table be the larger of the
+    two tables. If the right table has more than cache_size records both
+    tables are partitioned to disk and the partitions are joined in turn, the
+    records are then not returned in the order of the left table.
 
-    It is recommended that the left table be the larger of the two tables as
-    the right table is loaded into memory to perform the matching and look ups.
+    The 'merge' method expects both tables to be sorted, ascending, by the
+    join columns (e.g. by sort(descending=False)), the tables are read
+    together so only the records for one key are held in memory and
+    unbounded dictsets can be joined.
 
     Parameters:
         left: iterable of dictionaries 
             The 'left' dictset
         right: iterable of dictionaries
             The 'right' dictset
-        column: string
-            The name of column shared by both dictsets to join on
+        column: string or list of strings
+            The name of the column, or columns, shared by both dictsets to
+            join on
         join_type: dictset.JOINS (optional, default INNER_JOIN)
-            The type of join, INNER or LEFT
+            The type of join, INNER, LEFT, RIGHT or FULL
+        method: string (optional, default 'hash')
+            The join algorithm, 'hash' or 'merge'
+        cache_size: integer (optional, default 100,000)
+            The number of records from the right dictset to hold in memory
+            for the 'hash' method
 
     Yields:
         dictionary
+
+    Raises:
+        ValueError
+            The join_type or method is not known, or for the 'merge' method,
+            a dictset is found not to be sorted as it is read
     """
-    index = create_index(right, column)
-    for record in left:
-        value = record.get(column)
-        if index.get(value):
-            yield {**record, **index[value]}
-        elif join_type == JOINS.LEFT_JOIN:
-            yield record
+    if join_type not in JOIN_TYPES:
+        raise ValueError(F"join: unknown join_type '{join_type}', must be one of {', '.join(JOIN_TYPES)}")
+    columns = [column] if isinstance(column, str) else list(column)
+    if method == 'hash':
+        yield from hash_join(left, right, columns, join_type, max(cache_size, 1))
+    elif method == 'merge':
+        yield from merge_join(left, right, columns, join_type)
+    else:
+        raise ValueError(F"join: unknown method '{method}', must be 'hash' or 'merge'")
 
 
 def union(*args) -> Iterator[dict]:
@@ -187,6 +225,136 @@ def set_column(
         yield set_value(record, column_name, setter)
 
 
+class _MapChunk():
+    # applies the function to a chunk of records in the worker processes
+    __slots__ = ('function', 'column_name')
+
+    def __init__(self, function, column_name):
+        self.function = function
+        self.column_name = column_name
+
+    def __call__(self, chunk):
+        if self.column_name is None:
+            return [self.function(record) for record in chunk]
+        return [set_value(record, self.column_name, self.function) for record in chunk]
+
+
+class _FilterChunk():
+    __slots__ = ('function',)
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, chunk):
+        return [record for record in chunk if self.function(record)]
+
+
+def parallel_map(
+        dictset: Iterator[dict],
+        function: Callable,
+        workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        ordered: bool = True,
+        column_name: Optional[str] = None) -> Iterator[Any]:
+    """
+    Apply a function to each record using a pool of processes, for functions
+    which are CPU intensive. Records are sent to the processes in chunks as
+    the dictset is read and the results are returned as they are ready.
+
+    With a column_name this is a parallel set_column, the result of the
+    function is set in that column of a copy of the record, otherwise the
+    results of the function are returned.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to process
+        function: callable
+            The function to apply to each record, the records and the results
+            must be picklable, the function also needs to be picklable where
+            forking isn't available (e.g. Windows)
+        workers: integer (optional)
+            The number of processes, the default is the number of CPUs, 1
+            doesn't start any processes
+        chunk_size: integer (optional, default 1000)
+            The number of records sent to a process at a time
+        ordered: boolean (optional, default True)
+            Return the results in the order of the records, otherwise the
+            results are returned as soon as each chunk is complete
+        column_name: string (optional)
+            The column to set to the result of the function
+
+    Yields:
+        dictionary (any if column_name isn't set)
+    """
+    workers = workers or os.cpu_count() or 1
+    yield from parallel_chunks(dictset, _MapChunk(function, column_name), workers, chunk_size, ordered)
+
+
+def parallel_filter(
+        dictset: Iterator[dict],
+        function: Callable,
+        workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        ordered: bool = True) -> Iterator[dict]:
+    """
+    Filter the records using a pool of processes, the records where the
+    function returns True are returned. See parallel_map.
+
+    Yields:
+        dictionary
+    """
+    workers = workers or os.cpu_count() or 1
+    yield from parallel_chunks(dictset, _FilterChunk(function), workers, chunk_size, ordered)
+
+
+def partition_by(
+        dictset: Iterator[dict],
+        column: Union[str, List[str]],
+        n: Optional[int] = None,
+        targets: Optional[list] = None) -> list:
+    """
+    Split a dictset into partitions by the value in one or more columns,
+    records with the same value are always sent to the same partition, in
+    every run. Dictsets partitioned on the same column(s) into the same number
+    of partitions can be joined or aggregated a partition at a time, for
+    example in separate processes.
+
+    Without targets, the partitions are written to temporary files on disk
+    and a dictset for each partition is returned, each can be read once.
+
+    With targets, the records are sent to the targets as they are read, the
+    targets can be queues (e.g. multiprocessing.Queue, records are sent with
+    'put', bounded queues block until there is space), Writers or lists
+    (records are sent with 'append'). The targets aren't closed, and no
+    sentinel is sent to queues, when the dictset has been read.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to partition
+        column: string or list of strings
+            The column, or columns, to partition on
+        n: integer (optional)
+            The number of partitions, required if targets aren't provided
+        targets: list (optional)
+            The queues, Writers or lists to send the partitions to
+
+    Returns:
+        list
+            A dictset for each partition, or where targets are provided, the
+            number of records sent to each target
+    """
+    columns = [column] if isinstance(column, str) else list(column)
+    if targets is not None:
+        if n is not None and n != len(targets):
+            raise ValueError('partition_by: n must be the same as the number of targets')
+        return partition_records(dictset, columns, targets)
+    if not n or n < 1:
+        raise ValueError('partition_by: n or targets must be provided')
+    spill_files = [SpillFile() for partition in range(n)]
+    partition_records(dictset, columns, [spill_file.write for spill_file in spill_files])
+    return [spill_file.read() for spill_file in spill_files]
+
+
 def set_value(
         record: dict,
         field_name: str,
@@ -216,32 +384,90 @@ def set_value(
 
 def distinct(
         dictset: Iterator[dict],
-        cache_size: int = 10000):
+        cache_size: int = 10000,
+        columns: Optional[List[str]] = None,
+        exact: bool = False) -> Iterator[dict]:
     """
-    THIS MAY NOT DO WHAT YOU EXPECT IT TO.
+    Removes duplicate records from a dictset, the first occurance of each
+    record is kept.
 
-    Removes duplicate records from a dictset, as it able to run against
-    an unbounded (infinite) set, it may not fully deduplicate a set. The
-    larger the cache_size the more likely the duplication will be correct
-    however, this is at the expense of memory.
+    The approximate method (the default) remembers the last cache_size
+    distinct records, so is able to run against an unbounded (infinite) set,
+    but may not fully deduplicate a set.
+
+    The exact method (exact=True) holds a hash of each distinct record seen
+    in memory, records are returned as they are read until cache_size hashes
+    are held, after this, records which haven't been seen are spilled to
+    partitions on disk (by their hash) which are deduplicated separately once
+    the dictset has been read. The records from the partitions are not
+    returned in the order they were read.
 
     Parameters:
         dictset: iterable of dictionaries
             The dictset to process
         cache_size: integer (optional, default 10,000)
             the number of records to cache
+        columns: list of strings (optional)
+            The columns to compare records on, the default is all columns
+        exact: boolean (optional, default False)
+            Use the exact method
 
     Yields:
         dictionary
     """
-    from ...utils import LRU_Index
-    lru = LRU_Index(size=cache_size)
+    def _key(record):
+        if columns:
+            return serialize([record.get(column) for column in columns])
+        return serialize(record)
+
+    if not exact:
+        from ...utils import LRU_Index
+        lru = LRU_Index(size=cache_size)
+        for record in dictset:
+            if lru.test(_key(record)):
+                continue
+            yield record
+        return
+
+    yield from distinct_records(
+            ((record, _key(record)) for record in dictset),
+            max(cache_size, 1))
+
+
+def approx_count_distinct(
+        dictset: Iterator[dict],
+        column: str,
+        precision: int = 12,
+        sketch: Any = None) -> int:
+    """
+    Estimates the number of distinct values in a column using a HyperLogLog
+    sketch, this uses a fixed amount of memory (4Kb at the default
+    precision) regardless of the number of values. Nulls are not counted.
+
+    A sketch can be provided to add the values to, the sketch is updated so
+    it can be saved, or merged with sketches for other dictsets, to estimate
+    the number of distinct values across multiple dictsets.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to process
+        column: string
+            The column to count the distinct values of
+        precision: integer (optional, default 12)
+            The precision of the sketch, higher is more accurate and uses
+            more memory, the standard error is 1.04/sqrt(2^precision)
+        sketch: gva.utils.HyperLogLog (optional)
+            The sketch to add the values to
 
+    Returns:
+        integer
+    """
+    from ...utils import HyperLogLog
+    if sketch is None:
+        sketch = HyperLogLog(precision=precision)
     for record in dictset:
-        entry = serialize(record)
-        if lru.test(entry):
-            continue
-        yield record
+        sketch.add(record.get(column))
+    return sketch.count()
 
 
 def limit(
@@ -267,6 +493,73 @@ def limit(
         yield record
 
 
+def sample(
+        dictset: Iterator[dict],
+        n: int,
+        seed: Any = None) -> Iterator[dict]:
+    """
+    Returns a random sample of up to 'n' records, every record in the dictset
+    has the same chance of being in the sample.
+
+    Unlike limit, which returns the first records, the sample represents the
+    whole dictset, so the dictset is read to the end before the sample is
+    returned, only the sample is held in memory.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to sample
+        n: integer
+            The number of records to sample
+        seed: any (optional)
+            Seed the random number generator to get the same sample each time
+
+    Yields:
+        dictionary
+            The sampled records, in the order they were read
+    """
+    items = reservoir_sample(enumerate(dictset), n, random.Random(seed))  # nosec - sampling isn't security sensitive
+    for index, record in sorted(items, key=lambda item: item[0]):
+        yield record
+
+
+def stratified_sample(
+        dictset: Iterator[dict],
+        column: str,
+        n: int,
+        seed: Any = None) -> Iterator[dict]:
+    """
+    Returns a random sample of up to 'n' records for each value in a column,
+    so values which appear rarely are represented in the sample.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to sample
+        column: string
+            The column to sample each value of
+        n: integer
+            The number of records to sample for each value
+        seed: any (optional)
+            Seed the random number generator to get the same sample each time
+
+    Yields:
+        dictionary
+            The sampled records, in the order they were read
+    """
+    if n <= 0:
+        return
+    rng = random.Random(seed)  # nosec - sampling isn't security sensitive
+    reservoirs: dict = {}
+    for index, record in enumerate(dictset):
+        value = record.get(column)
+        reservoir = reservoirs.get(value)
+        if reservoir is None:
+            reservoir = reservoirs[value] = Reservoir(n, rng)
+        reservoir.offer((index, record))
+    items = [item for reservoir in reservoirs.values() for item in reservoir.items]
+    for index, record in sorted(items, key=lambda item: item[0]):
+        yield record
+
+
 def dictsets_match(
         dictset_1: Iterator[dict],
         dictset_2: Iterator[dict]):
@@ -325,68 +618,106 @@ def page_dictset(
 
 def sort(
         dictset: Iterator[dict],
-        column: str,
+        column: Union[str, List[str]],
         cache_size: int,
-        descending: bool = True):
+        descending: Union[bool, List[bool]] = True,
+        nulls_first: bool = False) -> Iterator[dict]:
     """
-    THIS MAY NOT DO WHAT YOU EXPECT IT TO.
+    Sorts a dictset by one or more columns.
 
-    Sorts a dictset by a column. As it able to run an unbounded dataset it
-    may not correctly order a set completely. The larger the cache_size the
-    more likely the set will be ordered correctly, at the cost of memory.
+    Records are collected into runs of cache_size records, if the dictset is
+    larger than a single run, each run is sorted and spilled to a temporary
+    file and the runs are merged as the records are yielded. This bounds the
+    memory used to approximately cache_size records, the order of the records
+    is the same as using sorted(), including the order of ties.
 
-    This method works best with partially sorted data, for randomized data
-    and a small cache, the effect of sorting is poor; for partially sorted
-    data, and/or a large cache, the performance is better.
-
-    Note that if this method is placed in a pipeline, it will need to process
-    cache_size number of records before it will emit any records.
+    Note that this method needs to read all of the dictset before it will
+    emit any records, so it can't be used on unbounded (streaming) dictsets.
 
     Parameters:
         dictset: iterable of dictionaries
             The dictset to process
-        column: string
-            The field to order by
+        column: string or list of strings
+            The field, or fields, to order by
         cache_size: integer
-            The number of records to cache
-        descending: boolean (optional, True)
-            Reverse the order of the dictset
+            The number of records to hold in memory
+        descending: boolean or list of booleans (optional, True)
+            Reverse the order of the dictset, a list sets the direction of
+            each column
+        nulls_first: boolean (optional, False)
+            Place records with a null (None) value before other records
 
     Yields:
         dictionary
     """
+    key, reverse = sort_key(column, descending, nulls_first)
+    cache_size = max(cache_size, 1)
 
-    def _sort_key(key):
-        """
-        called like this: _sort_key(key)(row)
-        """
-        k = key
+    runs: List[SpillFile] = []
+    cache: List[dict] = []
+    for record in dictset:
+        cache.append(record)
+        if len(cache) >= cache_size:
+            cache.sort(key=key, reverse=reverse)
+            runs.append(SpillFile().write_many(cache))
+            cache = []
+    cache.sort(key=key, reverse=reverse)
+
+    if len(runs) == 0:
+        yield from cache
+        return
+    if cache:
+        runs.append(SpillFile().write_many(cache))
+        cache = []
+    yield from merge_runs(runs, key=key, reverse=reverse)
+
+
+def top_k(
+        dictset: Iterator[dict],
+        column: Union[str, List[str], None],
+        k: int,
+        descending: Union[bool, List[bool]] = True,
+        nulls_first: bool = False,
+        key: Optional[Callable] = None) -> Iterator[dict]:
+    """
+    Returns the first k records of the dictset if it were sorted, e.g. the 10
+    records with the highest score.
 
-        def _inner_sort_key(row):
-            return row.get(k)
+    Only k records are held in memory, in a heap, so this is much faster and
+    uses much less memory than sorting the dictset when k is small. The
+    records, and the order of ties, are the same as sort followed by limit.
 
-        return _inner_sort_key
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to process
+        column: string or list of strings
+            The field, or fields, to order by, None if a key is provided
+        k: integer
+            The number of records to return
+        descending: boolean or list of booleans (optional, True)
+            Return the highest values, a list sets the direction of each
+            column
+        nulls_first: boolean (optional, False)
+            Place records with a null (None) value before other records
+        key: callable (optional)
+            A function which returns the value to order each record by,
+            instead of the column
 
-    # cache_size is the high water mark, 3/4 is the low water mark. 
-    # We fill the cache to the high water mark, sort it and yield 
-    # the top 1/4 before filling again.
-    # This reduces the number of times we execute the sorted function
-    # which is the slowest part of this method.
-    # A cache_size of 1000 has a neglible impact on performance, a 
-    # cache_size of 50000 introduces a performance hit of about 15%.
-    quarter_cache = max(cache_size // 4, 1)
-    cache = []
-    for item in dictset:
-        cache.append(item)
-        if len(cache) > cache_size:
-            cache = sorted(cache, key=_sort_key(column), reverse=descending) 
-            if descending:
-                yield from reversed(cache[:quarter_cache])
-            else:
-                yield from cache[:quarter_cache]
-            del cache[:quarter_cache]
-    cache = sorted(cache, key=_sort_key(column), reverse=descending) 
-    yield from cache
+    Yields:
+        dictionary
+    """
+    if key is not None:
+        if not isinstance(descending, bool):
+            raise ValueError('top_k: descending must be a boolean when a key is provided')
+        reverse = descending
+    else:
+        key, reverse = sort_key(column, descending, nulls_first)  # type:ignore
+    if k <= 0:
+        return
+    if reverse:
+        yield from heapq.nlargest(k, dictset, key=key)
+    else:
+        yield from heapq.nsmallest(k, dictset, key=key)
 
 
 def to_pandas(
@@ -405,6 +736,23 @@ def to_pandas(
     return pandas.DataFrame(dictset)
 
 
+def to_columnar(
+        dictset: Iterator[dict]):
+    """
+    Load an iterable of dictionaries into a ColumnarDictSet, to run multiple
+    queries over the same data.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to load
+
+    Returns:
+        ColumnarDictSet
+    """
+    from .columnar import ColumnarDictSet
+    return ColumnarDictSet(dictset)
+
+
 def extract_column(
         dictset: Iterator[dict],
         column: str) -> list:
@@ -441,6 +789,142 @@ def group_by(
     return Groups(dictset, column)
 
 
+def aggregate(
+        dictset: Iterator[dict],
+        by: Union[str, List[str]],
+        aggs: dict,
+        max_groups: int = 100000) -> Iterator[dict]:
+    """
+    Aggregate a dictset by the values in one or more columns.
+
+    Running values are kept for each group rather than the records in the
+    group, if there are more than max_groups groups, the partial results are
+    spilled to disk and merged once the dictset has been read.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to aggregate
+        by: string or list of strings
+            The column, or columns, to group by
+        aggs: dictionary
+            The aggregations to perform on each column, the aggregations
+            are 'count', 'sum', 'min', 'max' and 'mean', e.g.
+            {'*': 'count', 'value': ['min', 'max', 'mean']}, '*' counts
+            records, other aggregations ignore nulls
+        max_groups: integer (optional, default 100,000)
+            The number of groups to hold in memory
+
+    Yields:
+        dictionary
+            A record for each group, with the group by columns and the
+            aggregations, named {aggregation}_{column} (e.g. 'max_value')
+    """
+    if isinstance(by, str):
+        by = [by]
+    yield from aggregate_records(dictset, by, aggs, max(max_groups, 1))
+
+
+def tumbling_window(
+        dictset: Iterator[dict],
+        column: str,
+        size: Any,
+        aggs: dict,
+        by: Union[str, List[str], None] = None,
+        allowed_lateness: Any = 0,
+        on_late: Optional[Callable] = None) -> Iterator[dict]:
+    """
+    Aggregate a dictset into fixed size, non-overlapping, windows of time
+    (e.g. counts per minute). The results for each window are returned as
+    soon as the window closes, so this can be used on unbounded dictsets.
+
+    Windows close when the latest timestamp seen, less the allowed_lateness,
+    passes the end of the window. Records for windows which have closed are
+    late and aren't included in the results.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The dictset to aggregate
+        column: string
+            The column holding the timestamp of the record, numbers (seconds),
+            datetimes or ISO 8601 strings
+        size: timedelta or number
+            The length of the windows, numbers are seconds
+        aggs: dictionary
+            The aggregations to perform, as for aggregate
+        by: string or list of strings (optional)
+            Columns to group by within each window
+        allowed_lateness: timedelta or number (optional, default 0)
+            How far out of order records can arrive
+        on_late: callable (optional)
+            Called with each late record
+
+    Yields:
+        dictionary
+            A record for each group in each window, with the window_start,
+            window_end, the group by columns and the aggregations
+    """
+    size = to_seconds(size)
+    by = [by] if isinstance(by, str) else list(by or [])
+    yield from fixed_windows(dictset, column, size, size, aggs, by, to_seconds(allowed_lateness), on_late)
+
+
+def sliding_window(
+        dictset: Iterator[dict],
+        column: str,
+        size: Any,
+        slide: Any,
+        aggs: dict,
+        by: Union[str, List[str], None] = None,
+        allowed_lateness: Any = 0,
+        on_late: Optional[Callable] = None) -> Iterator[dict]:
+    """
+    Aggregate a dictset into fixed size windows of time which start every
+    'slide' (e.g. the count for the last 5 minutes, every minute), each
+    record is in size/slide windows. See tumbling_window.
+
+    Parameters:
+        size: timedelta or number
+            The length of the windows, numbers are seconds
+        slide: timedelta or number
+            The time between the start of each window
+
+    Yields:
+        dictionary
+    """
+    size, slide = to_seconds(size), to_seconds(slide)
+    if slide <= 0 or slide > size:
+        raise ValueError('sliding_window: slide must be greater than 0 and no more than size')
+    by = [by] if isinstance(by, str) else list(by or [])
+    yield from fixed_windows(dictset, column, size, slide, aggs, by, to_seconds(allowed_lateness), on_late)
+
+
+def session_window(
+        dictset: Iterator[dict],
+        column: str,
+        gap: Any,
+        aggs: dict,
+        by: Union[str, List[str], None] = None,
+        allowed_lateness: Any = 0,
+        on_late: Optional[Callable] = None) -> Iterator[dict]:
+    """
+    Aggregate a dictset into sessions of activity for each group, a session
+    ends when there are no records for the group for 'gap' (e.g. a user's
+    visits to a site). See tumbling_window.
+
+    Parameters:
+        gap: timedelta or number
+            The period of inactivity which ends a session, numbers are
+            seconds
+
+    Yields:
+        dictionary
+            A record for each session, the window_end is the time of the last
+            record in the session plus the gap
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    yield from session_windows(dictset, column, to_seconds(gap), aggs, by, to_seconds(allowed_lateness), on_late)
+
+
 def jsonify(
         list_of_json_strings: Iterator[dict]):
     """
@@ -19,7 +19,7 @@ class Groups():
 
     Warning:
         The 'Groups' object holds the entire dataset in memory so is unsuitable
-        for large datasets.
+        for large datasets, dictset.aggregate holds only the aggregations.
     """
     __slots__ = ('groups')
 
@@ -74,8 +74,7 @@ class Groups():
         """
         response = {}
         for key, items in self.groups.items():
-            for item in items:
-                values = [item.get(column) for item in items if item.get(column) is not None]
+            values = [item.get(column) for item in items if item.get(column) is not None]
             response[key] = method(values)
         return response
 
@@ -0,0 +1,9 @@
+from .sort_key import sort_key
+from .spill import SpillFile, merge_runs
+from .distinct import distinct_records
+from .aggregate import Accumulators, aggregate_records
+from .join import JOIN_TYPES, hash_join, merge_join
+from .sample import Reservoir, reservoir_sample, bernoulli_sample
+from .window import fixed_windows, session_windows, to_seconds
+from .parallel import parallel_chunks
+from .partition import jump_hash, partition_of, partition_records
@@ -0,0 +1,157 @@
+"""
+Aggregate
+
+Streaming aggregation of records by group. Only a set of running values
+(accumulators) is held for each group rather than the records in the group,
+so the memory used depends on the number of groups not the number of records.
+
+The accumulators for a group can be merged with the accumulators for the same
+group from another set of records, when the number of groups exceeds the
+memory budget the partial accumulators are spilled to partitions on disk (by
+the hash of the group) and the partitions are merged once all of the records
+have been read.
+"""
+from typing import Iterable, Iterator, List, Union, Dict
+from .spill import SpillFile
+
+AGGREGATIONS = ('count', 'sum', 'min', 'max', 'mean')
+PARTITIONS = 16
+
+
+class Accumulators():
+    """
+    The set of aggregations to calculate, for example:
+
+        {'*': ['count'], 'value': ['min', 'max', 'mean']}
+
+    '*' counts records, aggregations of columns ignore nulls (None).
+    """
+    __slots__ = ('plan', 'names')
+
+    def __init__(self, aggs: Dict[str, Union[str, List[str]]]):
+        self.plan: List[tuple] = []
+        for column, aggregations in aggs.items():
+            if isinstance(aggregations, str):
+                aggregations = [aggregations]
+            for aggregation in aggregations:
+                if aggregation not in AGGREGATIONS:
+                    raise ValueError(F"aggregate: unknown aggregation '{aggregation}', must be one of {', '.join(AGGREGATIONS)}")
+                if column == '*' and aggregation != 'count':
+                    raise ValueError("aggregate: only 'count' can be used with '*'")
+                self.plan.append((column, aggregation))
+        self.names = [F"{aggregation}_{column}" for column, aggregation in self.plan]
+
+    def new(self) -> list:
+        return [[0, 0] if aggregation == 'mean' else 0 if aggregation == 'count' else None
+                for column, aggregation in self.plan]
+
+    def update(self, state: list, record: dict):
+        for index, (column, aggregation) in enumerate(self.plan):
+            if column == '*':
+                state[index] += 1
+                continue
+            value = record.get(column)
+            if value is None:
+                continue
+            if aggregation == 'count':
+                state[index] += 1
+            elif aggregation == 'sum':
+                state[index] = value if state[index] is None else state[index] + value
+            elif aggregation == 'min':
+                if state[index] is None or value < state[index]:
+                    state[index] = value
+            elif aggregation == 'max':
+                if state[index] is None or value > state[index]:
+                    state[index] = value
+            else:
+                state[index][0] += value
+                state[index][1] += 1
+
+    def merge(self, state: list, other: list):
+        for index, (column, aggregation) in enumerate(self.plan):
+            value = other[index]
+            if aggregation == 'mean':
+                state[index][0] += value[0]
+                state[index][1] += value[1]
+            elif aggregation == 'count':
+                state[index] += value
+            elif value is None:
+                continue
+            elif state[index] is None:
+                state[index] = value
+            elif aggregation == 'sum':
+                state[index] += value
+            elif aggregation == 'min':
+                state[index] = min(state[index], value)
+            else:
+                state[index] = max(state[index], value)
+
+    def result(self, state: list) -> dict:
+        values = {}
+        for name, (column, aggregation), value in zip(self.names, self.plan, state):
+            if aggregation == 'mean':
+                value = value[0] / value[1] if value[1] else None
+            values[name] = value
+        return values
+
+
+def _spill(groups: dict, partitions: List[SpillFile], depth: int):
+    for key, state in groups.items():
+        partitions[hash((depth, key)) % PARTITIONS].write((key, state))
+    groups.clear()
+
+
+def _merge_partition(
+        items: Iterable[tuple],
+        accumulators: Accumulators,
+        max_groups: int,
+        depth: int) -> Iterator[tuple]:
+    groups: dict = {}
+    partitions: List[SpillFile] = []
+    for key, state in items:
+        existing = groups.get(key)
+        if existing is None:
+            groups[key] = state
+            if len(groups) > max_groups:
+                if not partitions:
+                    partitions = [SpillFile() for partition in range(PARTITIONS)]
+                _spill(groups, partitions, depth)
+        else:
+            accumulators.merge(existing, state)
+    if not partitions:
+        yield from groups.items()
+        return
+    _spill(groups, partitions, depth)
+    for partition in partitions:
+        yield from _merge_partition(partition.read(), accumulators, max_groups, depth + 1)
+
+
+def aggregate_records(
+        dictset: Iterable[dict],
+        by: List[str],
+        aggs: dict,
+        max_groups: int) -> Iterator[dict]:
+    accumulators = Accumulators(aggs)
+    groups: dict = {}
+    partitions: List[SpillFile] = []
+
+    for record in dictset:
+        key = tuple([record.get(column) for column in by])
+        state = groups.get(key)
+        if state is None:
+            if len(groups) >= max_groups:
+                # spill the partial accumulators, they're merged later
+                if not partitions:
+                    partitions = [SpillFile() for partition in range(PARTITIONS)]
+                _spill(groups, partitions, 0)
+            state = groups[key] = accumulators.new()
+        accumulators.update(state, record)
+
+    if partitions:
+        _spill(groups, partitions, 0)
+        merged: Iterable = (item for partition in partitions for item in _merge_partition(partition.read(), accumulators, max_groups, 1))
+    else:
+        merged = groups.items()
+
+    for key, state in merged:
+        yield {**dict(zip(by, key)), **accumulators.result(state)}
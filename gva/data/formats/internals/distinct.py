@@ -0,0 +1,51 @@
+"""
+Distinct
+
+Exact deduplication of records with a bounded memory footprint.
+
+A 128bit hash of each distinct record is held in memory, records are returned
+as they are read until the number of hashes held reaches the cache_size. After
+this, records which haven't been seen are spilled to a set of partitions on
+disk, chosen by their hash, so duplicates of a record are always spilled to
+the same partition. Each partition is then deduplicated separately, using
+a different part of the hash to partition again if it is still too large.
+"""
+import hashlib
+from typing import Iterable, Iterator, List
+from .spill import SpillFile
+
+PARTITIONS = 16
+
+
+def _distinct(
+        items: Iterable[tuple],
+        cache_size: int,
+        depth: int) -> Iterator[dict]:
+    seen: set = set()
+    partitions: List[SpillFile] = []
+    for record, digest in items:
+        if digest in seen:
+            continue
+        if len(seen) < cache_size:
+            seen.add(digest)
+            yield record
+        else:
+            if not partitions:
+                partitions = [SpillFile() for partition in range(PARTITIONS)]
+            partitions[digest[depth % len(digest)] % PARTITIONS].write((record, digest))
+
+    # the records in the partitions haven't been returned yet
+    seen = set()
+    for partition in partitions:
+        yield from _distinct(partition.read(), cache_size, depth + 1)
+
+
+def distinct_records(
+        items: Iterable[tuple],
+        cache_size: int) -> Iterator[dict]:
+    """
+    Deduplicate records, items are tuples of the record and the string to
+    compare the records on.
+    """
+    digests = ((record, hashlib.blake2b(key.encode(), digest_size=16).digest()) for record, key in items)
+    yield from _distinct(digests, cache_size, 0)
@@ -0,0 +1,187 @@
+"""
+Join
+
+Joins of two dictsets on one or more columns, every pair of matching records
+is returned so one-to-many and many-to-many matches are supported. Records
+with a null (None) in any of the key columns don't match any records.
+
+The hash join loads the right dictset into an index and streams the left
+dictset past it, the records are returned in the order of the left dictset.
+When the right dictset has more than cache_size records, both dictsets are
+split into partitions on disk by the hash of the key (a grace hash join), so
+matching records are always in the same partition, and each pair of
+partitions is joined separately, partitioning again if they are still too
+large. Once partitioned, records are returned a partition at a time rather
+than in the order of the left dictset.
+
+The merge join expects both dictsets to be sorted, ascending, by the key
+columns (nulls last, as sort(descending=False) returns them) and reads them
+together, only the records for the current key are held in memory.
+
+For RIGHT and FULL joins, records from the right dictset without a match are
+returned after the records matched at the same point of the join.
+"""
+import itertools
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from .sort_key import sort_key
+from .spill import SpillFile
+
+JOIN_TYPES = ('INNER', 'LEFT', 'RIGHT', 'FULL')
+PARTITIONS = 16
+# partitioning doesn't split a key with more than cache_size records, after
+# this many rounds of partitioning the partition is joined in memory
+MAX_DEPTH = 4
+
+
+def _key_function(columns: List[str]) -> Callable:
+    if len(columns) == 1:
+        column = columns[0]
+        return lambda record: record.get(column)
+    return lambda record: tuple([record.get(column) for column in columns])
+
+
+def _is_null(key: Any, columns: List[str]) -> bool:
+    if len(columns) == 1:
+        return key is None
+    return None in key
+
+
+def _partition(
+        records: Iterable[dict],
+        key_function: Callable,
+        depth: int,
+        partitions: Optional[List[SpillFile]] = None) -> List[SpillFile]:
+    if partitions is None:
+        partitions = [SpillFile() for partition in range(PARTITIONS)]
+    for record in records:
+        partitions[hash((depth, key_function(record))) % PARTITIONS].write(record)
+    return partitions
+
+
+def _hash_join(
+        left: Iterable[dict],
+        right: Iterable[dict],
+        columns: List[str],
+        join_type: str,
+        cache_size: int,
+        depth: int) -> Iterator[dict]:
+
+    key_function = _key_function(columns)
+    index: dict = {}
+    held = 0
+    right_partitions: Optional[List[SpillFile]] = None
+
+    # build the index, spilling to partitions if it gets too large
+    right = iter(right)
+    for record in right:
+        key = key_function(record)
+        matches = index.get(key)
+        if matches is None:
+            index[key] = [record]
+        else:
+            matches.append(record)
+        held += 1
+        if held > cache_size and depth < MAX_DEPTH:
+            records = (record for matches in index.values() for record in matches)
+            right_partitions = _partition(records, key_function, depth)
+            index = {}
+            _partition(right, key_function, depth, right_partitions)
+            break
+
+    if right_partitions is not None:
+        left_partitions = _partition(left, key_function, depth)
+        for left_partition, right_partition in zip(left_partitions, right_partitions):
+            yield from _hash_join(
+                    left_partition.read(),
+                    right_partition.read(),
+                    columns,
+                    join_type,
+                    cache_size,
+                    depth + 1)
+        return
+
+    # probe the index with the left records
+    keep_left = join_type in ('LEFT', 'FULL')
+    keep_right = join_type in ('RIGHT', 'FULL')
+    matched: set = set()
+    for record in left:
+        key = key_function(record)
+        matches = None if _is_null(key, columns) else index.get(key)
+        if matches is not None:
+            if keep_right:
+                matched.add(key)
+            for match in matches:
+                yield {**record, **match}
+        elif keep_left:
+            yield record
+
+    if keep_right:
+        for key, matches in index.items():
+            if key not in matched:
+                yield from matches
+
+
+def hash_join(
+        left: Iterable[dict],
+        right: Iterable[dict],
+        columns: List[str],
+        join_type: str,
+        cache_size: int) -> Iterator[dict]:
+    yield from _hash_join(left, right, columns, join_type, cache_size, 0)
+
+
+def merge_join(
+        left: Iterable[dict],
+        right: Iterable[dict],
+        columns: List[str],
+        join_type: str) -> Iterator[dict]:
+
+    key_function, _ = sort_key(columns)
+    null_function = _key_function(columns)
+    keep_left = join_type in ('LEFT', 'FULL')
+    keep_right = join_type in ('RIGHT', 'FULL')
+
+    def _groups(dictset, side):
+        last_key = None
+        for key, group in itertools.groupby(dictset, key=key_function):
+            if last_key is not None and key < last_key:
+                raise ValueError(F"join: the {side} dictset is not sorted by {', '.join(columns)}")
+            last_key = key
+            yield key, group
+
+    lefts = _groups(left, 'left')
+    rights = _groups(right, 'right')
+    left_group = next(lefts, None)
+    right_group = next(rights, None)
+
+    while left_group is not None and right_group is not None:
+        if left_group[0] < right_group[0]:
+            if keep_left:
+                yield from left_group[1]
+            left_group = next(lefts, None)
+        elif right_group[0] < left_group[0]:
+            if keep_right:
+                yield from right_group[1]
+            right_group = next(rights, None)
+        else:
+            # the right group is held so it can be matched to each left record
+            matches = list(right_group[1])
+            if _is_null(null_function(matches[0]), columns):
+                if keep_left:
+                    yield from left_group[1]
+                if keep_right:
+                    yield from matches
+            else:
+                for record in left_group[1]:
+                    for match in matches:
+                        yield {**record, **match}
+            left_group = next(lefts, None)
+            right_group = next(rights, None)
+
+    # the rest of the records don't have matches
+    while keep_left and left_group is not None:
+        yield from left_group[1]
+        left_group = next(lefts, None)
+    while keep_right and right_group is not None:
+        yield from right_group[1]
+        right_group = next(rights, None)
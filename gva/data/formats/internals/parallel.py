@@ -0,0 +1,100 @@
+"""
+Parallel
+
+Applies a function to the records of a dictset using a pool of processes, so
+CPU heavy functions (e.g. regular expressions, parsing) use more than one
+core.
+
+Records are sent to the processes in chunks to reduce the cost of moving them
+between processes, and only a few chunks per process are sent ahead of the
+results being read, so the dictset is streamed rather than loaded and the
+results are returned as they are ready.
+
+Where forking is available (not Windows) the function is inherited by the
+processes rather than being pickled, so lambdas and closures can be used,
+the records and the results are always pickled.
+"""
+import itertools
+import collections
+import multiprocessing
+import concurrent.futures
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# the number of chunks for each process which are sent before results are read
+CHUNKS_PER_WORKER = 2
+
+_function: Optional[Callable] = None
+
+
+def _get_context():
+    # forked processes inherit the function rather than pickling it
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+def _initialize(function: Callable):
+    global _function
+    _function = function
+
+
+def _apply_chunk(chunk: list) -> list:
+    return _function(chunk)  # type:ignore
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+def parallel_chunks(
+        items: Iterable,
+        function: Callable,
+        workers: int,
+        chunk_size: int,
+        ordered: bool) -> Iterator[Any]:
+    """
+    Apply the function to chunks of the items, the function takes a list
+    and returns a list, the results are yielded a chunk at a time.
+    """
+    chunks = _chunks(items, max(chunk_size, 1))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from function(chunk)
+        return
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_get_context(),
+            initializer=_initialize,
+            initargs=(function,))
+    in_flight = workers * CHUNKS_PER_WORKER
+    pending: Any = collections.deque() if ordered else set()
+    try:
+        for chunk in chunks:
+            future = executor.submit(_apply_chunk, chunk)
+            if ordered:
+                pending.append(future)
+                if len(pending) >= in_flight:
+                    yield from pending.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= in_flight:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+        if ordered:
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            for future in concurrent.futures.as_completed(pending):
+                yield from future.result()
+    finally:
+        # stop the processes if the results aren't all read, shutdown's
+        # cancel_futures isn't available before Python 3.9
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
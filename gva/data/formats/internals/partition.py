@@ -0,0 +1,69 @@
+"""
+Partition
+
+Routes records to one of n partitions by the value in a column, so records
+with the same value are always in the same partition. Two dictsets
+partitioned on the same column into the same number of partitions can be
+joined, or grouped, a partition at a time (e.g. in separate processes).
+
+The value is hashed with blake2b of its serialized form, rather than Python's
+hash which is different in each process, so a value is sent to the same
+partition in every run. The hash is mapped to a partition using jump
+consistent hashing (Lamping & Veach, 2014), when the number of partitions
+changes from n to n+1 only 1/(n+1) of the values move partition.
+"""
+import hashlib
+from typing import Any, Iterable, List
+from ....utils.json import serialize
+
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Map a 64bit integer to one of the buckets.
+    """
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & MASK_64
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def partition_of(value: Any, partitions: int) -> int:
+    """
+    The partition for a value, this is the same in every process and run.
+    """
+    digest = hashlib.blake2b(serialize(value, as_bytes=True), digest_size=8).digest()  # type:ignore
+    return jump_hash(int.from_bytes(digest, 'little'), partitions)
+
+
+def partition_records(
+        dictset: Iterable[dict],
+        columns: List[str],
+        targets: list) -> List[int]:
+    """
+    Send each record to a target, targets are queues (put), writers and
+    lists (append) or functions, returns the number of records sent to each
+    target.
+    """
+    def _sender(target):
+        if hasattr(target, 'put'):
+            return target.put
+        if hasattr(target, 'append'):
+            return target.append
+        return target
+
+    senders = [_sender(target) for target in targets]
+    counts = [0] * len(targets)
+    partitions = len(targets)
+    for record in dictset:
+        if len(columns) == 1:
+            value = record.get(columns[0])
+        else:
+            value = [record.get(column) for column in columns]
+        partition = partition_of(value, partitions)
+        senders[partition](record)
+        counts[partition] += 1
+    return counts
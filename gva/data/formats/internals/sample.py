@@ -0,0 +1,104 @@
+"""
+Sample
+
+Random samples of records which are read once, in order, without knowing
+how many records there are.
+
+Reservoir sampling holds a sample of n records, each of the records read so
+far has the same chance of being in the sample. This uses Algorithm L (Li,
+1994), rather than drawing a random number for every record, it calculates
+how many records to skip before the next record which goes into the
+reservoir, so once the reservoir is full, most records are skipped without
+any work.
+
+Bernoulli sampling keeps each record with the same probability, it also
+calculates the number of records to skip (a geometric distribution) rather
+than drawing a random number for every record.
+"""
+import math
+import random
+import itertools
+from typing import Iterable, Iterator, List
+
+_END = object()
+
+
+def _uniform(rng: random.Random) -> float:
+    # a random number in the open interval (0, 1), so it can be logged
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+    return value
+
+
+class Reservoir():
+    """
+    A reservoir of up to 'size' items, items are offered one at a time.
+    """
+    __slots__ = ('size', 'rng', 'items', 'weight', 'skip')
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.rng = rng
+        self.items: list = []
+        self.weight = 0.0
+        self.skip = 0
+
+    def _next_skip(self):
+        self.weight *= math.exp(math.log(_uniform(self.rng)) / self.size)
+        self.skip = int(math.log(_uniform(self.rng)) / math.log1p(-self.weight))
+
+    def offer(self, item):
+        if len(self.items) < self.size:
+            self.items.append(item)
+            if len(self.items) == self.size:
+                self.weight = 1.0
+                self._next_skip()
+        elif self.skip > 0:
+            self.skip -= 1
+        else:
+            self.items[self.rng.randrange(self.size)] = item
+            self._next_skip()
+
+
+def reservoir_sample(
+        items: Iterable,
+        size: int,
+        rng: random.Random) -> List:
+    """
+    Sample 'size' items, the skipped items are passed over in bulk.
+    """
+    reservoir = Reservoir(size, rng)
+    if size <= 0:
+        return reservoir.items
+    iterator = iter(items)
+    for item in iterator:
+        reservoir.offer(item)
+        if len(reservoir.items) == size:
+            break
+    while True:
+        item = next(itertools.islice(iterator, reservoir.skip, None), _END)
+        if item is _END:
+            return reservoir.items
+        reservoir.skip = 0
+        reservoir.offer(item)
+
+
+def bernoulli_sample(
+        items: Iterable,
+        fraction: float,
+        rng: random.Random) -> Iterator:
+    """
+    Keep each item with the probability 'fraction'.
+    """
+    if fraction >= 1:
+        yield from items
+        return
+    iterator = iter(items)
+    log_remainder = math.log1p(-fraction)
+    while True:
+        skip = int(math.log(_uniform(rng)) / log_remainder)
+        item = next(itertools.islice(iterator, skip, None), _END)
+        if item is _END:
+            return
+        yield item
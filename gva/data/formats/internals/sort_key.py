@@ -0,0 +1,99 @@
+"""
+Sort Keys
+
+Builds key functions for ordering records by one or more columns, with each
+column sorted ascending or descending and nulls (None) placed first or last.
+
+Where all of the columns are sorted in the same direction, the key is a tuple
+and the direction is applied by reversing the sort, this is much faster than
+comparing with a Python class. Where the directions are mixed, the key is an
+object which compares the columns in turn.
+
+Ties are left in the order they were found so sorting is stable.
+"""
+from typing import Callable, List, Tuple, Union
+
+
+class _MixedKey():
+    """
+    Sort key for columns sorted in different directions.
+    """
+    __slots__ = ('values', 'descending', 'nulls_first')
+
+    def __init__(self, values, descending, nulls_first):
+        self.values = values
+        self.descending = descending
+        self.nulls_first = nulls_first
+
+    def __lt__(self, other):
+        for this, that, descending in zip(self.values, other.values, self.descending):
+            if this == that:
+                continue
+            if this is None:
+                return self.nulls_first
+            if that is None:
+                return not self.nulls_first
+            if descending:
+                return this > that
+            return this < that
+        return False
+
+    def __eq__(self, other):
+        return self.values == other.values
+
+
+def sort_key(
+        columns: Union[str, List[str]],
+        descending: Union[bool, List[bool]] = False,
+        nulls_first: bool = False) -> Tuple[Callable, bool]:
+    """
+    Create a key function to sort records.
+
+    Parameters:
+        columns: string or list of strings
+            The column, or columns, to sort by
+        descending: boolean or list of booleans (optional)
+            The direction to sort each column, the default is ascending
+        nulls_first: boolean (optional)
+            Place nulls before other values, the default is to place them
+            after other values
+
+    Returns:
+        tuple
+            The key function and the 'reverse' flag to sort with
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    if isinstance(descending, bool):
+        descending = [descending] * len(columns)
+    if len(descending) != len(columns):
+        raise ValueError('sort: a direction is needed for each column')
+
+    if len(set(descending)) > 1:
+        directions = tuple(descending)
+
+        def _mixed_key(record):
+            return _MixedKey(tuple(record.get(column) for column in columns), directions, nulls_first)  # type:ignore
+
+        return _mixed_key, False
+
+    # all of the columns are in the same direction, the nulls are ranked
+    # either side of the values so None is never compared with a value
+    reverse = descending[0]
+    nulls_high = nulls_first == reverse
+
+    if len(columns) == 1:
+        column = columns[0]
+        if nulls_high:
+            return (lambda record: (record.get(column) is None, record.get(column))), reverse
+        return (lambda record: (record.get(column) is not None, record.get(column))), reverse
+
+    def _key(record):
+        key: list = []
+        for column in columns:  # type:ignore
+            value = record.get(column)
+            key.append((value is None) == nulls_high)
+            key.append(value)
+        return tuple(key)
+
+    return _key, reverse
@@ -0,0 +1,69 @@
+"""
+Spill Files
+
+Temporary files used to hold records which don't fit in memory, for example
+the sorted runs of an external sort. Records are pickled into a compressed
+temporary file, pickle retains the types of the values (e.g. dates) so the
+records read back are the same as the records written.
+
+The temporary files are removed when they are closed or garbage collected.
+"""
+import gzip
+import heapq
+import pickle  # nosec - only used for files this process creates
+import tempfile
+from typing import Iterable, Iterator, Callable, List, Optional
+
+# the number of runs which are merged at once, merging more runs at once
+# needs more files to be open at the same time
+MERGE_WIDTH = 64
+
+
+class SpillFile():
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile(prefix='gva-spill-')
+        self.writer: Optional[gzip.GzipFile] = gzip.GzipFile(fileobj=self.file, mode='wb', compresslevel=1)
+        self.records = 0
+
+    def write(self, record):
+        self.writer.write(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))  # type:ignore
+        self.records += 1
+
+    def write_many(self, records: Iterable):
+        for record in records:
+            self.write(record)
+        return self
+
+    def read(self) -> Iterator:
+        """
+        Read the records back, in the order they were written, the file is
+        closed once all of the records have been read.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.file.seek(0)
+        with gzip.GzipFile(fileobj=self.file, mode='rb') as reader:
+            for _ in range(self.records):
+                yield pickle.load(reader)  # nosec
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+
+def merge_runs(
+        runs: List[SpillFile],
+        key: Callable,
+        reverse: bool = False) -> Iterator:
+    """
+    Merge sorted runs into a single sorted stream, where there are more
+    runs than can be merged at once, groups of runs are merged to new runs
+    first. The merge is stable, ties are taken from the earlier run.
+    """
+    while len(runs) > MERGE_WIDTH:
+        merged = SpillFile().write_many(
+                heapq.merge(*[run.read() for run in runs[:MERGE_WIDTH]], key=key, reverse=reverse))
+        runs = [merged] + runs[MERGE_WIDTH:]
+    yield from heapq.merge(*[run.read() for run in runs], key=key, reverse=reverse)
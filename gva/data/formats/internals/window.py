@@ -0,0 +1,204 @@
+"""
+Windows
+
+Streaming aggregation of records into windows of time, the aggregations for
+each window are returned as soon as the window closes, so only the windows
+which are open are held in memory (as accumulators, see Aggregate).
+
+Tumbling windows are fixed size and don't overlap (e.g. each minute), sliding
+windows are fixed size and start every 'slide' (e.g. the last 5 minutes,
+every minute) so each record is in size/slide windows, session windows are
+the periods of activity for each group, separated by gaps of at least 'gap'.
+Fixed windows are aligned to the epoch (1970-01-01 00:00:00).
+
+Records are expected to arrive roughly in time order. The watermark is the
+latest timestamp seen less the allowed lateness, windows which end at or
+before the watermark are closed, records which arrive for a window which has
+closed are late and aren't included in the results.
+
+Timestamps can be numbers (seconds), datetimes, dates or ISO 8601 strings,
+windows are reported as numbers for numeric timestamps, otherwise as
+datetimes. Naive datetimes are treated as UTC.
+"""
+import math
+import heapq
+import datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from .aggregate import Accumulators
+
+EPOCH = datetime.datetime(1970, 1, 1)
+UTC_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class _Clock():
+    """
+    Converts timestamps to seconds, and seconds back to the type of the
+    first timestamp.
+    """
+    __slots__ = ('kind',)
+
+    def __init__(self):
+        self.kind: Optional[str] = None
+
+    def seconds(self, value: Any) -> Optional[float]:
+        if value is None:
+            return None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.kind = self.kind or 'number'
+            return value
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value)
+        elif not isinstance(value, datetime.datetime):
+            value = datetime.datetime.combine(value, datetime.time())
+        if value.tzinfo is None:
+            self.kind = self.kind or 'naive'
+            return (value - EPOCH).total_seconds()
+        self.kind = self.kind or 'aware'
+        return (value - UTC_EPOCH).total_seconds()
+
+    def timestamp(self, seconds: float) -> Any:
+        if self.kind == 'naive':
+            return EPOCH + datetime.timedelta(seconds=seconds)
+        if self.kind == 'aware':
+            return UTC_EPOCH + datetime.timedelta(seconds=seconds)
+        return seconds
+
+
+def to_seconds(duration: Any) -> float:
+    if isinstance(duration, datetime.timedelta):
+        return duration.total_seconds()
+    return duration
+
+
+def _result(clock, start, end, by, key, accumulators, state):
+    return {
+        'window_start': clock.timestamp(start),
+        'window_end': clock.timestamp(end),
+        **dict(zip(by, key)),
+        **accumulators.result(state)}
+
+
+def fixed_windows(
+        dictset: Iterable[dict],
+        column: str,
+        size: float,
+        slide: float,
+        aggs: dict,
+        by: List[str],
+        allowed_lateness: float,
+        on_late: Optional[Callable]) -> Iterator[dict]:
+    accumulators = Accumulators(aggs)
+    clock = _Clock()
+    windows: dict = {}   # start -> {group key -> accumulators}
+    starts: List[float] = []
+    watermark = -math.inf
+
+    def _close(until):
+        while starts and starts[0] + size <= until:
+            start = heapq.heappop(starts)
+            for key, state in windows.pop(start).items():
+                yield _result(clock, start, start + size, by, key, accumulators, state)
+
+    for record in dictset:
+        timestamp = clock.seconds(record.get(column))
+        if timestamp is None:
+            continue
+        watermark = max(watermark, timestamp - allowed_lateness)
+        key = tuple([record.get(name) for name in by])
+
+        # the windows which contain the timestamp, latest first
+        start = math.floor(timestamp / slide) * slide
+        added = False
+        while start > timestamp - size:
+            if start + size > watermark:
+                groups = windows.get(start)
+                if groups is None:
+                    groups = windows[start] = {}
+                    heapq.heappush(starts, start)
+                state = groups.get(key)
+                if state is None:
+                    state = groups[key] = accumulators.new()
+                accumulators.update(state, record)
+                added = True
+            start -= slide
+        if not added and on_late:
+            on_late(record)
+
+        yield from _close(watermark)
+
+    yield from _close(math.inf)
+
+
+class _Session():
+    __slots__ = ('start', 'last', 'state', 'open')
+
+    def __init__(self, start, last, state):
+        self.start = start
+        self.last = last
+        self.state = state
+        self.open = True
+
+
+def session_windows(
+        dictset: Iterable[dict],
+        column: str,
+        gap: float,
+        aggs: dict,
+        by: List[str],
+        allowed_lateness: float,
+        on_late: Optional[Callable]) -> Iterator[dict]:
+    accumulators = Accumulators(aggs)
+    clock = _Clock()
+    sessions: dict = {}   # group key -> list of open sessions
+    endings: list = []    # heap of (end, sequence, key, session)
+    sequence = 0
+    watermark = -math.inf
+
+    def _close(until):
+        while endings and endings[0][0] <= until:
+            end, _, key, session = heapq.heappop(endings)
+            # sessions which were extended or merged have a later entry
+            if not session.open or session.last + gap != end:
+                continue
+            session.open = False
+            sessions[key].remove(session)
+            if not sessions[key]:
+                del sessions[key]
+            yield _result(clock, session.start, end, by, key, accumulators, session.state)
+
+    for record in dictset:
+        timestamp = clock.seconds(record.get(column))
+        if timestamp is None:
+            continue
+        watermark = max(watermark, timestamp - allowed_lateness)
+        key = tuple([record.get(name) for name in by])
+
+        # merge the record with the sessions it is within 'gap' of
+        open_sessions = sessions.setdefault(key, [])
+        touching = [session for session in open_sessions
+                    if session.start - gap < timestamp < session.last + gap]
+        if not touching and timestamp + gap <= watermark:
+            # the session for the record has already closed
+            if not open_sessions:
+                del sessions[key]
+            if on_late:
+                on_late(record)
+            yield from _close(watermark)
+            continue
+
+        state = accumulators.new()
+        accumulators.update(state, record)
+        session = _Session(timestamp, timestamp, state)
+        for other in touching:
+            accumulators.merge(session.state, other.state)
+            session.start = min(session.start, other.start)
+            session.last = max(session.last, other.last)
+            other.open = False
+            open_sessions.remove(other)
+        open_sessions.append(session)
+        sequence += 1
+        heapq.heappush(endings, (session.last + gap, sequence, key, session))
+
+        yield from _close(watermark)
+
+    yield from _close(math.inf)
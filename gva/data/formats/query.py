@@ -0,0 +1,443 @@
+"""
+Query
+
+A lazy query builder over a dictset. The dictset functions are applied in the
+order they are written, so a filter written after a join or a sort still
+processes every record the join or sort produces, and a limit after a sort
+still sorts every record. A Query records the steps as a plan, reorders the
+plan and then executes it:
+
+    query = Query(reader).join(users, 'user_id').where('country', '==', 'NZ')
+    query = query.order_by('score', descending=True).limit(10)
+    for record in query:
+        ...
+
+The plan is optimized before it is executed:
+
+    - filters are moved below sorts, and below selects and joins where the
+      columns the filter reads are known (see where)
+    - limits are moved below selects, and a sort followed by a limit is
+      replaced by a top-k which holds only the top records in memory
+    - the columns needed by the query are selected as early as possible,
+      where the query ends with a select
+    - where the source is a Reader which hasn't been started, the filters at
+      the start of the plan and the columns needed are passed to a copy of
+      the Reader, the Reader itself isn't changed
+
+Filters are only moved past a join when the side of the join the columns come
+from is known; columns in the join key, or columns which aren't selected on
+the right side of the join, e.g. Query(right).select([...]).
+
+'explain' returns the optimized plan.
+"""
+import copy
+import operator
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
+from . import dictset as ds
+
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, values: value in values}
+
+
+class _Filter():
+    __slots__ = ('predicate', 'columns', 'description')
+
+    def __init__(self, predicate, columns, description):
+        self.predicate = predicate
+        self.columns = columns
+        self.description = description
+
+    def __repr__(self):
+        return F"Filter({self.description})"
+
+
+class _Project():
+    # select the columns, missing columns are set to None
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __repr__(self):
+        return F"Select({', '.join(self.columns)})"
+
+
+class _Prune():
+    # drop the columns which aren't needed, missing columns are left missing
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __repr__(self):
+        return F"Prune({', '.join(sorted(self.columns))})"
+
+
+class _Join():
+    __slots__ = ('right', 'columns', 'join_type', 'method')
+
+    def __init__(self, right, columns, join_type, method):
+        self.right = right
+        self.columns = columns
+        self.join_type = join_type
+        self.method = method
+
+    def __repr__(self):
+        return F"Join({self.join_type} on {', '.join(self.columns)}, {self.method}, right={self.right.plan()})"
+
+
+class _Sort():
+    __slots__ = ('columns', 'descending', 'nulls_first')
+
+    def __init__(self, columns, descending, nulls_first):
+        self.columns = columns
+        self.descending = descending
+        self.nulls_first = nulls_first
+
+    def __repr__(self):
+        return F"Sort({', '.join(self.columns)})"
+
+
+class _TopK():
+    __slots__ = ('columns', 'descending', 'nulls_first', 'limit')
+
+    def __init__(self, columns, descending, nulls_first, limit):
+        self.columns = columns
+        self.descending = descending
+        self.nulls_first = nulls_first
+        self.limit = limit
+
+    def __repr__(self):
+        return F"TopK({self.limit} by {', '.join(self.columns)})"
+
+
+class _Limit():
+    __slots__ = ('limit',)
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def __repr__(self):
+        return F"Limit({self.limit})"
+
+
+def _prune(dictset, columns):
+    for record in dictset:
+        yield {column: record[column] for column in columns if column in record}
+
+
+def _known_columns(steps: list) -> Optional[set]:
+    """
+    The columns the records have after the steps, from the last select in
+    the steps, None if they aren't known. Filters, sorts and limits don't
+    change the columns, a join does.
+    """
+    for step in reversed(steps):
+        if isinstance(step, (_Project, _Prune)):
+            return set(step.columns)
+        if isinstance(step, _Join):
+            return None
+    return None
+
+
+def _is_reader(source) -> bool:
+    from ..readers import Reader
+    # the Reader can only be changed before it starts reading
+    return isinstance(source, Reader) and source._inner_line_reader is None
+
+
+class Query():
+
+    def __init__(
+            self,
+            source: Iterable[dict],
+            *,
+            cache_size: int = 100000):
+        """
+        Create a query over a dictset.
+
+        Parameters:
+            source: iterable of dictionaries
+                The dictset to query, e.g. a Reader
+            cache_size: integer (optional, default 100,000)
+                The number of records held in memory by sorts and joins
+                before they spill to disk
+        """
+        self.source = source
+        self.cache_size = cache_size
+        self.steps: list = []
+
+    def _add(self, step):
+        query = Query(self.source, cache_size=self.cache_size)
+        query.steps = self.steps + [step]
+        return query
+
+    def where(
+            self,
+            condition: Union[str, Callable],
+            comparison: Optional[str] = None,
+            value: Any = None,
+            *,
+            columns: Optional[List[str]] = None):
+        """
+        Filter the records.
+
+        Either compare a column to a value, e.g. where('score', '>', 10), nulls
+        don't match, or provide a function which returns True for the
+        records to keep, e.g. where(lambda r: r['a'] > r['b'], columns=['a', 'b']).
+
+        Parameters:
+            condition: string or callable
+                The column to compare, or the function to filter with
+            comparison: string (optional)
+                The comparison, one of ==, !=, <, <=, >, >= or in
+            value: any (optional)
+                The value to compare the column to
+            columns: list of strings (optional)
+                The columns the function reads, the filter can't be moved in
+                the plan unless the columns are known
+
+        Returns:
+            Query
+        """
+        if callable(condition):
+            name = getattr(condition, '__name__', 'predicate')
+            return self._add(_Filter(condition, None if columns is None else set(columns), name))
+
+        function = COMPARISONS.get(comparison)  # type:ignore
+        if function is None:
+            raise ValueError(F"Query: unknown comparison '{comparison}', must be one of {', '.join(COMPARISONS)}")
+        column = condition
+
+        def _predicate(record):
+            field = record.get(column)
+            return field is not None and function(field, value)
+
+        return self._add(_Filter(_predicate, {column}, F"{column} {comparison} {value!r}"))
+
+    def select(
+            self,
+            columns: Union[str, List[str]]):
+        """
+        Select columns, missing columns are set to None.
+
+        Returns:
+            Query
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        return self._add(_Project(list(columns)))
+
+    def join(
+            self,
+            right: Iterable[dict],
+            column: Union[str, List[str]],
+            join_type: str = ds.JOINS.INNER_JOIN,
+            method: str = 'hash'):
+        """
+        Join to another dictset or Query, see dictset.join.
+
+        Returns:
+            Query
+        """
+        if not isinstance(right, Query):
+            right = Query(right, cache_size=self.cache_size)
+        columns = [column] if isinstance(column, str) else list(column)
+        if join_type not in ds.JOIN_TYPES:
+            raise ValueError(F"join: unknown join_type '{join_type}', must be one of {', '.join(ds.JOIN_TYPES)}")
+        return self._add(_Join(right, columns, join_type, method))
+
+    def order_by(
+            self,
+            columns: Union[str, List[str]],
+            descending: Union[bool, List[bool]] = False,
+            nulls_first: bool = False):
+        """
+        Order the records, see dictset.sort, the default is ascending.
+
+        Returns:
+            Query
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        return self._add(_Sort(list(columns), descending, nulls_first))
+
+    def limit(
+            self,
+            limit: int):
+        """
+        Return up to 'limit' records.
+
+        Returns:
+            Query
+        """
+        return self._add(_Limit(max(limit, 0)))
+
+    def plan(self) -> list:
+        """
+        The optimized list of steps.
+        """
+        steps = self._push_down(list(self.steps))
+        return self._prune_columns(steps)
+
+    def explain(self) -> str:
+        """
+        Describe the optimized plan, one step per line, starting at the source.
+        """
+        return '\n'.join([type(self.source).__name__] + [repr(step) for step in self.plan()])
+
+    def _push_down(self, steps: list) -> list:
+        # swap pairs of steps until the plan doesn't change
+        changed = True
+        while changed:
+            changed = False
+            for index in range(len(steps) - 1):
+                lower, upper = steps[index], steps[index + 1]
+                replacement = self._rewrite(lower, upper)
+                if replacement is not None:
+                    steps[index:index + 2] = replacement
+                    changed = True
+                    break
+        return steps
+
+    def _rewrite(self, lower, upper) -> Optional[list]:
+        if isinstance(upper, _Filter):
+            if isinstance(lower, _Sort):
+                return [upper, lower]
+            if isinstance(lower, _Project) and upper.columns is not None and upper.columns <= set(lower.columns):
+                return [upper, lower]
+            if isinstance(lower, _Join) and upper.columns is not None:
+                return self._push_into_join(lower, upper)
+        if isinstance(upper, _Limit):
+            if isinstance(lower, _Project):
+                return [upper, lower]
+            if isinstance(lower, _Limit):
+                return [_Limit(min(lower.limit, upper.limit))]
+            if isinstance(lower, _Sort):
+                return [_TopK(lower.columns, lower.descending, lower.nulls_first, upper.limit)]
+            if isinstance(lower, _TopK):
+                return [_TopK(lower.columns, lower.descending, lower.nulls_first, min(lower.limit, upper.limit))]
+        return None
+
+    def _push_into_join(self, join: _Join, condition: _Filter) -> Optional[list]:
+        join_type = join.join_type
+        to_left = to_right = False
+        if condition.columns <= set(join.columns):
+            # key values are the same on both sides of matching records
+            to_left = join_type in ('INNER', 'LEFT')
+            to_right = join_type in ('INNER', 'RIGHT')
+        else:
+            right_columns = _known_columns(join.right.steps)
+            if right_columns is not None:
+                # the right records only have the selected columns
+                if not (condition.columns & right_columns):
+                    to_left = join_type in ('INNER', 'LEFT')
+                elif condition.columns <= right_columns and not (condition.columns & set(join.columns)):
+                    to_right = join_type in ('INNER', 'RIGHT')
+        if not to_left and not to_right:
+            return None
+
+        if to_right:
+            right = join.right._add(condition)
+            join = _Join(right, join.columns, join.join_type, join.method)
+        if to_left:
+            return [condition, join]
+        return [join]
+
+    def _prune_columns(self, steps: list) -> list:
+        # walk down from the end of the plan, tracking the columns needed,
+        # None means all of the columns are needed
+        required: Optional[set] = None
+        for index in range(len(steps) - 1, -1, -1):
+            step = steps[index]
+            if isinstance(step, (_Project, _Prune)):
+                required = set(step.columns)
+            elif isinstance(step, _Filter):
+                if step.columns is None:
+                    required = None
+                elif required is not None:
+                    required |= step.columns
+            elif isinstance(step, (_Sort, _TopK)):
+                if required is not None:
+                    required |= set(step.columns)
+            elif isinstance(step, _Join) and required is not None:
+                required |= set(step.columns)
+                if _known_columns(step.right.steps) is None:
+                    right = Query(step.right.source, cache_size=step.right.cache_size)
+                    right.steps = step.right.steps + [_Prune(required)]
+                    steps[index] = _Join(right, step.columns, step.join_type, step.method)
+        if required is not None:
+            # after the leading filters, so filtered records aren't copied
+            position = 0
+            while isinstance(steps[position], _Filter):
+                position += 1
+            if not isinstance(steps[position], (_Project, _Prune)):
+                steps.insert(position, _Prune(required))
+        return steps
+
+    def _execute(self, reader_select: bool) -> Iterator[dict]:
+        steps = self.plan()
+
+        source = self.source
+        if _is_reader(source):
+            # the leading filters, and the columns needed, are applied by a
+            # copy of the Reader before the records are returned, so the
+            # caller's Reader can be queried again
+            reader = source = copy.copy(source)
+            conditions = []
+            while steps and isinstance(steps[0], _Filter):
+                conditions.append(steps.pop(0).predicate)
+            # the Reader sets missing columns to None, this is only safe for a
+            # Prune when the records aren't going to be merged over others
+            if steps and reader.select == ['*']:  # type:ignore
+                if isinstance(steps[0], _Project):
+                    reader.select = steps.pop(0).columns  # type:ignore
+                elif isinstance(steps[0], _Prune) and reader_select:
+                    reader.select = sorted(steps.pop(0).columns)  # type:ignore
+            if conditions:
+                existing = reader.where  # type:ignore
+                if existing is not None:
+                    conditions.insert(0, existing)
+                reader.where = lambda record: all(condition(record) for condition in conditions)  # type:ignore
+
+        dictset: Iterator[dict] = iter(source)
+        for step in steps:
+            if isinstance(step, _Filter):
+                dictset = filter(step.predicate, dictset)
+            elif isinstance(step, _Project):
+                dictset = ds.select_from(dictset, columns=step.columns)
+            elif isinstance(step, _Prune):
+                dictset = _prune(dictset, step.columns)
+            elif isinstance(step, _Join):
+                dictset = ds.join(
+                        dictset,
+                        step.right._execute(reader_select=False),
+                        step.columns,
+                        step.join_type,
+                        method=step.method,
+                        cache_size=self.cache_size)
+            elif isinstance(step, _Sort):
+                dictset = ds.sort(dictset, step.columns, self.cache_size, step.descending, step.nulls_first)
+            elif isinstance(step, _TopK):
+                dictset = ds.top_k(dictset, step.columns, step.limit, step.descending, step.nulls_first)
+            elif isinstance(step, _Limit):
+                dictset = ds.limit(dictset, step.limit)
+        yield from dictset
+
+    def execute(self) -> Iterator[dict]:
+        """
+        Optimize and run the query.
+
+        Yields:
+            dictionary
+        """
+        yield from self._execute(reader_select=True)
+
+    def __iter__(self):
+        return self.execute()
@@ -57,9 +57,10 @@ class FileReader(BaseReader):
             # get the list of files at that path
             if exists(cycle_path):  # skip non-existant folders
                 files = glob.iglob(cycle_path + '**', recursive=True)
-                yield from [f.replace('\\', '/') 
-                        for f in files 
-                        if isfile(f) and self.extension in f]
+                files = [f.replace('\\', '/')
+                        for f in files
+                        if isfile(f) and (self.extension in f or f.endswith(paths.MANIFEST_NAME))]
+                yield from self.apply_manifest(files)
 
 
     def read_from_source(self, file_name: str):
@@ -24,8 +24,7 @@ class GoogleCloudStorageReader(BaseReader):
         for cycle_date in common.date_range(self.start_date, self.end_date):
             cycle_path = paths.build_path(path=object_path, date=cycle_date)
             blobs = find_blobs_at_path(project=self.project, bucket=bucket, path=cycle_path, extension=extension)
-            for obj in blobs:
-                yield bucket + '/' + obj.name
+            yield from self.apply_manifest([bucket + '/' + obj.name for obj in blobs])
 
     def read_from_source(self, object_name):
         bucket, object_path, name, extension = paths.get_parts(object_name)
@@ -52,7 +51,7 @@ def find_blobs_at_path(
     gcs_bucket = client.get_bucket(bucket)
     blobs = client.list_blobs(bucket_or_name=gcs_bucket, prefix=path)
     if extension:
-        blobs = [blob for blob in blobs if extension in blob.name]
+        blobs = [blob for blob in blobs if extension in blob.name or blob.name.endswith(paths.MANIFEST_NAME)]
     yield from blobs
 
 
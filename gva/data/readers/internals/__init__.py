@@ -1,3 +1,4 @@
 from .base_reader import BaseReader
 from .threaded_reader import threaded_reader
+from .sampled_reader import SampledReader
 from .experimental_processed_reader import processed_reader
\ No newline at end of file
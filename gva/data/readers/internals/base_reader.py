@@ -1,9 +1,17 @@
 """
 Base Reader
+
+Partitions which are being rewritten (e.g. by compaction) are described by a
+manifest in the folder with the partitions, readers use the manifest to skip
+partitions which are still being written, or have been replaced, so records
+aren't read twice while partitions are being swapped.
 """
 import abc
-from typing import Iterable
+import os
+from typing import Iterable, List
 import datetime
+from ....utils.json import parse
+from ....utils.paths import MANIFEST_NAME
 
 class BaseReader(abc.ABC):
 
@@ -23,6 +31,31 @@ class BaseReader(abc.ABC):
     def __del__(self):
         pass
 
+    def apply_manifest(self, sources: List[str]) -> List[str]:
+        """
+        Remove manifests, and the partitions the manifests say are being
+        written or have been replaced, from a list of sources.
+        """
+        manifests = [source for source in sources if os.path.basename(source) == MANIFEST_NAME]
+        if len(manifests) == 0:
+            return sources
+
+        replaced: set = set()
+        pending: set = set()
+        for manifest_name in manifests:
+            manifest = parse(''.join(self.read_from_source(manifest_name)))
+            replaced.update(manifest.get('replaced', []))
+            pending.update(manifest.get('pending', []))
+
+        def _is_visible(source):
+            name = os.path.basename(source)
+            if name == MANIFEST_NAME or name in replaced:
+                return False
+            # partitions written by a compaction end with its id
+            return not any(F"-c{compaction}." in name for compaction in pending)
+
+        return [source for source in sources if _is_visible(source)]
+
     @abc.abstractmethod
     def list_of_sources(self) -> Iterable:
         pass 
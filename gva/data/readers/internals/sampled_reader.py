@@ -0,0 +1,40 @@
+"""
+Sampled Reader
+
+Wraps a reader to return a random sample of the lines in each partition. The
+lines are sampled as they are read, before they are parsed, so reading a 1%
+sample only parses 1% of the lines.
+
+Each partition is sampled with its own random number generator, seeded from
+the seed and the name of the partition, so the sample is the same each time
+the data is read with the same seed, even when partitions are read by
+multiple threads or processes in a different order.
+"""
+import random
+from typing import Any
+from ...formats.internals import bernoulli_sample
+
+
+class SampledReader():
+
+    def __init__(
+            self,
+            reader: Any,
+            fraction: float,
+            seed: Any = None):
+        self.reader = reader
+        self.fraction = fraction
+        self.seed = seed
+
+    def list_of_sources(self):
+        return self.reader.list_of_sources()
+
+    def read_from_source(self, source: str):
+        rng = random.Random(None if self.seed is None else F"{self.seed}:{source}")  # nosec - sampling isn't security sensitive
+        yield from bernoulli_sample(self.reader.read_from_source(source), self.fraction, rng)
+
+    def __getattr__(self, name):
+        # everything else is provided by the wrapped reader
+        if name == 'reader':
+            raise AttributeError(name)
+        return getattr(self.reader, name)
@@ -33,8 +33,7 @@ class MinIoReader(BaseReader):
                     bucket_name=bucket,
                     prefix=cycle_path,
                     recursive=True)
-            for obj in objects:
-                yield bucket + '/' + obj.object_name
+            yield from self.apply_manifest([bucket + '/' + obj.object_name for obj in objects])
 
 
     def read_from_source(self, object_name):
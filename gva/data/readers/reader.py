@@ -24,7 +24,7 @@ from ..formats.dictset import select_record_fields, select_from
 from ..formats.display import html_table, ascii_table
 from ...logging import get_logger
 from .google_cloud_storage_reader import GoogleCloudStorageReader
-from .internals import BaseReader, threaded_reader, processed_reader
+from .internals import BaseReader, SampledReader, threaded_reader, processed_reader
 from ...utils import json
 from ...errors import InvalidCombinationError
 
@@ -84,6 +84,12 @@ class Reader():
             thread_count: integer (optional)
                 Use multiple threads to read data files, the default is to not
                 use additional threads, the maximum number of threads is 8
+            sample_fraction: float (optional)
+                Return a random sample of the records, each record is returned
+                with this probability (e.g. 0.01 for a 1% sample), records are
+                sampled before they are parsed, the default is all records
+            sample_seed: any (optional)
+                Seed the sampling to return the same sample each time
             fork_processes: boolean (experimental)
                 Create parallel processes to read data files
             step_back_days: integer (experimental)
@@ -102,6 +108,8 @@ class Reader():
                 Reader 'where' parameter must be Callable or None
             TypeError
                 Data format unsupported
+            ValueError
+                Reader 'sample_fraction' must be greater than 0 and at most 1
             InvalidCombinationError
                 Forking and Threading can not be used at the same time
         """
@@ -123,6 +131,14 @@ class Reader():
         # instantiate the injected reader class
         self.reader_class = inner_reader(from_path=from_path, **kwargs)  # type:ignore
 
+        # sample the lines as they are read, before they are parsed
+        sample_fraction = kwargs.get('sample_fraction')
+        if sample_fraction is not None:
+            if not 0 < sample_fraction <= 1:
+                raise ValueError("Reader 'sample_fraction' must be greater than 0 and at most 1")
+            if sample_fraction < 1:
+                self.reader_class = SampledReader(self.reader_class, sample_fraction, kwargs.get('sample_seed'))
+
         self.select = select.copy()
         self.where: Optional[Callable] = where
 
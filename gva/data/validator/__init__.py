@@ -1 +1,2 @@
-from .schema import Schema
\ No newline at end of file
+from .schema import Schema
+from .infer_schema import infer_schema
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Schema Inference
+
+Reads a dataset once to create a schema definition which the records conform
+to, the definition can be loaded into a Schema.
+
+Each field is profiled as the records are read, the profile holds:
+
+- the number of values and nulls (None, empty strings and missing fields)
+- the kinds of values seen (numbers, booleans, dates, strings, lists)
+- the range of the numbers
+- an estimate of the number of distinct values (a HyperLogLog sketch)
+- the distinct strings, until there are more than would be an enum
+- the known string patterns (e.g. CVE identifiers) all of the strings match
+
+so the memory used for each field doesn't grow with the number of records.
+Profiles can be merged, so the records can be profiled in chunks in a pool
+of processes and the profiles combined.
+
+The definition describes the records which were read, it's a starting point
+for a schema, not a replacement for knowing the data.
+"""
+import re
+import random
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from .is_date import _is_iso_date
+from ..formats.internals import parallel_chunks, bernoulli_sample
+from ...utils import HyperLogLog
+
+# patterns for common identifiers, the first one all the strings match is
+# used, strings are matched as the is_string validator matches them
+STRING_PATTERNS = {
+    'cve': r'CVE-[0-9]{4}-[0-9]{4,}$',
+    'uuid': r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$',
+    'ipv4': r'(?:[0-9]{1,3}\.){3}[0-9]{1,3}$',
+    'email': r'[^@\s]+@[^@\s]+\.[^@\s]+$',
+    'url': r'https?://\S+$'}
+COMPILED_PATTERNS = {name: re.compile(pattern) for name, pattern in STRING_PATTERNS.items()}
+
+# the precision of the distinct value sketches, 2^10 bytes (about 3% error)
+SKETCH_PRECISION = 10
+
+
+class _FieldProfile():
+
+    __slots__ = ('count', 'nulls', 'kinds', 'minimum', 'maximum', 'sketch', 'symbols', 'patterns')
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.kinds: set = set()
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.sketch = HyperLogLog(precision=SKETCH_PRECISION)
+        self.symbols: Optional[set] = set()
+        self.patterns: Optional[list] = None
+
+    def add(self, value: Any, enum_limit: int):
+        kind = type(value)
+        if value is None or (kind is str and not value):
+            self.nulls += 1
+            return
+        self.count += 1
+        self.sketch.add(value)
+        if kind in (int, float):
+            self.kinds.add('numeric')
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+        elif kind is str:
+            self.kinds.add('date' if _is_iso_date(value) else 'string')
+            self._add_string(value, enum_limit)
+        elif kind is bool:
+            self.kinds.add('boolean')
+        elif isinstance(value, (datetime.date, datetime.time)):
+            self.kinds.add('date')
+        elif isinstance(value, list):
+            self.kinds.add('list')
+        else:
+            self.kinds.add('other')
+
+    def _add_string(self, value: str, enum_limit: int):
+        if self.symbols is not None and value not in self.symbols:
+            self.symbols.add(value)
+            if len(self.symbols) > enum_limit:
+                self.symbols = None
+        if self.patterns is None:
+            self.patterns = list(STRING_PATTERNS)
+        if self.patterns:
+            self.patterns = [name for name in self.patterns if COMPILED_PATTERNS[name].match(value)]
+
+    def merge(self, other: '_FieldProfile', enum_limit: int):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.kinds |= other.kinds
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+        self.sketch.merge(other.sketch)
+        if self.symbols is None or other.symbols is None:
+            self.symbols = None
+        else:
+            self.symbols |= other.symbols
+            if len(self.symbols) > enum_limit:
+                self.symbols = None
+        if self.patterns is None:
+            self.patterns = other.patterns
+        elif other.patterns is not None:
+            self.patterns = [name for name in self.patterns if name in other.patterns]
+
+    def definition(self, name: str, records: int) -> dict:
+        details: Dict[str, Any] = {}
+        kinds = self.kinds
+        # dates in strings are strings when the field has other strings
+        if 'string' in kinds:
+            kinds = kinds - {'date'}
+
+        types: List[str] = []
+        if kinds == {'string'} and self.patterns:
+            pattern = self.patterns[0]
+            if pattern == 'cve':
+                types.append('cve')
+            else:
+                types.append('string')
+                details['format'] = STRING_PATTERNS[pattern]
+        elif kinds == {'string'} and self.symbols is not None and len(self.symbols) * 2 <= self.count:
+            # values must repeat to be an enum, or any small dataset would be
+            types.append('enum')
+            details['symbols'] = sorted(self.symbols)
+        else:
+            types.extend(kind for kind in ('numeric', 'boolean', 'date', 'string', 'list', 'other') if kind in kinds)
+        if 'numeric' in types:
+            details['min'] = self.minimum
+            details['max'] = self.maximum
+        # nulls include records without the field
+        if self.count < records:
+            types.append('nullable')
+
+        return {
+            'name': name,
+            'type': types[0] if len(types) == 1 else types,
+            **details,
+            'description': f'inferred from {self.count} values, about {self.sketch.count()} distinct'}
+
+
+class _SchemaProfile():
+    """
+    The profiles of the fields in a set of records.
+    """
+    __slots__ = ('records', 'fields', 'enum_limit')
+
+    def __init__(self, enum_limit: int):
+        self.records = 0
+        self.fields: Dict[str, _FieldProfile] = {}
+        self.enum_limit = enum_limit
+
+    def add(self, record: dict):
+        self.records += 1
+        for name, value in record.items():
+            profile = self.fields.get(name)
+            if profile is None:
+                profile = self.fields[name] = _FieldProfile()
+            profile.add(value, self.enum_limit)
+
+    def merge(self, other: '_SchemaProfile'):
+        self.records += other.records
+        for name, profile in other.fields.items():
+            if name in self.fields:
+                self.fields[name].merge(profile, self.enum_limit)
+            else:
+                self.fields[name] = profile
+
+    def definition(self) -> dict:
+        return {'fields': [
+                profile.definition(name, self.records)
+                for name, profile in self.fields.items()]}
+
+
+class _ProfileChunk():
+
+    def __init__(self, enum_limit: int):
+        self.enum_limit = enum_limit
+
+    def __call__(self, records: List[dict]) -> List[_SchemaProfile]:
+        profile = _SchemaProfile(self.enum_limit)
+        for record in records:
+            profile.add(record)
+        return [profile]
+
+
+def infer_schema(
+        dictset: Iterable[dict],
+        sample: Optional[float] = None,
+        enum_limit: int = 50,
+        workers: Optional[int] = None,
+        chunk_size: int = 10000,
+        seed: Optional[int] = None) -> dict:
+    """
+    Infer a schema definition from a set of records.
+
+    Parameters:
+        dictset: iterable of dictionaries
+            The records to infer the schema from
+        sample: float (optional)
+            The fraction of the records to read (e.g. 0.1 is about one in ten
+            records), the default is to read all of the records
+        enum_limit: integer (optional)
+            The most distinct strings a field can have to be an enum, the
+            default is 50
+        workers: integer (optional)
+            The number of processes to profile the records in, the default
+            is to profile them in this process
+        chunk_size: integer (optional)
+            The number of records sent to a process at a time, the default is
+            10,000
+        seed: integer (optional)
+            The seed for sampling, so the same records are sampled each time
+
+    Returns:
+        dictionary
+            A schema definition, this can be loaded into a Schema
+
+    Raises:
+        ValueError
+            If the sample isn't greater than zero and at most one
+    """
+    if sample is not None:
+        if not 0 < sample <= 1:
+            raise ValueError('sample must be greater than 0 and no more than 1')
+        dictset = bernoulli_sample(dictset, sample, random.Random(seed))  # nosec - sampling isn't security sensitive
+
+    profile = _SchemaProfile(enum_limit)
+    if (workers or 1) <= 1:
+        for record in dictset:
+            profile.add(record)
+    else:
+        for chunk_profile in parallel_chunks(
+                dictset,
+                _ProfileChunk(enum_limit),
+                workers=workers,  # type:ignore
+                chunk_size=chunk_size,
+                ordered=True):
+            profile.merge(chunk_profile)
+    return profile.definition()
@@ -1,5 +1,5 @@
 from .is_valid_enum import is_valid_enum
-from typing import Any
+from typing import Any, List
 
 VALID_BOOLEAN_VALUES = ("true", "false", "on", "off", "yes", "no", "0", "1")
 
@@ -14,9 +14,11 @@ class is_boolean(is_valid_enum):
         - it defaults to a set of true/false values
         - the check is case insensitive
         """
-        super().__init__()
-        if len(self.symbols) == 0:
-            self.symbols = VALID_BOOLEAN_VALUES
+        super().__init__(symbols=VALID_BOOLEAN_VALUES)
 
     def __call__(self, value: Any) -> bool:
-        return super().__call__(str(value).lower())
\ No newline at end of file
+        # the strings are always hashable and only falsy when empty
+        return str(value).lower() in self._members
+
+    def column(self, values: List[Any]) -> List[bool]:
+        return super().column([str(value).lower() for value in values])
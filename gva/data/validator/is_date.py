@@ -1,14 +1,26 @@
 import datetime
+import functools
 from typing import Any
 
+# datetime.datetime is a subclass of datetime.date
+DATE_TYPES = (datetime.date, datetime.time)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_iso_date(value: str) -> bool:
+    # data often repeats dates (e.g. many records a day), so parsing them is
+    # cached, including the values which aren't dates
+    try:
+        datetime.datetime.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
 def is_date(value: Any) -> bool:
     """
     Test if a variable is a valid date. Strings should be in iso format.
     """
-    try:
-        if type(value).__name__ in ("datetime", "date", "time"):
-            return True
-        datetime.datetime.fromisoformat(value)
-        return True
-    except (ValueError, TypeError):
-        return False
\ No newline at end of file
+    if isinstance(value, str):
+        return _is_iso_date(value)
+    return isinstance(value, DATE_TYPES)
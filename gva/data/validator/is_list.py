@@ -4,4 +4,4 @@ def is_list(value: Any) -> bool:
     """
     Test if a variable is a valid list
     """
-    return type(value).__name__ == 'list'
\ No newline at end of file
+    return isinstance(value, list)
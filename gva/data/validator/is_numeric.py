@@ -1,4 +1,14 @@
-from typing import Any
+from typing import Any, List
+try:
+    import numpy  # type:ignore
+except ImportError:  # pragma: no cover
+    numpy = None  # type:ignore
+
+# values of these types are compared without being converted
+NUMBER_TYPES = {int, float}
+
+# values of these types are tested as an array when numpy is installed
+ARRAY_TYPES = {int, float, bool, type(None)}
 
 # 64 bit signed - not a limit, just a default
 DEFAULT_MIN = -9223372036854775808
@@ -23,12 +33,27 @@ class is_numeric():
         self.max = kwargs.get('max') or DEFAULT_MAX
 
     def __call__(self, value: Any) -> bool:
+        if type(value) in NUMBER_TYPES:
+            return self.min <= value <= self.max
         try:
             n = float(value)
         except (ValueError, TypeError):
             return False
         return self.min <= n <= self.max
 
+    def column(self, values: List[Any]) -> List[bool]:
+        """
+        Test a column of values, numbers are range checked as an array.
+        """
+        if numpy is None or not set(map(type, values)) <= ARRAY_TYPES:
+            return [bool(self(value)) for value in values]
+        try:
+            # None is converted to nan, which fails the range check
+            array = numpy.array(values, dtype=numpy.float64)
+        except OverflowError:
+            return [bool(self(value)) for value in values]
+        return ((array >= self.min) & (array <= self.max)).tolist()
+
     def __str__(self):
         if self.min == DEFAULT_MIN and self.max == DEFAULT_MAX:
             return 'numeric'
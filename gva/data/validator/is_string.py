@@ -1,23 +1,36 @@
-from typing import Any
+from typing import Any, List
 import re
 
 class is_string():
     """
     Test if a variable is a string and optionally matches a regex
     """
-    __slots__ = ('pattern', 'regex')
+    __slots__ = ('pattern', 'regex', '_match')
 
     def __init__(self, **kwargs):
         self.regex = None
+        self._match = None
         self.pattern = kwargs.get('format')
         if self.pattern:
             self.regex = re.compile(self.pattern)
+            self._match = self.regex.match
 
     def __call__(self, value: Any) -> bool:
-        if self.pattern is None:
-            return type(value).__name__ == "str"
-        else:
-            return self.regex.match(str(value))
+        if self._match is None:
+            return isinstance(value, str)
+        # values which aren't strings are matched as strings (e.g. numbers)
+        if not isinstance(value, str):
+            value = str(value)
+        return self._match(value) is not None
+
+    def column(self, values: List[Any]) -> List[bool]:
+        """
+        Test a column of values, the pattern is compiled once per column.
+        """
+        if self._match is None:
+            return [isinstance(value, str) for value in values]
+        match = self._match
+        return [match(value if isinstance(value, str) else str(value)) is not None for value in values]
 
     def __str__(self):
         if self.pattern:
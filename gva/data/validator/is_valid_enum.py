@@ -1,13 +1,13 @@
 """
 Enumerator Test
 """
-from typing import Any
+from typing import Any, List
 
 class is_valid_enum():
     """
     Test if a variable is on a list of valid values
     """
-    __slots__ = ('symbols')
+    __slots__ = ('symbols', '_members')
 
     def __init__(self, **kwargs):
         """
@@ -16,9 +16,35 @@ class is_valid_enum():
         symbols: list of allowed values (case sensitive)
         """
         self.symbols = kwargs.get('symbols', ())
+        # enums can have hundreds of symbols, so membership is tested against
+        # a set, the list is used for values (or symbols) which can't be hashed
+        try:
+            self._members = frozenset(self.symbols)
+        except TypeError:
+            self._members = None
 
     def __call__(self, value: Any) -> bool:
-        return value and value in self.symbols
+        if not value:
+            return False
+        if self._members is not None:
+            try:
+                return value in self._members
+            except TypeError:
+                pass
+        return value in self.symbols
+
+    def column(self, values: List[Any]) -> List[bool]:
+        """
+        Test a column of values against a set of the symbols.
+        """
+        symbols = self._members
+        if symbols is None:
+            return [self(value) for value in values]
+        try:
+            return [bool(value) and value in symbols for value in values]
+        except TypeError:
+            # unhashable values (e.g. lists)
+            return [self(value) for value in values]
 
     def __str__(self):
         return f'enum {self.symbols}'
\ No newline at end of file
@@ -25,7 +25,8 @@ from .is_string import is_string
 from .is_valid_enum import is_valid_enum
 from .other_validator import other_validator
 
-from typing import Any, Union, List
+from typing import Any, Union, List, Iterable, Tuple, Optional
+from ..formats.internals import parallel_chunks
 from ...utils.json import parse
 from ...errors import ValidationError
 import os
@@ -83,6 +84,8 @@ class Schema():
             raise ValueError("Invalid type specified in schema - valid types are: string, numeric, date, boolean, nullable, list, enum")
         if len(self._validators) == 0:
             raise ValueError("Invalid schema specification")
+        self._compiled = self._compile()
+        self.last_error = ''
 
 
     def _get_validators(
@@ -104,15 +107,54 @@ class Schema():
         return validators
 
 
-    def _field_validator(
-            self,
-            value,
-            validators: set) -> bool:
+    def _compile(self):
+        """
+        Create a function which tests a record against the schema, the
+        validators for each field are 'or'ed so testing a field stops at the
+        first validator which passes, and testing a record stops at the first
+        field which fails. Fields which accept any value aren't tested.
+
+        The function only returns True or False, the error text is created
+        when a record fails (see _errors).
+        """
+        # fields with one validator (most fields) don't need the inner loop
+        single = tuple(
+                (key, validators[0])
+                for key, validators in self._validators.items()
+                if len(validators) == 1 and other_validator not in validators)
+        multiple = tuple(
+                (key, tuple(validators))
+                for key, validators in self._validators.items()
+                if len(validators) > 1 and other_validator not in validators)
+
+        def _compiled(subject):
+            get = subject.get
+            for key, validator in single:
+                if not validator(get(key)):
+                    return False
+            for key, validators in multiple:
+                value = get(key)
+                for validator in validators:
+                    if validator(value):
+                        break
+                else:
+                    return False
+            return True
+
+        return _compiled
+
+
+    def _errors(self, subject: dict) -> str:
         """
-        Execute a set of validator functions (the _is_x) against a value.
-        Return True if any of the validators are True.
+        Describe each of the fields in the subject which don't conform.
         """
-        return any([True for validator in validators if validator(value)])
+        errors = ''
+        for key, validators in self._validators.items():
+            value = subject.get(key)
+            if not any(validator(value) for validator in validators):
+                for validator in validators:
+                    errors += f"'{key}' ({value}) did not pass validator {str(validator)}.\n"
+        return errors
 
 
     def validate(self, subject: dict = {}, raise_exception=False) -> bool:
@@ -132,21 +174,100 @@ class Schema():
         Raises:
             ValidationError
         """
-        result = True
-        self.last_error = ''
- 
-        for key, value in self._validators.items():
-            if not self._field_validator(subject.get(key), self._validators.get(key, [other_validator])):
-                result = False
-                for v in value:
-                    self.last_error += f"'{key}' ({subject.get(key)}) did not pass validator {str(v)}.\n"
-        if raise_exception and not result:
+        if self._compiled(subject):
+            self.last_error = ''
+            return True
+        self.last_error = self._errors(subject)
+        if raise_exception:
             raise ValidationError(F"Record does not conform to schema - {self.last_error}. ")
-        return result
+        return False
+
+
+    def validate_many(
+            self,
+            records: Iterable[dict],
+            workers: Optional[int] = None,
+            chunk_size: int = 10000) -> List[Tuple[bool, str]]:
+        """
+        Test many dictionaries against the Schema.
+
+        The records are tested in chunks, a column at a time, so each
+        validator is run over a list of values (numbers are range checked as
+        an array, enums are tested against a set, and patterns are compiled
+        once per column) rather than a record at a time.
+
+        Parameters:
+            records: iterable of dictionaries
+                The dictionaries to test for conformity
+            workers: integer (optional)
+                The number of processes to test the chunks in, the default
+                is to test them in this process
+            chunk_size: integer (optional)
+                The number of records tested together, the default is 10,000
+
+        Returns:
+            list of tuples of (boolean, string)
+                For each record, in order, whether it conforms and a
+                description of the fields which don't conform
+        """
+        return list(parallel_chunks(
+                records,
+                self._validate_chunk,
+                workers=workers or 1,
+                chunk_size=chunk_size,
+                ordered=True))
+
+
+    def _validate_chunk(self, records: List[dict]) -> List[Tuple[bool, str]]:
+        valid = [True] * len(records)
+        errors = [''] * len(records)
+        for key, validators in self._validators.items():
+            if other_validator in validators:
+                continue
+            values = [record.get(key) for record in records]
+            # the rows which haven't passed any of the validators yet
+            failing = list(range(len(records)))
+            for validator in validators:
+                results = _column(validator, [values[row] for row in failing])
+                failing = [row for row, result in zip(failing, results) if not result]
+                if not failing:
+                    break
+            for row in failing:
+                valid[row] = False
+                for validator in validators:
+                    errors[row] += f"'{key}' ({values[row]}) did not pass validator {str(validator)}.\n"
+        return list(zip(valid, errors))
+
+
+    def __getstate__(self):
+        # the compiled function can't be pickled, it is compiled again
+        state = self.__dict__.copy()
+        del state['_compiled']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compiled = self._compile()
 
 
     def __call__(self, subject: dict = {}, raise_exception=False) -> bool:
         """
         Alias for validate
         """
-        return self.validate(subject=subject, raise_exception=raise_exception)
\ No newline at end of file
+        return self.validate(subject=subject, raise_exception=raise_exception)
+
+
+def _column(validator, values: List[Any]) -> List[bool]:
+    """
+    Run a validator over a column of values, validators which can't test a
+    column are run once for each distinct value.
+    """
+    if hasattr(validator, 'column'):
+        return validator.column(values)
+    try:
+        results = {value: validator(value) for value in set(values)}
+        return [results[value] for value in values]
+    except TypeError:
+        # unhashable values (e.g. lists)
+        return [validator(value) for value in values]
@@ -3,3 +3,5 @@ from .null_writer import NullWriter
 from .file_writer import FileWriter
 from .minio_writer import MinIoWriter
 from .google_cloud_storage_writer import GoogleCloudStorageWriter
+from .sharded_writer import ShardedWriter
+from .compaction import merge_sorted_partitions, compact_partitions
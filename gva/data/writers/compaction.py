@@ -0,0 +1,343 @@
+"""
+Compaction
+
+Idle and over-capacity writers commit partially filled partitions, so folders
+which receive a trickle of data end up with many small partitions and reading
+them is dominated by listing and opening partitions. compact_partitions
+rewrites a day's small partitions into partitions of the target size,
+spreading the work over a set of processes. Partitions which are already
+large enough are left as they are, so compacting a folder again only
+rewrites the partitions written since.
+
+A Writer with a sort_by column writes partitions which are each sorted, but
+as the partitions are written as the data arrives, the key ranges of the
+partitions overlap. Once a day is closed (no more data will be written to
+it) the partitions can be merged into a set of globally sorted partitions
+which don't overlap, so a look-up for a key only needs to read the one
+partition whose key range includes that key.
+
+The source partitions are read together and merged, as each partition is
+already sorted this only holds one record from each partition in memory.
+
+Partitions are swapped using the manifest (see BaseWriter):
+    1) the compaction is recorded in the manifest as pending, readers skip the
+       new partitions, which end with the compaction id (after the timestamp,
+       so partition names still sort in the order they were written)
+    2) the new partitions are written
+    3) the manifest is replaced, in one atomic write, to mark the original
+       partitions as replaced, readers now skip them and read the new ones
+    4) the original partitions are removed, they stay in the manifest so a
+       reader which listed them before they were removed still skips them,
+       they are cleared from the manifest by a later compaction once they
+       are no longer listed
+An interrupted compaction is rolled back (before step 3) or completed (after
+step 3) the next time a compaction runs on the folder. Only one compaction
+should run on a folder at a time.
+"""
+import os
+import math
+import heapq
+import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, List, Callable
+from ...errors import InvalidCombinationError
+from ...logging import get_logger
+from ...utils import paths
+from ...utils.json import parse
+from .internals.base_writer import BaseWriter
+from .internals.partition_writer import PartitionWriter, PARTITION_SIZE
+from .file_writer import FileWriter
+from .null_writer import NullWriter
+from .google_cloud_storage_writer import GoogleCloudStorageWriter
+from .minio_writer import MinIoWriter
+from .sharded_writer import _get_context
+
+
+def _default_reader(inner_writer: Any):
+    from ..readers import FileReader, GoogleCloudStorageReader, MinIoReader
+    readers = {
+        FileWriter: FileReader,
+        GoogleCloudStorageWriter: GoogleCloudStorageReader,
+        MinIoWriter: MinIoReader}
+    reader = readers.get(inner_writer)
+    if reader is None:
+        raise ValueError(F"No reader is known for {inner_writer.__name__}, an `inner_reader` must be provided")
+    return reader
+
+
+def _check_supported(inner_writer: Any):
+    # fail before anything is written rather than part way through a swap
+    if not inner_writer.supports_rewrite():
+        raise InvalidCombinationError(F"{inner_writer.__name__} does not support rewriting partitions")
+
+
+def _reader_name(lister: BaseWriter, name: str) -> str:
+    # the readers expect the bucket to be part of the name
+    if not name.startswith(lister.bucket + '/'):
+        name = lister.bucket + '/' + name
+    return name
+
+
+def _recover(lister: BaseWriter) -> List[str]:
+    """
+    Complete or roll back an interrupted compaction, partitions written by a
+    pending compaction and partitions which have been replaced are removed.
+
+    Replaced partitions stay in the manifest until they are no longer listed,
+    returns the replaced partitions which are still in the manifest.
+    """
+    manifest = lister.read_manifest()
+    pending = manifest.get('pending', [])
+    replaced = set(manifest.get('replaced', []))
+    if len(pending) == 0 and len(replaced) == 0:
+        return []
+    listed = []
+    for partition in lister.get_partition_list():
+        name = os.path.basename(partition)
+        if any(F"-c{compaction}." in name for compaction in pending):
+            lister.remove_partition(partition)
+        elif name in replaced:
+            lister.remove_partition(partition)
+            listed.append(name)
+    if pending or len(listed) < len(replaced):
+        lister.write_manifest({"pending": [], "replaced": listed})
+    return listed
+
+
+def _swap_partitions(
+        lister: BaseWriter,
+        sources: List[str],
+        replaced: List[str],
+        rewrite: Callable) -> List[dict]:
+    """
+    Replace the sources with the partitions written by the rewrite function,
+    which is passed the compaction id. The partitions replaced by an earlier
+    compaction, returned by _recover, stay in the manifest.
+    """
+    compaction_id = os.urandom(6).hex()
+    lister.write_manifest({"pending": [compaction_id], "replaced": replaced})
+    try:
+        summaries = rewrite(compaction_id)
+    except Exception:
+        _recover(lister)
+        raise
+    replaced = replaced + [os.path.basename(source) for source in sources]
+    lister.write_manifest({"pending": [], "replaced": replaced})
+    _recover(lister)
+    return summaries
+
+
+def _rewrite_partitions(
+        sources: List[str],
+        *,
+        inner_writer: BaseWriter,
+        inner_reader: Any,
+        to_path: str,
+        compaction_id: str,
+        **kwargs) -> List[dict]:
+    """
+    Copy the records in the sources to new partitions, this runs in the
+    worker processes.
+    """
+    reader = inner_reader(from_path=to_path, **kwargs)
+    summaries: List[dict] = []
+    writer = PartitionWriter(
+            inner_writer=inner_writer,
+            to_path=to_path,
+            compaction_id=compaction_id,
+            on_commit=summaries.append,
+            **kwargs)
+    try:
+        for source in sources:
+            for line in reader.read_from_source(source):
+                writer.append(parse(line))
+        writer.commit()
+    except Exception:
+        writer.discard()
+        raise
+    return summaries
+
+
+def compact_partitions(
+        *,
+        to_path: str,
+        date: Optional[datetime.date] = None,
+        inner_writer: BaseWriter = NullWriter,  # type:ignore
+        inner_reader: Any = None,
+        partition_size: int = PARTITION_SIZE,
+        minimum_size: Optional[int] = None,
+        compress: bool = False,
+        workers: int = 4,
+        **kwargs) -> List[dict]:
+    """
+    Rewrite a day's small partitions into partitions of the target size.
+
+    Parameters:
+        to_path: string
+            The path the partitions were written to, as provided to the Writer
+        date: date (optional)
+            The date of the partitions to compact, the default is today
+        inner_writer: BaseWriter (optional)
+            The component used to list, write and remove partitions, the
+            default is the NullWriter
+        inner_reader: BaseReader (optional)
+            The component used to read the partitions, the default is the
+            reader for the inner_writer
+        partition_size: integer (optional)
+            The maximum size of the compacted partitions
+        minimum_size: integer (optional)
+            Partitions of at least this many bytes, as stored, are left as
+            they are, the default is half of the partition_size
+        compress: boolean (optional)
+            Apply lzma compression to the compacted partitions, default is no
+            compression
+        workers: integer (optional)
+            The number of processes to compact with, the default is 4
+
+    Note:
+        Other parameters are passed to the inner_writer and inner_reader.
+
+    Returns:
+        list of dictionaries
+            A summary of each of the new partitions, empty if there were
+            fewer than two partitions to compact
+
+    Raises:
+        InvalidCombinationError
+            The inner_writer doesn't support rewriting partitions
+    """
+    _check_supported(inner_writer)
+    if minimum_size is None:
+        minimum_size = partition_size // 2
+    identity = paths.date_format(to_path, date)  # type:ignore
+    kwargs['compress'] = compress
+    lister = inner_writer(to_path=identity, **kwargs)  # type:ignore
+    replaced = _recover(lister)
+    sources = sorted(
+            partition for partition, size in lister.get_partition_sizes().items()
+            if size < minimum_size)
+    if len(sources) < 2:
+        return []
+
+    if inner_reader is None:
+        inner_reader = _default_reader(inner_writer)
+    reader_sources = [_reader_name(lister, source) for source in sources]
+
+    def _compact(compaction_id):
+        rewrite = partial(
+                _rewrite_partitions,
+                inner_writer=inner_writer,
+                inner_reader=inner_reader,
+                to_path=identity,
+                compaction_id=compaction_id,
+                partition_size=partition_size,
+                **kwargs)
+        # each worker is given a contiguous run of the sources, so the order
+        # of the records is mostly preserved
+        chunk_size = math.ceil(len(reader_sources) / max(workers, 1))
+        chunks = [reader_sources[i:i + chunk_size] for i in range(0, len(reader_sources), chunk_size)]
+        if len(chunks) == 1:
+            return rewrite(chunks[0])
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=_get_context()) as pool:
+            return [summary for summaries in pool.map(rewrite, chunks) for summary in summaries]
+
+    summaries = _swap_partitions(lister, sources, replaced, _compact)
+    get_logger().debug(F"Compacted {len(sources)} partitions into {len(summaries)} partitions at {identity}")
+    return summaries
+
+
+def _read_partition(reader, name: str, sort_by: str):
+    for line in reader.read_from_source(name):
+        record = parse(line)
+        yield (record.get(sort_by) is None, record.get(sort_by)), record  # type:ignore
+
+
+def merge_sorted_partitions(
+        *,
+        to_path: str,
+        sort_by: str,
+        date: Optional[datetime.date] = None,
+        inner_writer: BaseWriter = NullWriter,  # type:ignore
+        inner_reader: Any = None,
+        partition_size: int = PARTITION_SIZE,
+        compress: bool = False,
+        **kwargs) -> List[dict]:
+    """
+    Merge a day's partitions, which have been written by a Writer with a
+    sort_by column, into globally sorted, non-overlapping partitions.
+
+    Parameters:
+        to_path: string
+            The path the partitions were written to, as provided to the Writer
+        sort_by: string
+            The column the partitions were sorted by
+        date: date (optional)
+            The date of the partitions to merge, the default is today
+        inner_writer: BaseWriter (optional)
+            The component used to list, write and remove partitions, the
+            default is the NullWriter
+        inner_reader: BaseReader (optional)
+            The component used to read the partitions, the default is the
+            reader for the inner_writer
+        partition_size: integer (optional)
+            The maximum size of the merged partitions
+        compress: boolean (optional)
+            Apply lzma compression to the merged partitions, default is no
+            compression
+
+    Note:
+        Other parameters are passed to the inner_writer and inner_reader.
+
+    Returns:
+        list of dictionaries
+            A summary of each of the new partitions, including the minimum
+            and maximum values of the sort_by column in the partition
+
+    Raises:
+        ValueError
+            The partitions were not sorted by the sort_by column
+        InvalidCombinationError
+            The inner_writer doesn't support rewriting partitions
+    """
+    _check_supported(inner_writer)
+    identity = paths.date_format(to_path, date)  # type:ignore
+    kwargs['compress'] = compress
+    lister = inner_writer(to_path=identity, **kwargs)  # type:ignore
+    replaced = _recover(lister)
+    sources = sorted(lister.get_partition_list())
+    if len(sources) == 0:
+        return []
+
+    if inner_reader is None:
+        inner_reader = _default_reader(inner_writer)
+    reader = inner_reader(from_path=identity, **kwargs)
+
+    def _merge(compaction_id):
+        summaries: List[dict] = []
+        writer = PartitionWriter(
+                inner_writer=inner_writer,
+                to_path=identity,
+                compaction_id=compaction_id,
+                partition_size=partition_size,
+                sort_by=sort_by,
+                buffer_records=0,
+                on_commit=summaries.append,
+                **kwargs)
+        try:
+            readers = [_read_partition(reader, _reader_name(lister, source), sort_by) for source in sources]
+            last_key = None
+            for key, record in heapq.merge(*readers, key=lambda item: item[0]):
+                if last_key is not None and key < last_key:
+                    raise ValueError(F"Partitions at {identity} are not sorted by '{sort_by}'")
+                last_key = key
+                writer.append(record)
+            writer.commit()
+        except Exception:
+            writer.discard()
+            raise
+        return summaries
+
+    summaries = _swap_partitions(lister, sources, replaced, _merge)
+    get_logger().debug(F"Merged {len(sources)} partitions into {len(summaries)} sorted partitions at {identity}")
+    return summaries
@@ -1,7 +1,9 @@
 import glob
 import os
 import shutil
+from typing import Optional
 from ...utils import paths
+from ...utils.json import parse, serialize
 from .internals.base_writer import BaseWriter
 
 
@@ -12,21 +14,41 @@ class FileWriter(BaseWriter):
 
     def commit(
             self,
-            source_file_name):
-        existing_partitions = self.get_partition_list()
+            source_file,
+            partition_name: Optional[str] = None):
+        partition_name = partition_name or self._build_path()
 
-        collision_tests = 0
-        maybe_colliding_filename = self._build_path(collision_tests)
-
-        while maybe_colliding_filename in existing_partitions:
-            collision_tests += 1
-            maybe_colliding_filename = self._build_path(collision_tests)
-
-        bucket, path, filename, ext = paths.get_parts(maybe_colliding_filename)
+        bucket, path, filename, ext = paths.get_parts(partition_name)
         os.makedirs(bucket + '/' + path, exist_ok=True)
 
-        # save
-        return shutil.copy(source_file_name, maybe_colliding_filename)
+        # save - 'x' fails rather than overwriting an existing partition
+        with open(partition_name, 'xb') as target_file:
+            shutil.copyfileobj(source_file, target_file)
+        return partition_name
 
     def get_partition_list(self):
         return glob.glob(self.filename + '**', recursive=True)
+
+    def get_partition_sizes(self):
+        return {partition: os.path.getsize(partition) for partition in self.get_partition_list()}
+
+    def read_manifest(self):
+        if not os.path.exists(self.manifest_name):
+            return {}
+        with open(self.manifest_name, 'rb') as manifest_file:
+            return parse(manifest_file.read())
+
+    def write_manifest(
+            self,
+            manifest: dict):
+        # write to a temporary file and rename it over the manifest, the
+        # rename is atomic so readers don't see a partial manifest
+        temporary_name = self.manifest_name + '.' + self.writer_id
+        with open(temporary_name, 'wb') as manifest_file:
+            manifest_file.write(serialize(manifest, as_bytes=True))  # type:ignore
+        os.replace(temporary_name, self.manifest_name)
+
+    def remove_partition(
+            self,
+            partition_name: str):
+        os.remove(partition_name)
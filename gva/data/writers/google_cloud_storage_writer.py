@@ -1,3 +1,5 @@
+from typing import Optional
+from ...utils.json import parse, serialize
 from .internals.base_writer import BaseWriter
 try:
     from google.cloud import storage  # type:ignore
@@ -20,20 +22,37 @@ class GoogleCloudStorageWriter(BaseWriter):
         blob_list = self.gcs_bucket.list_blobs(prefix=self.filename)
         return [blob.name for blob in blob_list]
 
-    def commit(
+    def get_partition_sizes(self):
+        blob_list = self.gcs_bucket.list_blobs(prefix=self.filename)
+        return {blob.name: blob.size for blob in blob_list}
+
+    def read_manifest(self):
+        blob = self.gcs_bucket.get_blob(self.manifest_name)
+        if blob is None:
+            return {}
+        return parse(blob.download_as_bytes())
+
+    def write_manifest(
             self,
-            source_file_name):
+            manifest: dict):
+        # replacing an object is atomic in GCS
+        blob = self.gcs_bucket.blob(self.manifest_name)
+        blob.upload_from_string(serialize(manifest), content_type='application/json')
 
-        existing_items = self.get_partition_list()
-        # avoid collisions
-        collision_tests = 0
-        maybe_colliding_filename = self._build_path(collision_tests)
+    def remove_partition(
+            self,
+            partition_name: str):
+        self.gcs_bucket.blob(partition_name).delete()
+
+    def commit(
+            self,
+            source_file,
+            partition_name: Optional[str] = None):
 
-        while maybe_colliding_filename in existing_items:
-            collision_tests += 1
-            maybe_colliding_filename = self._build_path(collision_tests)
+        partition_name = partition_name or self._build_path()
 
-        blob = self.gcs_bucket.blob(maybe_colliding_filename)
-        blob.upload_from_filename(source_file_name)
+        # generation 0 only allows the upload if the blob doesn't exist
+        blob = self.gcs_bucket.blob(partition_name)
+        blob.upload_from_file(source_file, rewind=True, if_generation_match=0)
 
-        return maybe_colliding_filename
+        return partition_name
@@ -1,13 +1,36 @@
 """
-Writers are the target specific implementations which commit a temporary file
+Writers are the target specific implementations which commit a partition
 created by the PartitionWriter to different systems, such as the filesystem,
 Google Cloud Storage or MinIO.
 
-The primary activity is contained in the .commit() method.
+The primary activity is contained in the .commit() method, this is passed a
+binary file-like object positioned at the start of the partition; this may be
+held in memory or on disk so implementations should read from the object
+rather than expecting a file name. The name of the partition can be provided,
+from ._build_path(), where it needs to be known before the commit (see
+Journal), otherwise a name is built.
+
+Partition names are built from the time of the commit and an identifier for
+the writer instance (similar to a ULID), so names sort in the order they were
+written and don't collide with other writers without needing to list the
+partitions which already exist. Partitions written by a compaction end with
+the compaction id, after the timestamp, so they also sort in write order.
+
+Partitions which are rewritten (e.g. compaction) are swapped using a manifest
+in the folder the partitions are written to. The manifest lists compactions
+which are in progress, and the partitions which have been replaced, readers
+skip both so they never see the same records twice. Writers which support
+rewriting partitions implement the get_partition_sizes, remove_partition,
+read_manifest and write_manifest methods, see supports_rewrite.
 """
 from ....utils import paths
+from typing import Dict, Optional
+import time
+import os
 import abc
 
+REWRITE_METHODS = ('get_partition_sizes', 'read_manifest', 'write_manifest', 'remove_partition')
+
 
 class BaseWriter(abc.ABC):
 
@@ -30,15 +53,76 @@ class BaseWriter(abc.ABC):
         if kwargs.get('compress', False):
             self.extension = self.extension + '.lzma'
 
-    def _build_path(self, index):
-        return f"{self.filename}-{index:04d}{self.extension}"
+        # random per instance, separates writers committing at the same time
+        self.writer_id = os.urandom(4).hex()
+        self.last_timestamp = 0
+
+        # partitions written by a compaction are marked so readers can skip
+        # them until they are swapped in, see compaction
+        self.suffix = ''
+        if kwargs.get('compaction_id'):
+            self.suffix = '-c' + kwargs['compaction_id']
 
-    @abc.abstractclassmethod
+    def _build_path(self):
+        # nanosecond timestamp, zero-padded hex so names sort lexically, it
+        # is forced to increase so partitions from this writer stay in order
+        timestamp = max(time.time_ns(), self.last_timestamp + 1)
+        self.last_timestamp = timestamp
+        return f"{self.filename}-{timestamp:016x}-{self.writer_id}{self.suffix}{self.extension}"
+
+    @abc.abstractmethod
     def commit(
             self,
-            source_file_name):
+            source_file,
+            partition_name: Optional[str] = None):
         pass
 
-    @abc.abstractclassmethod
+    @abc.abstractmethod
     def get_partition_list(self):
         pass
+
+    @classmethod
+    def supports_rewrite(cls) -> bool:
+        """
+        Writers support rewriting partitions (e.g. compaction) when they
+        implement all of the methods used to rewrite them.
+        """
+        return all(getattr(cls, method) is not getattr(BaseWriter, method) for method in REWRITE_METHODS)
+
+    def get_partition_sizes(self) -> Dict[str, int]:
+        """
+        The size, in bytes, of each partition, keyed by the partition name in
+        the form returned by the get_partition_list method.
+        """
+        raise NotImplementedError(F"{type(self).__name__} does not support listing partition sizes")
+
+    @property
+    def manifest_name(self):
+        # the manifest is in the same folder as the partitions
+        return self.filename[:self.filename.rfind('/') + 1] + paths.MANIFEST_NAME
+
+    def read_manifest(self) -> dict:
+        """
+        Read the manifest for the partitions, an empty dictionary is returned
+        if there is no manifest.
+        """
+        raise NotImplementedError(F"{type(self).__name__} does not support manifests")
+
+    def write_manifest(
+            self,
+            manifest: dict):
+        """
+        Replace the manifest for the partitions, the replacement must be
+        atomic, readers must see either the old or the new manifest.
+        """
+        raise NotImplementedError(F"{type(self).__name__} does not support manifests")
+
+    def remove_partition(
+            self,
+            partition_name: str):
+        """
+        Remove a partition, partition_name is in the form returned by the
+        get_partition_list method. Used when partitions are rewritten (e.g.
+        compaction), writers which don't support it raise an error.
+        """
+        raise NotImplementedError(F"{type(self).__name__} does not support removing partitions")
@@ -0,0 +1,171 @@
+"""
+Journal
+
+A write-ahead journal for the Writer. Records are written to the journal as
+they are appended, before they are committed to a partition, so the records
+in partitions which were open when the process stopped can be committed when
+the Writer restarts.
+
+Each PartitionWriter has its own journal file in the journal folder, the file
+holds the records in the open partition, and the partitions being committed:
+
+    {"identity": ...}                   the PartitionWriter the journal is for
+    {"record": {...}, "token": ...}     a record appended to the writer
+    {"intent": name, "records": n}      the next n records are being committed
+    {"committed": name, "records": n}   the partition has been committed
+
+Partition names are generated before the partition is committed, so if the
+process stops after a partition was committed but before the journal was
+updated, the partition is found by name and isn't committed again. Once all
+of the records in the journal have been committed, the journal is truncated
+to a checkpoint which holds the last token.
+
+Tokens are provided by the caller (e.g. an offset in the upstream system) and
+are stored with the records, the last token written to the journal is
+available to resume reading from the upstream system after a restart.
+
+The journal is flushed after each write, this protects against the process
+stopping, it does not protect against the host stopping.
+"""
+import os
+import hashlib
+from typing import Any, Dict, Tuple, List, Union
+from ....utils.json import parse, serialize
+
+JOURNAL_EXTENSION = '.journal'
+
+
+def _as_bytes(value: Union[str, bytes]) -> bytes:
+    # serialize is typed to return either, the journal is written as bytes
+    if isinstance(value, str):
+        return value.encode()
+    return value
+
+
+class Journal():
+
+    def __init__(
+            self,
+            journal_path: str):
+        """
+        Create a journal, the journal_path is a local folder which will be
+        created if it doesn't exist.
+        """
+        self.journal_path = journal_path
+        os.makedirs(journal_path, exist_ok=True)
+        self.files: Dict[str, Any] = {}
+        self.tokens: Dict[str, Tuple[int, Any]] = {}
+        self.sequence = 0
+        self.token = None
+
+    def _file_name(self, identity: str) -> str:
+        digest = hashlib.blake2b(identity.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.journal_path, digest + JOURNAL_EXTENSION)
+
+    def _write(self, identity: str, entry: bytes):
+        journal_file = self.files.get(identity)
+        if journal_file is None:
+            file_name = self._file_name(identity)
+            new_file = not os.path.exists(file_name)
+            journal_file = open(file_name, 'ab')
+            if new_file:
+                journal_file.write(_as_bytes(serialize({"identity": identity}, as_bytes=True)) + b'\n')
+            self.files[identity] = journal_file
+        journal_file.write(entry + b'\n')
+        journal_file.flush()
+
+    def record(
+            self,
+            identity: str,
+            serialized_record: bytes,
+            token: Any = None):
+        """
+        Write a record, which has already been serialized, to the journal.
+        """
+        self.sequence += 1
+        self.token = token
+        self.tokens[identity] = (self.sequence, token)
+        entry = b'{"record":' + _as_bytes(serialized_record) + \
+                b',"token":' + _as_bytes(serialize(token, as_bytes=True)) + \
+                b',"sequence":' + str(self.sequence).encode() + b'}'
+        self._write(identity, entry)
+
+    def intent(
+            self,
+            identity: str,
+            partition_name: str,
+            records: int):
+        self._write(identity, _as_bytes(serialize({"intent": partition_name, "records": records}, as_bytes=True)))
+
+    def committed(
+            self,
+            identity: str,
+            partition_name: str,
+            records: int):
+        self._write(identity, _as_bytes(serialize({"committed": partition_name, "records": records}, as_bytes=True)))
+
+    def checkpoint(
+            self,
+            identity: str):
+        """
+        Truncate the journal once all of the records in it have been
+        committed, the last token is kept.
+        """
+        journal_file = self.files.pop(identity, None)
+        if journal_file is not None:
+            journal_file.close()
+        sequence, token = self.tokens.get(identity, (0, None))
+        checkpoint = {"identity": identity, "token": token, "sequence": sequence}
+
+        # write the new journal and replace the old one in a single step
+        file_name = self._file_name(identity)
+        with open(file_name + '.tmp', 'wb') as temporary_file:
+            temporary_file.write(_as_bytes(serialize(checkpoint, as_bytes=True)) + b'\n')
+        os.replace(file_name + '.tmp', file_name)
+
+    def read(self) -> Dict[str, Tuple[List[tuple], List[tuple]]]:
+        """
+        Read the journals left by a previous Writer.
+
+        Returns:
+            dictionary
+                For each PartitionWriter identity, a list of the records and
+                their tokens, and a list of the partitions the records were
+                being committed to, with the number of records and if the
+                commit was confirmed
+        """
+        journals = {}
+        for file_name in sorted(os.listdir(self.journal_path)):
+            if not file_name.endswith(JOURNAL_EXTENSION):
+                continue
+            identity = None
+            records: List[tuple] = []
+            partitions: List[tuple] = []
+            with open(os.path.join(self.journal_path, file_name), 'rb') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = parse(line)
+                    except ValueError:
+                        # the last entry may be incomplete
+                        break
+                    if 'record' in entry:
+                        records.append((entry['record'], entry['token']))
+                    elif 'intent' in entry:
+                        partitions.append((entry['intent'], entry['records'], False))
+                    elif 'committed' in entry:
+                        partitions[-1] = (entry['committed'], entry['records'], True)
+                    else:
+                        identity = entry.get('identity')
+                    if 'sequence' in entry:
+                        self.tokens[identity] = (entry['sequence'], entry.get('token'))  # type:ignore
+                        if entry['sequence'] >= self.sequence:
+                            self.sequence = entry['sequence']
+                            self.token = entry.get('token')
+            if identity is not None:
+                journals[identity] = (records, partitions)
+        return journals
+
+    def close(self):
+        for journal_file in self.files.values():
+            journal_file.close()
+        self.files = {}
@@ -1,15 +1,37 @@
+"""
+Partition Writer
+
+Partitions are built in a spooled buffer, this holds the partition in memory
+until it exceeds the spool_size, at which point it is rolled over to a
+temporary file on disk. When the partition is committed the buffer is passed
+to the inner_writer, remote targets (GCS, MinIO) are uploaded directly from
+the buffer so partitions which fit in the spool never touch the local disk.
+
+When a sort_by column is set, records are held in a buffer of buffer_records
+records which is sorted before it is written, each buffer is written to its
+own partition(s) so every partition is internally sorted and covers a narrow
+range of the key. The range of the key in each partition is reported when it
+is committed. Setting buffer_records to 0 disables the buffering for records
+which arrive already sorted, the key range is still tracked.
+
+When a Journal is provided, records are written to the journal before they
+are written to the partition, the partition name is recorded in the journal
+before the partition is committed (see Journal).
+"""
 import lzma
 import threading
 import tempfile
-import os
-from typing import Any
+from typing import Any, Optional, Callable
 from ....logging import get_logger
 from ....utils.json import serialize
 from .base_writer import BaseWriter
+from .journal import Journal
 from ..null_writer import NullWriter
 
 BUFFER_SIZE = 128*1024  # 128kb
 PARTITION_SIZE = 32*1024*1024
+SPOOL_SIZE = 8*1024*1024
+BUFFER_RECORDS = 100000
 
 
 class PartitionWriter():
@@ -19,16 +41,48 @@ class PartitionWriter():
             *,    # force params to be named
             inner_writer: BaseWriter = NullWriter,  # type:ignore
             partition_size: int = PARTITION_SIZE,
+            spool_size: int = SPOOL_SIZE,
             compress: bool = True,
+            sort_by: Optional[str] = None,
+            buffer_records: int = BUFFER_RECORDS,
+            on_commit: Optional[Callable] = None,
+            journal: Optional[Journal] = None,
             **kwargs):
 
         self.compress = compress
         self.maximum_partition_size = partition_size
+        self.spool_size = spool_size
+        self.sort_by = sort_by
+        self.buffer_records = buffer_records if sort_by else 0
+        self.buffer: list = []
+        self.on_commit = on_commit
+        self.journal = journal
+        self.identity = kwargs.get('to_path')
+        self.flushing = False
+        self.bytes_in_partition: int = 0
+        self.records_in_partition: int = 0
         kwargs['compress'] = compress
         self.inner_writer = inner_writer(**kwargs)  # type:ignore
         self.open_partition()
 
-    def append(self, record: dict = {}):
+    def append(self, record: dict = {}, token: Any = None):
+        if self.buffer_records > 0:
+            if self.journal:
+                self.journal.record(self.identity, serialize(record, as_bytes=True), token)  # type:ignore
+            self.buffer.append(record)
+            if len(self.buffer) >= self.buffer_records:
+                # each full buffer is written as its own sorted run
+                self.commit()
+                self.open_partition()
+            return self.records_in_partition + len(self.buffer)
+        return self._write(record, token)
+
+    def _sort_key(self, record: dict):
+        # nulls are sorted after all other values
+        value = record.get(self.sort_by)  # type:ignore
+        return (value is None, value)
+
+    def _write(self, record: dict, token: Any = None, journal: bool = True):
         # serialize the record
         serialized = serialize(record, as_bytes=True) + b'\n'  # type:ignore
 
@@ -39,59 +93,153 @@ class PartitionWriter():
         if self.bytes_in_partition > self.maximum_partition_size:
             self.commit()
             self.open_partition()
+            # the record is counted in the new partition, otherwise if it is
+            # the last record the partition looks empty and isn't committed
+            self.bytes_in_partition = len(serialized) + 1
+
+        # the journal holds the records in the open partition, so the record
+        # is journaled after any commit
+        if journal and self.journal:
+            self.journal.record(self.identity, serialized[:-1], token)  # type:ignore
 
         # write the record to the file
         self.file.write(serialized)
         self.records_in_partition += 1
 
+        if self.sort_by:
+            value = record.get(self.sort_by)
+            if self.records_in_partition == 1:
+                self.minimum_key = value
+            self.maximum_key = value
+
         return self.records_in_partition
 
     def commit(self):
+        """
+        Commit the current partition, returns a summary of the partition or
+        None if the partition was empty.
+        """
+        # partitions committed while the buffer is being written don't
+        # checkpoint the journal, the rest of the buffer isn't committed yet
+        outermost = not self.flushing
+        self.flushing = True
+        try:
+            if self.buffer:
+                buffer = sorted(self.buffer, key=self._sort_key)
+                self.buffer = []
+                for record in buffer:
+                    self._write(record, journal=False)
+            summary = self._commit_partition()
+        finally:
+            if outermost:
+                self.flushing = False
+        if outermost and self.journal and summary:
+            self.journal.checkpoint(self.identity)
+        return summary
+
+    def _commit_partition(self):
+        summary = None
         if self.bytes_in_partition > 0:
             with threading.Lock():
                 try:
-                    self.file.flush()
-                    self.file.close()
+                    # closing the lzma wrapper writes the end of the stream,
+                    # it doesn't close the spool it is wrapping
+                    if self.file is not self.spool:
+                        self.file.close()
+                    self.spool.flush()
                 except ValueError:
                     pass
 
-                if self.file is not None:
-                    committed_partition_name = self.inner_writer.commit(source_file_name=self.file_name)
-                    get_logger().debug(F"Partition Committed - {committed_partition_name} - {self.records_in_partition} records, {self.bytes_in_partition} bytes")
-                    try:
-                        os.remove(self.file_name)
-                    except ValueError:
-                        pass
+                if self.spool is not None:
+                    # the spool rolls over to disk when it holds more than
+                    # spool_size bytes (compressed bytes when compressing)
+                    spooled_bytes = self.spool.tell()
+                    self.spool.seek(0)
+                    if self.journal:
+                        partition_name = self.inner_writer._build_path()
+                        self.journal.intent(self.identity, partition_name, self.records_in_partition)
+                        committed_partition_name = self.inner_writer.commit(source_file=self.spool, partition_name=partition_name)
+                        self.journal.committed(self.identity, partition_name, self.records_in_partition)
+                    else:
+                        committed_partition_name = self.inner_writer.commit(source_file=self.spool)
+                    get_logger().debug(F"Partition Committed - {committed_partition_name} - {self.records_in_partition} records, {self.bytes_in_partition} bytes, spooled to disk: {spooled_bytes > self.spool_size}")
+                    self.spool.close()
+                    summary = {
+                        "partition": committed_partition_name,
+                        "records": self.records_in_partition}
+                    if self.sort_by:
+                        summary['minimum'] = self.minimum_key
+                        summary['maximum'] = self.maximum_key
+                    if self.on_commit:
+                        self.on_commit(summary)
 
                 self.bytes_in_partition = 0
-                self.file_name = None
+                self.spool = None
+        return summary
+
+    def recover(
+            self,
+            records: list,
+            partitions: list):
+        """
+        Commit the records left in the journal by a previous writer, the
+        records in partitions which were committed are skipped.
+
+        Parameters:
+            records: list of tuples
+                The records, and their tokens, from the journal
+            partitions: list of tuples
+                The partitions the records were being committed to
+        """
+        # sorted partitions were written from the sorted buffer, the sort is
+        # stable so sorting the journal gives the same order
+        if self.sort_by:
+            records = sorted(records, key=lambda item: self._sort_key(item[0]))
+        existing = set(self.inner_writer.get_partition_list())
+        committed = sum(
+                count for name, count, confirmed in partitions
+                if confirmed or name in existing)
+        remaining = records[committed:]
+        get_logger().debug(F"Journal Recovery - {self.identity} - {committed} records committed, {len(remaining)} records to commit")
+
+        # the records are already in the journal
+        self.flushing = True
+        try:
+            for record, token in remaining:
+                self._write(record, journal=False)
+            self.commit()
+        finally:
+            self.flushing = False
+        self.journal.checkpoint(self.identity)  # type:ignore
+        self.open_partition()
+
+    def discard(self):
+        """
+        Drop the buffered records and the current partition without
+        committing them.
+        """
+        self.buffer = []
+        if self.spool is not None:
+            self.spool.close()
+        self.spool = None
+        self.bytes_in_partition = 0
 
     def open_partition(self):
-        self.file_name = self.create_temp_file_name()
-        self.file: Any = open(self.file_name, mode='wb', buffering=BUFFER_SIZE)
+        self.spool: Any = tempfile.SpooledTemporaryFile(
+                max_size=self.spool_size,
+                mode='w+b',
+                buffering=BUFFER_SIZE,
+                prefix='gva-')
+        self.file: Any = self.spool
         if self.compress:
-            self.file = lzma.open(self.file, mode='wb')
+            self.file = lzma.open(self.spool, mode='wb')
         self.bytes_in_partition = 0
         self.records_in_partition = 0
+        self.minimum_key = None
+        self.maximum_key = None
 
     def __del__(self):
         try:
             self.commit()
         except Exception as e:
             get_logger().error(f"Error whilst destroying partition - {type(e).__name__} - {e}")
-
-    def create_temp_file_name(self):
-        """
-        Create a tempfile, get the name and then deletes the tempfile.
-
-        The behaviour of tempfiles is inconsistent between operating systems,
-        this helps to ensure consistent behaviour.
-        """
-        file = tempfile.NamedTemporaryFile(prefix='gva-', delete=True)
-        file_name = file.name
-        file.close()
-        try:
-            os.remove(file_name)
-        except OSError:
-            pass
-        return file_name
@@ -1,4 +1,7 @@
+import io
 import os
+from typing import Optional
+from ...utils.json import parse, serialize
 from .internals.base_writer import BaseWriter
 try:
     from minio import Minio  # type:ignore
@@ -22,28 +25,48 @@ class MinIoWriter(BaseWriter):
 
     def commit(
             self,
-            source_file_name):
+            source_file,
+            partition_name: Optional[str] = None):
 
-        existing_items = self.get_partition_list()
-        # avoid collisions
-        collision_tests = 0
-        maybe_colliding_filename = self._build_path(collision_tests)
+        partition_name = partition_name or self._build_path()
 
-        while maybe_colliding_filename in existing_items:
-            collision_tests += 1
-            maybe_colliding_filename = self._build_path(collision_tests)
+        # put the file using the MinIO API, the API needs the length of the
+        # data so we seek to the end to find it
+        source_file.seek(0, os.SEEK_END)
+        file_size = source_file.tell()
+        source_file.seek(0)
+        self.client.put_object(
+                self.bucket,
+                partition_name,
+                source_file,
+                file_size)
 
-        # put the file using the MinIO API
-        with open(source_file_name, 'rb') as file_data:
-            file_stat = os.stat(source_file_name)
-            self.client.put_object(
-                    self.bucket,
-                    maybe_colliding_filename,
-                    file_data,
-                    file_stat.st_size)
-
-        return maybe_colliding_filename
+        return partition_name
 
     def get_partition_list(self):
         existing_items = {obj.object_name for obj in self.client.list_objects(bucket_name=self.bucket, prefix=self.filename)}
         return existing_items
+
+    def get_partition_sizes(self):
+        return {obj.object_name: obj.size for obj in self.client.list_objects(bucket_name=self.bucket, prefix=self.filename)}
+
+    def read_manifest(self):
+        if not any(self.client.list_objects(bucket_name=self.bucket, prefix=self.manifest_name)):
+            return {}
+        return parse(self.client.get_object(self.bucket, self.manifest_name).read())
+
+    def write_manifest(
+            self,
+            manifest: dict):
+        # replacing an object is atomic in MinIO
+        data = serialize(manifest, as_bytes=True)
+        self.client.put_object(
+                self.bucket,
+                self.manifest_name,
+                io.BytesIO(data),  # type:ignore
+                len(data))
+
+    def remove_partition(
+            self,
+            partition_name: str):
+        self.client.remove_object(self.bucket, partition_name)
@@ -3,6 +3,7 @@ Null Writer
 
 Impotent writer for testing, writes to the log to help with debugging.
 """
+from typing import Optional
 from ...logging import get_logger
 from .internals.base_writer import BaseWriter
 
@@ -16,9 +17,26 @@ class NullWriter(BaseWriter):
 
     def commit(
             self,
-            source_file_name):
-        get_logger().debug(f'null_writer({self.formatted_args}, source_file_name={source_file_name})')
+            source_file,
+            partition_name: Optional[str] = None):
+        get_logger().debug(f'null_writer({self.formatted_args}, source_file={source_file})')
         return "NullWriter"
 
     def get_partition_list(self):
         return []
+
+    def get_partition_sizes(self):
+        return {}
+
+    def read_manifest(self):
+        return {}
+
+    def write_manifest(
+            self,
+            manifest: dict):
+        get_logger().debug(f'null_writer({self.formatted_args}, manifest={manifest})')
+
+    def remove_partition(
+            self,
+            partition_name: str):
+        get_logger().debug(f'null_writer({self.formatted_args}, remove_partition={partition_name})')
@@ -0,0 +1,161 @@
+"""
+Sharded Writer
+
+The Writer serializes and compresses records on the caller's thread so a
+single Writer is limited to a single core. The ShardedWriter distributes
+records across a set of worker processes (shards), each shard has its own
+Writer, and therefore its own pool of partitions, so the serialization and
+compression work is spread across multiple cores.
+
+Records are sent to the shards in batches to reduce the cost of moving them
+between processes. Partition names include an identifier for the writer
+which created them, so shards writing to the same location don't collide.
+
+Parameters (other than those below) are passed to the Writer in each shard,
+where forking isn't available (e.g. Windows) these need to be picklable, so
+lambdas can't be used for 'date_exchange'.
+"""
+import queue
+import multiprocessing
+from typing import Optional
+from ..validator import Schema  # type:ignore
+from ...errors import ValidationError, InvalidCombinationError
+from ...logging import get_logger
+from .writer import Writer
+
+
+def _get_context():
+    # forked processes inherit the parameters rather than pickling them
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()  # pragma: no cover
+
+
+def _shard_process(batch_queue, writer_kwargs):
+    """
+    The process inside each shard, append the batches to a Writer until the
+    'None' sentinel is received.
+    """
+    writer = Writer(**writer_kwargs)
+    batch = batch_queue.get()
+    while batch is not None:
+        for record in batch:
+            writer.append(record)
+        batch = batch_queue.get()
+    writer.finalize()
+
+
+class ShardedWriter():
+
+    def __init__(
+            self,
+            *,
+            shards: int = 4,
+            batch_size: int = 1000,
+            schema: Optional[Schema] = None,
+            **kwargs):
+        """
+        Create a Writer which writes data records using multiple processes.
+
+        Parameters:
+            shards: integer (optional)
+                The number of worker processes to write with, the default is 4
+            batch_size: integer (optional)
+                The number of records sent to a shard at a time, the default
+                is 1000
+            schema: gva.validator.Schema (optional)
+                Schema used to test records for conformity, records are tested
+                before they are sent to the shards
+
+        Note:
+            All other parameters are passed to the Writer in each shard.
+
+        Raises:
+            InvalidCombinationError
+                The shards can't share a journal
+        """
+        if kwargs.get('journal_path'):
+            raise InvalidCombinationError("ShardedWriter does not support 'journal_path', the shards can't share a journal")
+
+        self.schema = schema
+        self.batch_size = max(batch_size, 1)
+        self.records = 0
+        self.batch: list = []
+        self.next_shard = 0
+        self.finalized = False
+
+        context = _get_context()
+        self.queues: list = []
+        self.processes: list = []
+        for shard in range(max(shards, 1)):
+            # the queues are bounded so a slow shard applies back-pressure
+            batch_queue = context.Queue(maxsize=4)
+            process = context.Process(
+                    target=_shard_process,
+                    args=(batch_queue, kwargs))
+            process.daemon = True
+            process.start()
+            self.queues.append(batch_queue)
+            self.processes.append(process)
+
+    def append(self, record: dict = {}):
+        """
+        Append a new record to the Writer
+
+        Parameters:
+            record: dictionary
+                The record to append to the Writer
+
+        Returns:
+            integer
+                The number of records appended to the Writer
+        """
+        if self.schema and not self.schema.validate(subject=record, raise_exception=False):
+            raise ValidationError(F'Schema Validation Failed ({self.schema.last_error})')
+
+        self.batch.append(record)
+        self.records += 1
+        if len(self.batch) >= self.batch_size:
+            self._send_batch()
+        return self.records
+
+    def _send_batch(self):
+        # round-robin the batches across the shards
+        shard = self.next_shard
+        self.next_shard = (self.next_shard + 1) % len(self.queues)
+        self._put(shard, self.batch)
+        self.batch = []
+
+    def _put(self, shard, item):
+        while True:
+            try:
+                self.queues[shard].put(item, timeout=1)
+                return
+            except queue.Full:
+                if not self.processes[shard].is_alive():
+                    raise RuntimeError(F"ShardedWriter shard {shard} has stopped unexpectedly")
+
+    def finalize(self):
+        """
+        Send any remaining records to the shards, then instruct each shard to
+        commit its partitions and wait for them to complete.
+        """
+        if self.finalized:
+            return
+        self.finalized = True
+        try:
+            if self.batch:
+                self._send_batch()
+            for shard in range(len(self.queues)):
+                self._put(shard, None)
+            for shard, process in enumerate(self.processes):
+                process.join()
+                if process.exitcode != 0:
+                    get_logger().error(F"ShardedWriter shard {shard} exited with code {process.exitcode}, records may have been lost")
+        except Exception as e:
+            get_logger().error(F"ShardedWriter failed to close shards {type(e).__name__} - {e}")
+
+    def __del__(self):
+        # __init__ may have failed before the shards were started
+        if not getattr(self, 'finalized', True):
+            self.finalize()
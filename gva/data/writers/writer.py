@@ -2,10 +2,11 @@ import time
 import threading
 import datetime
 from dateutil import parser
-from typing import Any
+from typing import Any, Iterable, List, Optional
 from ..validator import Schema  # type:ignore
 from ...errors import ValidationError
 from .internals.writer_pool import WriterPool
+from .internals.journal import Journal
 from ...logging import get_logger
 from ...utils import paths
 
@@ -21,6 +22,7 @@ class Writer():
             idle_timeout_seconds: int = 30,
             date_exchange: Any = None,
             writer_pool_capacity: int = 5,
+            journal_path: Optional[str] = None,
             **kwargs):
         """
         Create a Data Writer to write data records into partitions.
@@ -44,8 +46,24 @@ class Writer():
             writer_pool_capacity: integer (optional)
                 The number of writers to leave in the writers pool before 
                 writers are evicted for over capacity, default is 5
+            journal_path: string (optional)
+                A local folder to keep a write-ahead journal in, records in
+                partitions which weren't committed when the process stopped
+                are committed when a Writer is created with the same journal,
+                the default is to not keep a journal
             partition_size: integer (optional)
                 The maximum size of partitions, the default is 64Mb
+            spool_size: integer (optional)
+                The size partitions are held in memory up to before they are
+                spilled to a temporary file, the default is 8Mb
+            sort_by: string (optional)
+                Sort the records by this column before they are written, each
+                partition is sorted and covers a narrow range of the values
+                in the column, the default is to not sort
+            buffer_records: integer (optional)
+                When sort_by is set, the number of records collected and
+                sorted before being written, the default is 100,000, the
+                range of the values in each partition is returned by finalize
             inner_writer: BaseWriter (optional)
                 The component used to commit data, the default writer is the
                 NullWriter
@@ -63,6 +81,11 @@ class Writer():
         # add the values to kwargs
         kwargs['compress'] = compress
 
+        # the summary of each partition as it's committed, this includes the
+        # range of the sort_by values when sorting
+        self.committed_partitions: List[dict] = []
+        kwargs['on_commit'] = self.committed_partitions.append
+
         # to work out which member of the pool is going to accept the data
         # we define a get_date method
         self.get_date = lambda record: datetime.datetime.now()
@@ -73,12 +96,26 @@ class Writer():
         if hasattr(date_exchange, '__call__'):
             self.get_date = date_exchange  # type:ignore
 
+        self.journal = None
+        if journal_path:
+            self.journal = Journal(journal_path)
+            kwargs['journal'] = self.journal
+
+        # appends and the background thread both use the pool (and the
+        # journal), one lock is held for the Writer
+        self.lock = threading.Lock()
+
         # we have a pool of writers of size maximum_writers
         self.writer_pool_capacity = writer_pool_capacity
         self.writer_pool = WriterPool(
                 pool_size=writer_pool_capacity,
                 **kwargs)
 
+        # commit the records a previous writer left in the journal
+        if self.journal:
+            for identity, (records, partitions) in self.journal.read().items():
+                self.writer_pool.get_writer(identity).recover(records, partitions)
+
         # establish the background thread which manages the pool
         self.thread = threading.Thread(target=self.worker_thread)
         self.thread.daemon = True
@@ -89,13 +126,17 @@ class Writer():
         self.wipe_existing_partitions = bool(kwargs.get('wipe_existing_records', False))
 
 
-    def append(self, record: dict = {}):
+    def append(self, record: dict = {}, token: Any = None):
         """
         Append a new record to the Writer
 
         Parameters:
             record: dictionary
                 The record to append to the Writer
+            token: any (optional)
+                A value identifying the record in the upstream system (e.g.
+                an offset), this is kept in the journal so reading can be
+                resumed, see resume_token
 
         Returns:
             integer
@@ -104,7 +145,39 @@ class Writer():
         # Check the new record conforms to the schema before continuing
         if self.schema and not self.schema.validate(subject=record, raise_exception=False):
             raise ValidationError(F'Schema Validation Failed ({self.schema.last_error})')
+        return self._write(record, token)
 
+    def append_many(self, records: Iterable[dict], tokens: Optional[Iterable[Any]] = None):
+        """
+        Append many records to the Writer, the records are validated together
+        (see Schema.validate_many) and none of them are appended if any of
+        them don't conform to the schema.
+
+        Parameters:
+            records: iterable of dictionaries
+                The records to append to the Writer
+            tokens: iterable (optional)
+                A token for each record, see append
+
+        Returns:
+            integer
+                The number of records appended
+        """
+        records = list(records)
+        if self.schema:
+            failures = [
+                    F'record {index} - {error}'
+                    for index, (valid, error) in enumerate(self.schema.validate_many(records))
+                    if not valid]
+            if failures:
+                raise ValidationError(F'Schema Validation Failed ({len(failures)} records) ({"".join(failures)})')
+        if tokens is None:
+            tokens = [None] * len(records)
+        for record, token in zip(records, tokens):
+            self._write(record, token)
+        return len(records)
+
+    def _write(self, record: dict, token: Any):
         # get the appropritate writer from the pool and append the record
         # the writer identity is the base of the path where the partitions
         # are written.
@@ -113,26 +186,48 @@ class Writer():
             data_date = parser.parse(data_date, yearfirst=True)
         identity = paths.date_format(self.to_path, data_date)
 
-        with threading.Lock():
+        with self.lock:
             partition_writer = self.writer_pool.get_writer(identity)
-            return partition_writer.append(record)
+            return partition_writer.append(record, token)
+
+    @property
+    def resume_token(self):
+        """
+        The token of the last record written to the journal, after a restart
+        the upstream system can be read from after this token. None if there
+        is no journal or no tokens have been provided.
+        """
+        if self.journal:
+            return self.journal.token
+        return None
 
     def __del__(self):
         self.finalize()
 
-    def finalize(self):
+    def finalize(self) -> List[dict]:
+        """
+        Commit the open partitions and close the Writer.
+
+        Returns:
+            list of dictionaries
+                A summary of each partition committed by the Writer, the
+                partition name and number of records, and when sort_by is
+                set the minimum and maximum values in the partition
+        """
         try:
             self.writer_pool.close()
+            if self.journal:
+                self.journal.close()
         except Exception as e:
             get_logger().error(F"Writer failed to close pool {type(e).__name__} - {e}")
-            pass
+        return self.committed_partitions
 
     def worker_thread(self):
         """
         Writer Pool Management
         """
         while True:
-            with threading.Lock():
+            with self.lock:
                 # search for pool occupants who haven't had a write recently
                 for partition_writer_identity in self.writer_pool.get_stale_writers(self.idle_timeout_seconds):
                     get_logger().debug(F'Evicting {partition_writer_identity} from the writer pool due to inactivity - limit is {self.idle_timeout_seconds} seconds')
@@ -1,10 +1,17 @@
-from typing import Union, List
+from typing import Union, List, Iterable, Optional
 import uuid
+import types
 import random
+import itertools
+import concurrent.futures
 from ..utils import TraceBlocks
 from ..logging import get_logger
+from ..data.formats.internals import parallel_chunks
 from .bins import FileBin, MinioBin, GoogleCloudStorageBin
 
+# the sensors which are collected from processes by run_many
+SENSORS = ('records_processed', 'errors', 'execution_time_ns')
+
 
 class Flow():
     """
@@ -14,12 +21,17 @@ class Flow():
     def __init__(self):
         self.nodes = {}
         self.edges = [] 
+        self._compiled = None
+        self._compiled_shape = None
+        self._compiled_nodes = {}
 
     def add_operator(self, name, operator):
         self.nodes[name] = operator
+        self._compiled = None
 
     def link_operators(self, source_operator, target_operator):
         self.edges.append((source_operator, target_operator))
+        self._compiled = None
 
     def get_outgoing_links(self, name):
         return [target for source,target in self.edges if source == name]
@@ -34,6 +46,49 @@ class Flow():
     def merge(self, assimilatee):
         self.nodes = {**self.nodes, **assimilatee.nodes}
         self.edges += assimilatee.edges
+        self._compiled = None
+
+    def _compile(self):
+        """
+        Build the graph the flow is run over, each node holds its operator and
+        the nodes its outgoing links point to, so running a message doesn't
+        search the edges. The flow is checked to be a DAG (in topological
+        order) and the error writer attached, once rather than per message.
+        """
+        nodes = {}
+        for name, operator in self.nodes.items():
+            if operator is None:
+                raise Exception(F"Invalid Flow - operation {name} is invalid")
+            if not hasattr(operator, "error_writer") and hasattr(self, "error_writer"):
+                operator.error_writer = self.error_writer  # type:ignore
+            nodes[name] = _Node(name, operator)
+        incoming = {node: 0 for node in nodes.values()}
+        for source, target in self.edges:
+            if source not in nodes or target not in nodes:
+                missing = source if source not in nodes else target
+                raise Exception(F"Invalid Flow - operation {missing} is invalid")
+            nodes[source].targets += (nodes[target],)
+            incoming[nodes[target]] += 1
+
+        # Kahn's algorithm, operators left over are in a cycle
+        ready = [node for node, count in incoming.items() if count == 0]
+        entry_points = list(ready)
+        ordered = 0
+        while ready:
+            node = ready.pop()
+            ordered += 1
+            for target in node.targets:
+                incoming[target] -= 1
+                if incoming[target] == 0:
+                    ready.append(target)
+        if ordered < len(nodes):
+            raise Exception("Invalid Flow - the flow has a cycle")
+
+        self._compiled = entry_points
+        self._compiled_nodes = nodes
+        # the nodes and edges are public, so changes are also spotted by size
+        self._compiled_shape = (len(self.nodes), len(self.edges))
+        return entry_points
 
     def run(
             self,
@@ -53,6 +108,191 @@ class Flow():
                 The sample for for to emit trace messages for, default is 
                 1/1000.
         """
+        self._prepare_context(context, trace_sample_rate)
+
+        # start the flow, walk from the nodes with no incoming links
+        self._inner_runner(data=data, context=context)
+
+        # if being traced, send the trace to the trace writer
+        self._write_trace(context)
+
+    def run_batch(
+            self,
+            records: Iterable,
+            context: Optional[dict] = None,
+            batch_size: int = 1000,
+            trace_sample_rate: float = 1/1000):
+        """
+        Run the flow for many data objects, passing them through the flow in
+        batches rather than one at a time.
+
+        Each operator is run once for each batch (see BaseOperator.call_batch),
+        operators which implement `execute_batch` process the batch together,
+        other operators run `execute` for each message in the batch.
+
+        Parameters:
+            records: iterable
+                The data objects the flow is to process
+            context: dictionary (optional)
+                Additional information to support the processing of the data,
+                each data object is given its own copy
+            batch_size: integer (optional)
+                The number of data objects in each batch, default is 1000
+            trace_sample_rate: float (optional)
+                The sample for for to emit trace messages for, default is 
+                1/1000.
+        """
+        iterator = iter(records)
+        batch = list(itertools.islice(iterator, batch_size))
+        while batch:
+            messages = []
+            for data in batch:
+                message_context = dict(context or {})
+                self._prepare_context(message_context, trace_sample_rate)
+                messages.append((data, message_context))
+
+            self._batch_runner(messages)
+
+            for data, message_context in messages:
+                self._write_trace(message_context)
+            batch = list(itertools.islice(iterator, batch_size))
+
+    def run_many(
+            self,
+            messages: Iterable,
+            context: Optional[dict] = None,
+            workers: int = 4,
+            mode: str = 'thread',
+            pin_stateful: bool = True,
+            chunk_size: int = 100,
+            trace_sample_rate: float = 1/1000):
+        """
+        Run the flow for many data objects concurrently, each data object is
+        run through the flow independently (as `run`), only a few data
+        objects for each worker are read ahead of them being run.
+
+        Threads suit flows which wait on I/O (e.g. writing to buckets),
+        processes suit flows which use the CPU, in processes each process
+        has its own copy of the operators and the sensors are collected from
+        the processes.
+
+        Stateful operators (e.g. the Save operators) are pinned to a single
+        worker, with threads they are run on one thread, with processes the
+        messages which reach them are sent back and they are run in this
+        process. Operators which aren't pinned run in more than one worker,
+        with processes that means they aren't finalized.
+
+        Parameters:
+            messages: iterable
+                The data objects the flow is to process
+            context: dictionary (optional)
+                Additional information to support the processing of the data,
+                each data object is given its own copy
+            workers: integer (optional)
+                The number of threads or processes, default is 4
+            mode: string (optional)
+                'thread' (the default) or 'process'
+            pin_stateful: boolean (optional)
+                Run stateful operators on a single worker, default is True
+            chunk_size: integer (optional)
+                The number of data objects sent to a process at a time, the
+                default is 100, this isn't used with threads
+            trace_sample_rate: float (optional)
+                The sample for for to emit trace messages for, default is 
+                1/1000.
+
+        Raises:
+            ValueError
+                If the mode isn't 'thread' or 'process'
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError("run_many mode must be 'thread' or 'process'")
+        if self._compiled is None or self._compiled_shape != (len(self.nodes), len(self.edges)):
+            self._compile()
+        pinned_names = []
+        if pin_stateful:
+            pinned_names = [name for name, node in self._compiled_nodes.items()
+                            if getattr(node.operator, 'stateful', False)]
+        if mode == 'thread':
+            self._run_threads(messages, context, workers, pinned_names, trace_sample_rate)
+        else:
+            self._run_processes(messages, context, workers, pinned_names, chunk_size, trace_sample_rate)
+
+    def _run_threads(self, messages, context, workers, pinned_names, trace_sample_rate):
+        pinned = {}
+        pinned_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        for name in pinned_names:
+            pinned[self._compiled_nodes[name]] = lambda node, data, context: \
+                    pinned_executor.submit(_call_operator, node.operator, data, context).result()
+
+        def _run_message(data):
+            message_context = dict(context or {})
+            self._prepare_context(message_context, trace_sample_rate)
+            self._inner_runner(data=data, context=message_context, pinned=pinned)
+            self._write_trace(message_context)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        in_flight = workers * 2
+        pending: set = set()
+        try:
+            for data in messages:
+                pending.add(executor.submit(_run_message, data))
+                if len(pending) >= in_flight:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            for future in concurrent.futures.as_completed(pending):
+                future.result()
+        finally:
+            # shutdown's cancel_futures isn't available before Python 3.9
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            pinned_executor.shutdown(wait=True)
+
+    def _run_processes(self, messages, context, workers, pinned_names, chunk_size, trace_sample_rate):
+
+        def _run_chunk(chunk):
+            # this runs in the worker processes, the messages which reach a
+            # pinned operator are returned rather than run
+            handed_over: list = []
+            pinned = {
+                self._compiled_nodes[name]: lambda node, data, context: handed_over.append((node.name, data, context))
+                for name in pinned_names}
+            before = self._read_counters()
+            for data in chunk:
+                message_context = dict(context or {})
+                self._prepare_context(message_context, trace_sample_rate)
+                handed_over_before = len(handed_over)
+                self._inner_runner(data=data, context=message_context, pinned=pinned)
+                if len(handed_over) == handed_over_before:
+                    self._write_trace(message_context)
+            after = self._read_counters()
+            changes = {name: [a - b for a, b in zip(after[name], before[name])] for name in after}
+            return [(handed_over, changes)]
+
+        for handed_over, changes in parallel_chunks(
+                messages,
+                _run_chunk,
+                workers=workers,
+                chunk_size=chunk_size,
+                ordered=False):
+            for name, values in changes.items():
+                operator = self._compiled_nodes[name].operator
+                with operator._sensor_lock:
+                    for sensor, value in zip(SENSORS, values):
+                        setattr(operator, sensor, getattr(operator, sensor) + value)
+            for name, data, message_context in handed_over:
+                self._inner_runner(data=data, context=message_context, start=[self._compiled_nodes[name]])
+                self._write_trace(message_context)
+
+    def _read_counters(self):
+        return {
+            name: [getattr(node.operator, sensor) for sensor in SENSORS]
+            for name, node in self._compiled_nodes.items()
+            if all(hasattr(node.operator, sensor) for sensor in SENSORS)}
+
+    def _prepare_context(self, context: dict, trace_sample_rate: float):
         # create a uuid for the message if it doesn't already have one
         if not context.get('uuid'):
             context['uuid'] = str(uuid.uuid4())
@@ -65,43 +305,95 @@ class Flow():
         if not context.get('trace') and trace_sample_rate:
             context['trace'] = random.randint(1, round(1 / trace_sample_rate)) == 1  # nosec
 
-        # start the flow, walk from the nodes with no incoming links
-        for operator_name in self.get_entry_points():
-            self._inner_runner(operator_name=operator_name, data=data, context=context)
-
-        # if being traced, send the trace to the trace writer
+    def _write_trace(self, context: dict):
         if context.get('trace', False) and hasattr(self, 'trace_writer'):
             self.trace_writer(context['execution_trace'], id_=str(context.get('uuid')))  #type:ignore
 
 
     def _inner_runner(
             self,
-            operator_name: str = None,
             data: dict = {},
-            context: dict = {}):
+            context: dict = {},
+            start: Optional[list] = None,
+            pinned: Optional[dict] = None):
         """
         Walk the dag/flow by:
-        - Getting the function of the current node
-        - Execute the function, wrapped in the base class
-        - Find the next step by finding outgoing edges
-        - Call this method for the next step
+        - Getting the operator of the current node
+        - Execute the operator, wrapped in the base class
+        - Send the outcome to the nodes the outgoing edges link to
+
+        The walk is depth-first, in the same order as recursing along the
+        edges would be, but uses a stack of pending messages so long flows
+        and large fan-outs don't reach the recursion limit. Generators are
+        read lazily, a message is finished before the next is read.
+
+        The walk starts at the entry points unless start nodes are given,
+        pinned nodes are run by calling their handler rather than the
+        operator (see run_many).
         """
-        operator = self.get_operator(operator_name)
-        if operator is None:
-            raise Exception(F"Invalid Flow - operation {operator_name} is invalid")
-        if not hasattr(operator, "error_writer") and hasattr(self, "error_writer"):
-            operator.error_writer = self.error_writer  # type:ignore
-        out_going_links = self.get_outgoing_links(operator_name)
+        entry_points = self._compiled
+        if entry_points is None or self._compiled_shape != (len(self.nodes), len(self.edges)):
+            entry_points = self._compile()
 
-        outcome = operator(data, context)
+        stack = [iter([(node, data, context) for node in (start or entry_points)])]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            node, data, context = item
+            # follow single links without using the stack
+            while True:
+                if pinned and node in pinned:
+                    outcome = pinned[node](node, data, context)
+                else:
+                    outcome = node.operator(data, context)
+                if not outcome:
+                    break
+                targets = node.targets
+                if isinstance(outcome, MANY_OUTCOMES):
+                    # the messages may share a context, so each gets a copy
+                    stack.append(_fan_out(outcome, targets))
+                    break
+                if len(targets) == 1:
+                    data, context = outcome
+                    node = targets[0]
+                    continue
+                if targets:
+                    stack.append(_fan_out((outcome,), targets))
+                break
+
+
+    def _batch_runner(self, messages: list):
+        """
+        Walk the dag/flow with a batch of messages, each operator is run for
+        the whole batch before the operators after it.
+        """
+        entry_points = self._compiled
+        if entry_points is None or self._compiled_shape != (len(self.nodes), len(self.edges)):
+            entry_points = self._compile()
 
-        if outcome:
-            if not type(outcome).__name__ in ["generator", "list"]:
-                outcome_data, outcome_context = outcome
-                outcome = [(outcome_data, outcome_context)]
-            for outcome_data, outcome_context in outcome:
-                for operator_name in out_going_links:
-                    self._inner_runner(operator_name=operator_name, data=outcome_data, context=outcome_context.copy())
+        stack = [(node, messages) for node in reversed(entry_points)]
+        while stack:
+            node, batch = stack.pop()
+            operator = node.operator
+            if hasattr(operator, 'call_batch'):
+                outcomes = operator.call_batch(batch)
+            else:
+                outcomes = []
+                for data, context in batch:
+                    outcome = operator(data, context)
+                    if not outcome:
+                        continue
+                    if isinstance(outcome, MANY_OUTCOMES):
+                        outcomes.extend(outcome)
+                    else:
+                        outcomes.append(outcome)
+            if not outcomes:
+                continue
+            for target in reversed(node.targets):
+                # messages may share a context, so each gets a copy
+                stack.append((target, [(data, context.copy()) for data, context in outcomes]))
 
 
     def finalize(self):
@@ -157,10 +449,38 @@ class Flow():
                 setattr(operator, str(writer.name), writer)
                 logger.debug(F"added {writer.name} to {type(operator).__name__}")
             setattr(self, str(writer.name), writer)
+            self._compiled = None
             return True
         except Exception as err:
             logger.error(F"Failed to add writer to flow - {type(err).__name__} - {err}")
             return False
 
 
+# outcomes which are many messages rather than a (data, context) tuple
+MANY_OUTCOMES = (types.GeneratorType, list)
+
+
+class _Node():
+    __slots__ = ('name', 'operator', 'targets')
+
+    def __init__(self, name, operator):
+        self.name = name
+        self.operator = operator
+        self.targets: tuple = ()
+
+
+def _fan_out(messages, targets):
+    """
+    Each message for each target, each with its own copy of the context.
+    """
+    for data, context in messages:
+        for target in targets:
+            yield target, data, context.copy()
+
 
+def _call_operator(operator, data, context):
+    # generators are read here, so the operator runs on this thread
+    outcome = operator(data, context)
+    if isinstance(outcome, types.GeneratorType):
+        return list(outcome)
+    return outcome
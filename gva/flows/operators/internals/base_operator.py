@@ -19,8 +19,10 @@ import re
 import string
 import types
 import sys
+import threading
+import collections
 from ....logging import get_logger  # type:ignore
-from typing import Union, List
+from typing import Union, List, Tuple
 from ....errors import RenderErrorStack, IntegrityError
 from ....data.formats import dictset
 from ....utils.json import parse, serialize
@@ -31,6 +33,11 @@ from ...flow import Flow
 # interited from
 class BaseOperator(abc.ABC):
 
+    # operators which hold state which can't be shared between threads or
+    # processes (e.g. writers) set this so Flow.run_many can pin them to a
+    # single worker
+    stateful = False
+
     def __init__(self, **kwargs):
         """
         Operator Base Class
@@ -61,12 +68,15 @@ class BaseOperator(abc.ABC):
         self.commencement_time = None   # the time processing started
         self.first_run = True           # so some things only run once
         self.logger = get_logger()      # get the GVA logger
+        self._sensor_lock = threading.Lock()  # flows can be run on many threads
 
         # read retry settings, clamp values to practical ranges
         self.retry_count = self._clamp(kwargs.get('retry_count', 2), 1, 5)
         self.retry_wait = self._clamp(kwargs.get('retry_wait', 5), 1, 300)
         rolling_failure_window = self._clamp(kwargs.get('rolling_failure_window', 10), 1, 100)
-        self.last_few_results = [1] * rolling_failure_window  # track the last n results
+        # track the last n results, and the number of failures in them
+        self.last_few_results = collections.deque([1] * rolling_failure_window, maxlen=rolling_failure_window)
+        self.recent_failures = 0
 
         # Log the hashes of the __call__ and version methods
         call_hash = self.hash(inspect.getsource(self.__call__))[-12:]    
@@ -90,6 +100,30 @@ class BaseOperator(abc.ABC):
         """
         raise NotImplementedError("execute method must be overridden")  # pragma: no cover
 
+    def execute_batch(self, batch: List[Tuple[dict, dict]]) -> List[Tuple[dict, dict]]:
+        """
+        Override this method to process a batch of messages at a time, when
+        the flow is run in batches (see Flow.run_batch).
+
+        It should expect a list of (data, context) tuples and return a list
+        of (data, context) tuples for the next operator. The default runs
+        `execute` for each message.
+
+        Overrides must be all-or-nothing, if an error is raised none of the
+        messages in the batch should have been processed (e.g. written), as
+        the batch is retried and then each message is run on its own.
+        """
+        outcomes: List[Tuple[dict, dict]] = []
+        for data, context in batch:
+            outcome = self.execute(data, context)
+            if not outcome:
+                continue
+            if isinstance(outcome, (list, types.GeneratorType)):
+                outcomes.extend(outcome)
+            else:
+                outcomes.append(outcome)
+        return outcomes
+
     def __call__(self, data: dict = {}, context: dict = {}):
         """
         DO NOT OVERRIDE THIS METHOD
@@ -100,20 +134,21 @@ class BaseOperator(abc.ABC):
         if self.first_run:
             self.first_run = False
             self.commencement_time = datetime.datetime.now()
-        self.records_processed += 1
         attempts_to_go = self.retry_count
         while attempts_to_go > 0:
             try:
                 start_time = time.perf_counter_ns()
                 outcome = self.execute(data, context)
                 my_execution_time = time.perf_counter_ns() - start_time
-                self.execution_time_ns += my_execution_time
-                # add a success to the last_few_results list
-                self.last_few_results.append(1)
-                self.last_few_results.pop(0)
+                with self._sensor_lock:
+                    self.records_processed += 1
+                    self.execution_time_ns += my_execution_time
+                    # add a success to the last_few_results list
+                    self._record_result(1)
                 break
             except Exception as err:
-                self.errors += 1
+                with self._sensor_lock:
+                    self.errors += 1
                 attempts_to_go -= 1
                 if attempts_to_go:
                     self.logger.error(F"{self.__class__.__name__} - {type(err).__name__} - {err} - retry in {self.retry_wait} seconds ({context.get('uuid')})")
@@ -142,8 +177,9 @@ class BaseOperator(abc.ABC):
                         self.logger.critical(F"{self.__class__.__name__} - {type(error_reference).__name__} - {error_reference} - tried {self.retry_count} times before aborting ({context.get('uuid')}) {error_log_reference}")
                     outcome = None
                     # add a failure to the last_few_results list
-                    self.last_few_results.append(0)
-                    self.last_few_results.pop(0)
+                    with self._sensor_lock:
+                        self.records_processed += 1
+                        self._record_result(0)
 
         # message tracing
         if context.get('trace', False):
@@ -156,12 +192,96 @@ class BaseOperator(abc.ABC):
             self.logger.trace(F"{context.get('uuid')} {self.__class__.__name__} {data_hash}")
 
         # if there is a high failure rate, abort
-        if sum(self.last_few_results) < (len(self.last_few_results) / 2):
-            self.logger.alert(F"Failure Rate for {self.__class__.__name__} over last {len(self.last_few_results)} executions is over 50%, aborting.")
-            sys.exit(1)
+        self._check_failure_rate()
 
         return outcome
 
+    def call_batch(self, batch: List[Tuple[dict, dict]]) -> List[Tuple[dict, dict]]:
+        """
+        DO NOT OVERRIDE THIS METHOD
+
+        This method wraps the `execute_batch` method to add management of the
+        execution, the sensors and retries are for the batch rather than for
+        each message. If the batch fails on every attempt, the messages are
+        run one at a time (see `__call__`) so only the messages which fail
+        are lost (and written to the error bin).
+
+        Operators which don't override `execute_batch` run each message with
+        `__call__`, so a failure only retries the message which failed and
+        the messages before it aren't run again.
+        """
+        if type(self).execute_batch is BaseOperator.execute_batch:
+            return self._call_each(batch)
+
+        if self.first_run:
+            self.first_run = False
+            self.commencement_time = datetime.datetime.now()
+        attempts_to_go = self.retry_count
+        failed_attempts = 0
+        while attempts_to_go > 0:
+            try:
+                start_time = time.perf_counter_ns()
+                outcomes = self.execute_batch(batch)
+                my_execution_time = time.perf_counter_ns() - start_time
+                with self._sensor_lock:
+                    self.errors += failed_attempts
+                    self.execution_time_ns += my_execution_time
+                    self.records_processed += len(batch)
+                    self._record_result(1)
+                break
+            except Exception as err:
+                failed_attempts += 1
+                attempts_to_go -= 1
+                if attempts_to_go:
+                    self.logger.error(F"{self.__class__.__name__} - {type(err).__name__} - {err} - batch of {len(batch)} retry in {self.retry_wait} seconds")
+                    time.sleep(self.retry_wait)
+                else:
+                    # the errors are counted as the messages are run, so
+                    # the failed batch isn't counted as well
+                    self.logger.error(F"{self.__class__.__name__} - {type(err).__name__} - {err} - batch of {len(batch)} tried {self.retry_count} times, running messages individually")
+                    return self._call_each(batch)
+
+        # message tracing, the execution time is shared between the messages
+        for data, context in batch:
+            if context.get('trace', False):
+                data_hash = self.hash(data)
+                context['execution_trace'].add_block(data_hash=data_hash,
+                                                     operator=self.__class__.__name__,
+                                                     operator_version=self.version(),
+                                                     execution_ns=my_execution_time // len(batch),
+                                                     data_block=serialize(data))
+                self.logger.trace(F"{context.get('uuid')} {self.__class__.__name__} {data_hash}")
+
+        self._check_failure_rate()
+
+        return outcomes
+
+    def _call_each(self, batch: List[Tuple[dict, dict]]) -> List[Tuple[dict, dict]]:
+        # run each message in the batch with the retries, sensors and tracing
+        # of a single message
+        outcomes: List[Tuple[dict, dict]] = []
+        for data, context in batch:
+            outcome = self(data, context)
+            if not outcome:
+                continue
+            if isinstance(outcome, (list, types.GeneratorType)):
+                outcomes.extend(outcome)
+            else:
+                outcomes.append(outcome)
+        return outcomes
+
+    def _record_result(self, result: int):
+        # call holding the sensor lock, the result falling out of the window is the first one
+        if len(self.last_few_results) == self.last_few_results.maxlen:
+            self.recent_failures -= 1 - self.last_few_results[0]
+        self.last_few_results.append(result)
+        self.recent_failures += 1 - result
+
+    def _check_failure_rate(self):
+        if self.recent_failures > (len(self.last_few_results) / 2):
+            self.logger.alert(F"Failure Rate for {self.__class__.__name__} over last {len(self.last_few_results)} executions is over 50%, aborting.")
+            sys.exit(1)
+
     def read_sensors(self):
         """
         Format data about the transformation, this can be overridden but it
@@ -19,3 +19,9 @@ class NoOpOperator(BaseOperator):
         if self.print_message:
             print(self.__class__.__name__)
         return data, context
+
+    def execute_batch(self, batch):
+        if self.print_message:
+            for message in batch:
+                print(self.__class__.__name__)
+        return batch
@@ -18,9 +18,8 @@ as 7-zip and lzma.exe so is not dependant on the Reader library to be read.
 The .lzma extension is added automatically, it will be added twice if
 specified as part of the to_path.
 
-The Writer will avoid clashes in filenames by appending a a four digit
-number to the end of the filename, starting 0000. If 0000 already exists
-it will use 0001, etc to 9999.
+The Writer will avoid clashes in filenames by appending a time-ordered
+unique suffix to the end of the filename.
 
 If to_path contains date placeholders, (e.g. %date), within a few seconds
 of midnight, the Writer will conclude it's current file and create a new
@@ -42,6 +41,8 @@ import datetime
 
 class SaveToBucketOperator(BaseOperator):
 
+    stateful = True
+
     def __init__(
             self,
             *,
@@ -6,6 +6,8 @@ import datetime
 
 class SaveToDiskOperator(BaseOperator):
 
+    stateful = True
+
     def __init__(
             self,
             *,
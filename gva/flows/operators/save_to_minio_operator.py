@@ -6,6 +6,8 @@ import datetime
 
 class SaveToMinIoOperator(BaseOperator):
 
+    stateful = True
+
     def __init__(
             self,
             *,
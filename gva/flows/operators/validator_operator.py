@@ -5,7 +5,7 @@ Checks a dictionary against a schema.
 """
 from .internals.base_operator import BaseOperator
 from gva.data.validator import Schema   # type:ignore
-from typing import Any
+from typing import Any, List, Tuple
 
 
 class ValidatorOperator(BaseOperator):
@@ -18,7 +18,18 @@ class ValidatorOperator(BaseOperator):
     def execute(self, data={}, context={}):
         valid = self.validator(subject=data)
         if not valid:
-            self.errors += 1
+            with self._sensor_lock:
+                self.errors += 1
             return None
         else:
             return data, context
+
+    def execute_batch(self, batch: List[Tuple[dict, dict]]):
+        """
+        Validate a list of (data, context) together, returns the valid ones.
+        """
+        results = self.validator.validate_many([data for data, context in batch])
+        valid = [message for message, (passed, error) in zip(batch, results) if passed]
+        with self._sensor_lock:
+            self.errors += len(batch) - len(valid)
+        return valid
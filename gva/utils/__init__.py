@@ -1,2 +1,3 @@
 from .trace_blocks import TraceBlocks
 from .lru_index import LRU_Index
+from .hyper_log_log import HyperLogLog
@@ -0,0 +1,98 @@
+"""
+HyperLogLog
+
+Estimates the number of distinct values in a set without holding the values,
+the sketch is an array of 2^precision single-byte registers, so the default
+precision of 12 uses 4Kb of memory regardless of the number of values. The
+standard error of the estimate is 1.04/sqrt(2^precision), about 1.6% at the
+default precision.
+
+Sketches can be merged, the merged sketch estimates the number of distinct
+values across all of the values added to either sketch - so sketches can be
+created for each day and combined to estimate the distinct values for a week.
+Sketches can be saved and loaded with to_bytes and from_bytes.
+
+Values are hashed using blake2b over their JSON representation so the hashes
+are the same between processes and sessions, which is required for merging
+sketches created at different times.
+"""
+import math
+import hashlib
+from typing import Any
+from .json import serialize
+
+
+class HyperLogLog(object):
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError('HyperLogLog precision must be between 4 and 18')
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @staticmethod
+    def _hash(value: Any) -> int:
+        try:
+            data = serialize(value, as_bytes=True)
+        except TypeError:
+            data = str(value).encode()
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')  # type:ignore
+
+    def add(self, value: Any):
+        """
+        Add a value to the sketch, nulls (None) are ignored.
+        """
+        if value is None:
+            return
+        item_hash = self._hash(value)
+        # the first bits select the register, the rank is the position of the
+        # first set bit in the remaining bits
+        index = item_hash >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = item_hash & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """
+        Estimate the number of distinct values added to the sketch.
+        """
+        registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        if registers == 16:
+            alpha = 0.673
+        elif registers == 32:
+            alpha = 0.697
+        elif registers == 64:
+            alpha = 0.709
+
+        estimate = alpha * registers * registers / sum(2.0 ** -register for register in self.registers)
+
+        # small cardinalities are better estimated from the empty registers
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * registers and empty_registers > 0:
+            estimate = registers * math.log(registers / empty_registers)
+        return round(estimate)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """
+        Merge another sketch into this sketch.
+        """
+        if other.precision != self.precision:
+            raise ValueError('HyperLogLog sketches must have the same precision to be merged')
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        sketch = cls(precision=data[0])
+        if len(data) != len(sketch.registers) + 1:
+            raise ValueError('HyperLogLog data is not the expected length')
+        sketch.registers = bytearray(data[1:])
+        return sketch
@@ -10,26 +10,33 @@ The naive solution is remembering if a value was in the last 'size'
 items, regardless of the number of times each item has been seen;
 this code implements a solution where the last 'size' unique values
 are remembered.
+
+The hashes are held in an OrderedDict, ordered from the least to the most
+recently seen, so testing, refreshing and ejecting items are all O(1).
 """
-from typing import Any, List, Optional
+from collections import OrderedDict
+from typing import Any
+
 
 class LRU_Index(object):
 
-    __slots__ = ('hash_list')
+    __slots__ = ('hash_list', 'size')
 
     def __init__(self, size: int = 1000):
-        self.hash_list: List[Optional[int]] = [None] * size
+        self.size = size
+        self.hash_list: OrderedDict = OrderedDict()
 
     def test(self, item: Any):
         item_hash = hash(item)
 
         if item_hash in self.hash_list:
-            item_index = self.hash_list.index(item_hash)
-            self.hash_list[:] = [item_hash] + self.hash_list[:item_index] + self.hash_list[item_index+1:]  # type:ignore
-            self.hash_list.append(self.hash_list.pop(0))
+            # refresh the item, so it is the most recently seen
+            self.hash_list.move_to_end(item_hash)
             return True
-        self.hash_list[0] = item_hash
-        self.hash_list.append(self.hash_list.pop(0))
+        self.hash_list[item_hash] = True
+        if len(self.hash_list) > self.size:
+            # eject the least recently seen item
+            self.hash_list.popitem(last=False)
         return False
 
     def __call__(self, item: Any):
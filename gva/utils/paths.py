@@ -3,6 +3,10 @@ Functions to help with handling file paths
 """
 import datetime
 
+# the manifest of partitions which are being rewritten (e.g. compaction), it is
+# kept in the folder with the partitions, see BaseWriter
+MANIFEST_NAME = '_manifest.json'
+
 
 def split_filename(filename: str):
     """ see test cases for all handled edge cases """
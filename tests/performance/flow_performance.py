@@ -0,0 +1,99 @@
+"""
+Measures the per-record overhead of running messages through a chain of
+operators, comparing the recursive runner (which searched the edges for each
+operator for each message) with the compiled runner, and with running the
+messages in batches (run_batch).
+
+for 10,000 messages through a chain of 20 NoOpOperators:
+
+    recursive : 0.63
+    compiled  : 0.29
+    batched   : 0.13
+
+and running messages which wait on I/O on threads (run_many), for 1,000
+messages which each wait 1ms:
+
+    sequential (I/O) : 1.14
+    threaded (I/O)   : 0.14
+"""
+import time
+import sys
+import os
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from gva.flows import Flow
+from gva.flows import BaseOperator
+from gva.flows.operators import NoOpOperator
+
+
+class WaitOperator(BaseOperator):
+    # stands in for an operator which waits on I/O
+    def execute(self, data, context):
+        time.sleep(0.001)
+        return data, context
+
+
+def build_flow(length):
+    flow = Flow()
+    for i in range(length):
+        flow.add_operator(f'op-{i}', NoOpOperator())
+        if i:
+            flow.link_operators(f'op-{i - 1}', f'op-{i}')
+    return flow
+
+
+def recursive_run(flow, operator_name, data, context):
+    # the runner before the flow was compiled
+    operator = flow.get_operator(operator_name)
+    if not hasattr(operator, "error_writer") and hasattr(flow, "error_writer"):
+        operator.error_writer = flow.error_writer
+    out_going_links = flow.get_outgoing_links(operator_name)
+    outcome = operator(data, context)
+    if outcome:
+        if not type(outcome).__name__ in ["generator", "list"]:
+            outcome = [outcome]
+        for outcome_data, outcome_context in outcome:
+            for operator_name in out_going_links:
+                recursive_run(flow, operator_name, outcome_data, outcome_context.copy())
+
+
+def recursive(flow, messages):
+    for message in range(messages):
+        for operator_name in flow.get_entry_points():
+            recursive_run(flow, operator_name, message, {})
+
+
+def compiled(flow, messages):
+    for message in range(messages):
+        flow._inner_runner(data=message, context={})
+
+
+def batched(flow, messages):
+    flow.run_batch(range(messages), trace_sample_rate=0)
+
+
+def threaded(flow, messages):
+    flow.run_many(range(messages), workers=8, trace_sample_rate=0)
+
+
+def sequential(flow, messages):
+    for message in range(messages):
+        flow.run(data=message, context={}, trace_sample_rate=0)
+
+
+def time_it(test, flow, messages):
+    start = time.perf_counter_ns()
+    test(flow, messages)
+    return (time.perf_counter_ns() - start) / 1e9
+
+
+length = 20
+messages = 10000
+flow = build_flow(length)
+print('recursive :', time_it(recursive, flow, messages))
+print('compiled  :', time_it(compiled, flow, messages))
+print('batched   :', time_it(batched, flow, messages))
+
+waiting = WaitOperator() > NoOpOperator()
+messages = 1000
+print('sequential (I/O) :', time_it(sequential, waiting, messages))
+print('threaded (I/O)   :', time_it(threaded, waiting, messages))
@@ -98,6 +98,26 @@ STAR_WARS_CHARACTERS = [
     "Padmé Amidala"
 ]
 
+class ListLRU_Index(object):
+    """
+    The previous list based implementation, for comparison
+    """
+    def __init__(self, size: int = 1000):
+        self.hash_list = [None] * size
+
+    def test(self, item):
+        item_hash = hash(item)
+
+        if item_hash in self.hash_list:
+            item_index = self.hash_list.index(item_hash)
+            self.hash_list[:] = [item_hash] + self.hash_list[:item_index] + self.hash_list[item_index+1:]
+            self.hash_list.append(self.hash_list.pop(0))
+            return True
+        self.hash_list[0] = item_hash
+        self.hash_list.append(self.hash_list.pop(0))
+        return False
+
+
 def lru_performance():
 
     lru = LRU_Index(size=25)
@@ -115,7 +135,33 @@ def lru_performance():
     print((time.time_ns() - start) / 1e9)
 
 
+def time_per_test(lru, size, tests):
+    # half of the values are in the index, half aren't
+    values = [random.randint(0, size * 2) for i in range(tests)]
+    if isinstance(lru, ListLRU_Index):
+        # filling the list implementation one item at a time is O(n^2)
+        lru.hash_list[:] = [hash(i) for i in range(size)]
+    else:
+        for i in range(size):
+            lru.test(i)
+    start = time.perf_counter_ns()
+    for value in values:
+        lru.test(value)
+    return (time.perf_counter_ns() - start) / tests
+
+
+def lru_scaling_performance():
+
+    print(F"{'size':>10} {'list (ns/test)':>16} {'ordered dict (ns/test)':>24} {'speed up':>10}")
+    for size in [1000, 10000, 100000, 1000000]:
+        # the list implementation is O(n) per test so test it less often
+        list_time = time_per_test(ListLRU_Index(size), size, max(10, 10000000 // size // 10))
+        dict_time = time_per_test(LRU_Index(size), size, 100000)
+        print(F"{size:>10} {list_time:>16.0f} {dict_time:>24.0f} {list_time / dict_time:>9.0f}x")
+
+
 if __name__ == "__main__":
     lru_performance()
+    lru_scaling_performance()
 
     print('okay')
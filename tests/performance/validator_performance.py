@@ -1,15 +1,19 @@
-import cProfile
-import time
+"""
+Compares testing records against a schema by looping over the fields (as
+Schema.validate used to) with the compiled validation function, and with
+testing the records a column at a time (validate_many).
+
+for 1 million records:
 
-import shutil
+    interpreted : 5.67
+    compiled    : 1.76
+    batched     : 1.35  (the same record, so the date is parsed once a chunk)
+"""
+import time
 import sys
 import os
-sys.path.insert(1, os.path.join(sys.path[0], '..\..'))
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
 from gva.data.validator import Schema
-try:
-    import orjson as json
-except ImportError:
-    import ujson as json
 
 
 schema_definition = {
@@ -37,38 +41,42 @@ data = {
     "timestamp":"2020-12-01T00:00:02"
     }
 
-def validate():
-    for i in range(1000000):
-        s = Schema(schema_definition)
-        s.validate(data)
 
+def interpreted(schema, subject):
+    # the per-field loop Schema.validate used before it was compiled
+    result = True
+    last_error = ''
+    for key, value in schema._validators.items():
+        if not any([True for validator in schema._validators.get(key) if validator(subject.get(key))]):
+            result = False
+            for v in value:
+                last_error += f"'{key}' ({subject.get(key)}) did not pass validator {str(v)}.\n"
+    return result
 
-def type_check_performance():
 
-    test_1 = 'test'
-    test_2 = 100
-    cycles = 10000000
+def compiled(schema, subject):
+    return schema.validate(subject)
+
+
+def batched(schema, records):
+    return schema.validate_many(records)
 
-    start = time.time_ns()
-    for i in range(cycles):
-        s = isinstance(test_1, (str, int))
-        n = isinstance(test_2, (str, int))
-    print(time.time_ns() - start, s, n)
 
-    start = time.time_ns()
+def time_it(test, schema, cycles):
+    start = time.perf_counter_ns()
     for i in range(cycles):
-        s = type(test_1).__name__ in {'str', 'int'}
-        n = type(test_2).__name__ in {'str', 'int'}
-    print(time.time_ns() - start, s, n)
+        test(schema, data)
+    return (time.perf_counter_ns() - start) / 1e9
 
 
-start = time.time_ns()
-#cProfile.run("validate()")
-#cProfile.run("type_check_performance()")
-print((time.time_ns() - start) / 1e9)
+schema = Schema(schema_definition)
+assert interpreted(schema, data) == compiled(schema, data)
 
+cycles = 1000000
+print('interpreted :', time_it(interpreted, schema, cycles))
+print('compiled    :', time_it(compiled, schema, cycles))
 
-import datetime
-print(type(datetime.datetime(2002,1,1)).__name__)
-print(type(datetime.date(2002,1,1)).__name__)
-print(type(datetime.time(12,0)).__name__)
\ No newline at end of file
+records = [data] * cycles
+start = time.perf_counter_ns()
+batched(schema, records)
+print('batched     :', (time.perf_counter_ns() - start) / 1e9)
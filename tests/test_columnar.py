@@ -0,0 +1,84 @@
+"""
+Tests for the ColumnarDictSet, the results of the operations should match
+the results of the equivalent dictset functions.
+"""
+import datetime
+import sys
+import os
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.formats import dictset
+from gva.data.formats.columnar import ColumnarDictSet
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:   # pragma: no cover
+    pass
+
+
+DATA = [
+    {'name': 'bob', 'team': 'red', 'score': 3, 'rate': 0.5, 'active': True, 'joined': datetime.date(2020, 1, 1)},
+    {'name': 'alice', 'team': 'blue', 'score': 7, 'rate': None, 'active': False, 'joined': datetime.date(2020, 2, 1)},
+    {'name': 'carol', 'team': 'red', 'score': None, 'rate': 1.5, 'active': True, 'joined': None},
+    {'name': 'dave', 'team': None, 'score': 5, 'rate': 2.0, 'active': None, 'joined': datetime.date(2019, 6, 1)},
+    {'name': 'eve', 'team': 'blue', 'score': 1, 'rate': 0.25, 'active': True}]
+
+
+def test_columnar_round_trip():
+    columnar = ColumnarDictSet(DATA)
+
+    assert len(columnar) == 5
+    assert columnar.column_names == ['name', 'team', 'score', 'rate', 'active', 'joined']
+    records = columnar.to_records()
+    # missing fields are returned as None
+    assert records[4]['joined'] is None
+    assert records[:4] == DATA[:4]
+    assert type(records[0]['score']) == int
+    assert len(dictset.to_columnar(DATA)) == 5
+
+
+def test_columnar_filter():
+    columnar = ColumnarDictSet(DATA)
+
+    assert [r['name'] for r in columnar.filter('team', '==', 'red')] == ['bob', 'carol']
+    assert [r['name'] for r in columnar.filter('score', '>=', 5)] == ['alice', 'dave']
+    assert [r['name'] for r in columnar.filter('team', 'in', ['blue', 'green'])] == ['alice', 'eve']
+    assert [r['name'] for r in columnar.filter('joined', '<', datetime.date(2020, 1, 15))] == ['bob', 'dave']
+    # nulls don't match
+    assert [r['name'] for r in columnar.filter('team', '!=', 'red')] == ['alice', 'eve']
+    assert len(columnar.filter('team', '==', 'green')) == 0
+
+    chained = columnar.filter('active', '==', True).filter('rate', '<', 1).select(['name'])
+    assert chained.to_records() == [{'name': 'bob'}, {'name': 'eve'}]
+
+
+def test_columnar_sort():
+    columnar = ColumnarDictSet(DATA)
+
+    for columns, descending in (('score', False), ('team', True), (['team', 'rate'], [False, True]), ('joined', False)):
+        expected = list(dictset.sort(DATA, columns, 100, descending=descending))
+        assert columnar.sort(columns, descending).to_records() == [
+            {**r, 'joined': r.get('joined')} for r in expected], columns
+
+    assert columnar.sort('score', nulls_first=True).limit(2).select('name').to_records() == [{'name': 'carol'}, {'name': 'eve'}]
+
+
+def test_columnar_group_aggregate():
+    columnar = ColumnarDictSet(DATA)
+    aggs = {'*': 'count', 'score': ['sum', 'min', 'max', 'mean'], 'name': 'max', 'joined': 'min'}
+
+    expected = sorted(dictset.aggregate(DATA, 'team', aggs), key=lambda r: str(r['team']))
+    results = columnar.group_aggregate('team', aggs).to_records()
+    assert sorted(results, key=lambda r: str(r['team'])) == expected
+
+    # the results are a ColumnarDictSet
+    top = columnar.group_aggregate('team', {'score': 'sum'}).sort('sum_score', descending=True).limit(1)
+    assert top.to_records() == [{'team': 'blue', 'sum_score': 8}]
+
+
+if __name__ == "__main__":
+    test_columnar_round_trip()
+    test_columnar_filter()
+    test_columnar_sort()
+    test_columnar_group_aggregate()
+
+    print('okay')
@@ -56,6 +56,61 @@ def test_join_left():
     assert left[1].get('plus_one') is None 
 
 
+def test_join_many():
+    set_1 = [{'key': 1, 'value': 'one'}, {'key': 1, 'value': 'uno'}, {'key': 2, 'value': 'two'}, {'key': None, 'value': 'none'}]
+    set_2 = [{'key': 1, 'plus_one': 'two'}, {'key': 1, 'plus_one': 'dos'}, {'key': 3, 'plus_one': 'four'}, {'key': None, 'plus_one': 'one'}]
+
+    # many-to-many, every pair of matching records is returned
+    inner = list(dictset.join(set_1, set_2, column='key'))
+    assert len(inner) == 4
+    assert {(r['value'], r['plus_one']) for r in inner} == {('one', 'two'), ('one', 'dos'), ('uno', 'two'), ('uno', 'dos')}
+
+    # nulls don't match
+    right = list(dictset.join(set_1, set_2, column='key', join_type='RIGHT'))
+    assert len(right) == 6
+    assert sorted(r.get('plus_one') for r in right if r.get('value') is None) == ['four', 'one']
+
+    full = list(dictset.join(set_1, set_2, column='key', join_type='FULL'))
+    assert len(full) == 8
+
+
+def test_join_multiple_columns():
+    set_1 = [{'a': 1, 'b': 'x', 'value': 1}, {'a': 1, 'b': 'y', 'value': 2}]
+    set_2 = [{'a': 1, 'b': 'y', 'other': 3}, {'a': 2, 'b': 'x', 'other': 4}]
+
+    inner = list(dictset.join(set_1, set_2, column=['a', 'b']))
+    assert inner == [{'a': 1, 'b': 'y', 'value': 2, 'other': 3}]
+
+
+def test_join_spilled():
+    set_1 = [{'key': i % 700, 'left': i} for i in range(2000)]
+    set_2 = [{'key': i % 500, 'right': i} for i in range(1000)]
+
+    expected = sorted((l['left'], r['right']) for l in set_1 for r in set_2 if l['key'] == r['key'])
+
+    # the right dictset is larger than the cache so both sides are partitioned
+    spilled = list(dictset.join(set_1, set_2, column='key', join_type='FULL', cache_size=50))
+    assert sorted((r['left'], r['right']) for r in spilled if 'left' in r and 'right' in r) == expected
+    assert len([r for r in spilled if 'right' not in r]) == 500
+    assert len(spilled) == len(expected) + 500
+
+
+def test_join_merge():
+    set_1 = [{'key': i // 2, 'left': i} for i in range(100)]
+    set_2 = [{'key': i, 'right': i} for i in range(25, 75)]
+
+    merged = list(dictset.join(set_1, set_2, column='key', join_type='LEFT', method='merge'))
+    hashed = list(dictset.join(set_1, set_2, column='key', join_type='LEFT'))
+    assert merged == hashed
+    assert len(merged) == 100
+
+    try:
+        list(dictset.join(set_1[::-1], set_2, column='key', method='merge'))
+        assert False  # pragma: no cover
+    except ValueError:
+        pass
+
+
 def test_union():
     set_1 = [{'key':1,'value':'one'},{'key':2,'value':'two'}]
     set_2 = [{'key':3,'value':'three'},{'key':4,'value':'four'}]
@@ -144,6 +199,27 @@ def test_distinct():
     assert len(distinct) == 4
 
 
+def test_distinct_spilled():
+    ds = [{'key': i % 300, 'value': i % 7} for i in range(3000)]
+
+    # a small cache spills records to disk, the result is still exact
+    distinct = list(dictset.distinct(ds, cache_size=50, exact=True))
+    assert len(distinct) == 2100
+    assert sorted(map(str, distinct)) == sorted(set(map(str, ds)))
+
+    # deduplicate on a subset of the columns, the first record is kept
+    distinct = list(dictset.distinct(ds, cache_size=50, columns=['key'], exact=True))
+    assert sorted(distinct, key=lambda r: r['key']) == ds[:300]
+
+    # the approximate method doesn't fully deduplicate with a small cache
+    assert len(list(dictset.distinct(ds, cache_size=50))) > 2100
+
+
+def test_approx_count_distinct():
+    ds = [{'key': i % 5000} for i in range(20000)]
+    assert abs(dictset.approx_count_distinct(ds, 'key') - 5000) < 250
+
+
 def test_limit():
     ds = [
         {'key': 1, 'value': 'one', 'plus1': 2},
@@ -217,6 +293,145 @@ def test_sort():
         assert 1+i == r.get('key'), F"{i}  {r.get('key')}"
 
 
+def test_sort_spilled():
+    values = [None, 1, 2, 3, 'a']
+    ds = [{'key': (i * 7) % 4, 'value': values[i % 4], 'order': i} for i in range(1000)]
+
+    # small caches spill runs to disk, the result should match sorted
+    s = list(dictset.sort(ds, 'key', 64, descending=False))
+    assert s == sorted(ds, key=lambda r: r['key'])
+
+    s = list(dictset.sort(ds, ['key', 'order'], 64, descending=[True, False]))
+    assert s == sorted(ds, key=lambda r: (-r['key'], r['order']))
+
+    # nulls are last by default, in either direction
+    s = list(dictset.sort(ds, 'value', 100))
+    assert [r['value'] for r in s[:250]] == [3] * 250
+    assert [r['value'] for r in s[-250:]] == [None] * 250
+    s = list(dictset.sort(ds, 'value', 100, descending=False, nulls_first=True))
+    assert [r['value'] for r in s[:250]] == [None] * 250
+    assert s[250:] == sorted(ds[1::4] + ds[2::4] + ds[3::4], key=lambda r: r['value'])
+
+
+def test_top_k():
+    ds = [{'key': i % 13, 'value': (i * 7) % 31, 'id': i} for i in range(200)]
+    ds.append({'key': None, 'value': None, 'id': 200})
+
+    # the same records, including the order of ties, as sort then limit
+    for column, descending, nulls_first in (('value', True, False), (['key', 'value'], False, True), (['key', 'id'], [True, False], False)):
+        expected = list(dictset.limit(dictset.sort(ds, column, 50, descending, nulls_first), 15))
+        assert list(dictset.top_k(ds, column, 15, descending, nulls_first)) == expected
+
+    by_key = list(dictset.top_k(ds, None, 3, descending=False, key=lambda r: abs((r['value'] or 0) - 10)))
+    assert [r['value'] for r in by_key] == [10, 10, 10]
+    assert len(list(dictset.top_k(ds, 'value', 0))) == 0
+    assert len(list(dictset.top_k(iter(ds), 'value', 500))) == 201
+
+
+def test_sample():
+    ds = [{'key': i} for i in range(1000)]
+
+    sample = list(dictset.sample(ds, 10, seed=1))
+    assert len(sample) == 10
+    assert sample == list(dictset.sample(iter(ds), 10, seed=1))
+    # the sample is in the order the records were read
+    assert sample == sorted(sample, key=lambda r: r['key'])
+    # the sample isn't the first records
+    assert sample != ds[:10]
+    assert len(list(dictset.sample(ds[:5], 10))) == 5
+
+    # every record has the same chance of being sampled
+    counts = [0] * 10
+    for seed in range(1000):
+        for record in dictset.sample(ds, 10, seed=seed):
+            counts[record['key'] // 100] += 1
+    assert min(counts) > 850 and max(counts) < 1150
+
+
+def test_stratified_sample():
+    ds = [{'level': 'ERROR' if i % 100 == 0 else 'INFO', 'key': i} for i in range(1000)]
+
+    sample = list(dictset.stratified_sample(ds, 'level', 5, seed=1))
+    assert len(sample) == 10
+    assert len([r for r in sample if r['level'] == 'ERROR']) == 5
+    assert sample == sorted(sample, key=lambda r: r['key'])
+    assert list(dictset.stratified_sample(ds, 'level', 0)) == []
+
+
+def test_tumbling_window():
+    ds = [{'time': t, 'user': 'a' if t % 3 else 'b', 'value': t % 7} for t in range(0, 300, 2)]
+    # out of order, but within the allowed lateness
+    ds[10], ds[12] = ds[12], ds[10]
+
+    windows = list(dictset.tumbling_window(ds, 'time', 60, {'*': 'count', 'value': 'max'}, by='user', allowed_lateness=10))
+    assert len(windows) == 10
+    assert windows[0]['window_start'] == 0 and windows[0]['window_end'] == 60
+    assert sum(w['count_*'] for w in windows) == 150
+    for window in windows:
+        records = [r for r in ds if window['window_start'] <= r['time'] < window['window_end'] and r['user'] == window['user']]
+        assert window['count_*'] == len(records)
+        assert window['max_value'] == max(r['value'] for r in records)
+
+    # records for closed windows are late
+    late: list = []
+    windows = list(dictset.tumbling_window(ds + [{'time': 5}], 'time', 60, {'*': 'count'}, on_late=late.append))
+    assert late == [{'time': 5}]
+    assert sum(w['count_*'] for w in windows) == 150
+
+
+def test_sliding_window():
+    start = datetime.datetime(2021, 1, 1)
+    ds = [{'time': (start + datetime.timedelta(minutes=m)).isoformat()} for m in range(60)]
+
+    windows = list(dictset.sliding_window(ds, 'time', datetime.timedelta(minutes=10), datetime.timedelta(minutes=5), {'*': 'count'}))
+    assert windows[0]['window_start'] == start - datetime.timedelta(minutes=5)
+    assert [w['count_*'] for w in windows] == [5] + [10] * 11 + [5]
+
+
+def test_session_window():
+    ds = [{'time': t, 'user': u} for t, u in [(0, 'a'), (1, 'b'), (3, 'a'), (4, 'b'), (20, 'a'), (22, 'a'), (40, 'b')]]
+
+    sessions = list(dictset.session_window(ds, 'time', 5, {'*': 'count'}, by='user'))
+    assert sessions == [
+        {'window_start': 0, 'window_end': 8, 'user': 'a', 'count_*': 2},
+        {'window_start': 1, 'window_end': 9, 'user': 'b', 'count_*': 2},
+        {'window_start': 20, 'window_end': 27, 'user': 'a', 'count_*': 2},
+        {'window_start': 40, 'window_end': 45, 'user': 'b', 'count_*': 1}]
+
+
+def test_parallel_map():
+    ds = [{'key': i} for i in range(1000)]
+
+    # a drop-in for set_column
+    expected = list(dictset.set_column(ds, 'double', lambda r: r['key'] * 2))
+    assert list(dictset.parallel_map(ds, lambda r: r['key'] * 2, workers=2, chunk_size=64, column_name='double')) == expected
+
+    unordered = list(dictset.parallel_map(iter(ds), lambda r: r['key'], workers=2, chunk_size=10, ordered=False))
+    assert sorted(unordered) == list(range(1000))
+
+    filtered = list(dictset.parallel_filter(ds, lambda r: r['key'] % 3 == 0, workers=2, chunk_size=100))
+    assert filtered == ds[::3]
+
+
+def test_partition_by():
+    left = [{'key': i % 50, 'left': i} for i in range(1000)]
+    right = [{'key': i, 'right': i} for i in range(0, 60, 2)]
+
+    # partitions of the same key can be joined separately
+    left_partitions = dictset.partition_by(left, 'key', 4)
+    right_partitions = dictset.partition_by(right, 'key', 4)
+    joined = [r for lp, rp in zip(left_partitions, right_partitions) for r in dictset.join(lp, rp, 'key')]
+    assert sorted(map(str, joined)) == sorted(map(str, dictset.join(left, right, 'key')))
+
+    targets: list = [[], [], []]
+    counts = dictset.partition_by(left, ['key'], targets=targets)
+    assert counts == [len(target) for target in targets]
+    assert sum(counts) == 1000
+    for target in targets:
+        keys = {r['key'] for r in target}
+        assert all(not keys & {r['key'] for r in other} for other in targets if other is not target)
+
+
 def test_to_pandas():
     ds = [
         {'key': 1, 'value': 'one', 'plus1': 2},
@@ -242,22 +457,76 @@ def test_extract_column():
     assert dictset.extract_column(ds, 'value') == ['one', 'two', 'three', 'four', 'five']
 
 
+def test_aggregate():
+    ds = [
+        {'user': 'a', 'site': 1, 'value': 1},
+        {'user': 'a', 'site': 1, 'value': 3},
+        {'user': 'a', 'site': 2, 'value': None},
+        {'user': 'b', 'site': 1, 'value': 5}]
+
+    results = {
+        (r['user'], r['site']): r
+        for r in dictset.aggregate(ds, by=['user', 'site'], aggs={'*': 'count', 'value': ['count', 'sum', 'min', 'max', 'mean']})}
+
+    assert len(results) == 3
+    assert results[('a', 1)]['count_*'] == 2
+    assert results[('a', 1)]['sum_value'] == 4
+    assert results[('a', 1)]['mean_value'] == 2
+    assert results[('a', 1)]['min_value'] == 1
+    assert results[('a', 1)]['max_value'] == 3
+    # nulls are counted as records but not as values
+    assert results[('a', 2)]['count_*'] == 1
+    assert results[('a', 2)]['count_value'] == 0
+    assert results[('a', 2)]['mean_value'] is None
+    assert results[('b', 1)]['sum_value'] == 5
+
+
+def test_aggregate_spilled():
+    ds = [{'key': i % 500, 'value': i} for i in range(10000)]
+
+    # more groups than max_groups forces the partial results to disk
+    results = list(dictset.aggregate(ds, by='key', aggs={'value': ['count', 'sum', 'max']}, max_groups=50))
+
+    assert len(results) == 500
+    for result in results:
+        assert result['count_value'] == 20
+        assert result['sum_value'] == sum(range(result['key'], 10000, 500))
+        assert result['max_value'] == 9500 + result['key']
+
+
 if __name__ == "__main__":
     test_select_record_fields()
     test_order()
     test_join_inner()
     test_join_left()
+    test_join_many()
+    test_join_multiple_columns()
+    test_join_spilled()
+    test_join_merge()
     test_union()
     test_create_index()
     test_select_from()
     test_set_column_func()
     test_set_column_const()
     test_distinct()
+    test_distinct_spilled()
+    test_approx_count_distinct()
     test_limit()
     test_match()
     test_paging()
     test_sort()
+    test_sort_spilled()
+    test_top_k()
+    test_sample()
+    test_stratified_sample()
+    test_tumbling_window()
+    test_sliding_window()
+    test_session_window()
+    test_parallel_map()
+    test_partition_by()
     test_to_pandas()
     test_extract_column()
+    test_aggregate()
+    test_aggregate_spilled()
     
     print('okay')
@@ -4,9 +4,11 @@ and push a payload through it.
 """
 import os
 import sys
+import threading
 sys.path.insert(1, os.path.join(sys.path[0], '..'))
 from gva.logging import get_logger
-from gva.flows.operators import EndOperator, NoOpOperator, UndefinedOperator
+from gva.flows import Flow, BaseOperator
+from gva.flows.operators import EndOperator, NoOpOperator, UndefinedOperator, ValidatorOperator
 try:
     from rich import traceback
     traceback.install()
@@ -36,8 +38,246 @@ def test_flow_runner():
     assert not errored
 
 
+class RecordingOperator(BaseOperator):
+
+    def __init__(self, name, log, outcome='single'):
+        self.name = name
+        self.log = log
+        self.outcome = outcome
+        super().__init__()
+
+    def execute(self, data={}, context={}):
+        self.log.append((self.name, data))
+        context[self.name] = True
+        if self.outcome == 'many':
+            return ((f"{data}.{i}", context) for i in range(2))
+        return data, context
+
+
+def test_flow_runner_order():
+    """
+    Messages are walked depth-first, in the order the links were added
+    """
+    log = []
+    flow = Flow()
+    for name, outcome in (('a', 'many'), ('b', 'single'), ('c', 'single'), ('d', 'single')):
+        flow.add_operator(name, RecordingOperator(name, log, outcome))
+    flow.link_operators('a', 'b')
+    flow.link_operators('a', 'c')
+    flow.link_operators('b', 'd')
+
+    flow.run(data="x", trace_sample_rate=0)
+    assert log == [
+        ('a', 'x'),
+        ('b', 'x.0'), ('d', 'x.0'), ('c', 'x.0'),
+        ('b', 'x.1'), ('d', 'x.1'), ('c', 'x.1')], log
+
+
+def test_flow_runner_long_flow():
+    """
+    Long flows aren't limited by the recursion limit
+    """
+    log = []
+    flow = Flow()
+    length = sys.getrecursionlimit() + 10
+    for i in range(length):
+        flow.add_operator(i, RecordingOperator(i, log))
+        if i:
+            flow.link_operators(i - 1, i)
+
+    flow.run(data="x", trace_sample_rate=0)
+    assert len(log) == length
+
+
+def test_flow_runner_cycle():
+
+    flow = Flow()
+    flow.add_operator('a', NoOpOperator())
+    flow.add_operator('b', NoOpOperator())
+    flow.add_operator('c', NoOpOperator())
+    flow.link_operators('a', 'b')
+    flow.link_operators('b', 'c')
+    flow.link_operators('c', 'b')
+
+    failed = False
+    try:
+        flow.run(data="x")
+    except Exception:
+        failed = True
+    assert failed
+
+
+class BatchOperator(BaseOperator):
+
+    def __init__(self, log, fail_batches=False, **kwargs):
+        self.log = log
+        self.fail_batches = fail_batches
+        super().__init__(**kwargs)
+
+    def execute(self, data={}, context={}):
+        if data == 3:
+            raise ValueError('three')
+        self.log.append(('execute', data))
+        return F"{data}!", context
+
+    def execute_batch(self, batch):
+        if self.fail_batches:
+            raise ValueError('batch')
+        self.log.append(('batch', len(batch)))
+        return [(F"{data}!", context) for data, context in batch]
+
+
+def test_flow_run_batch():
+
+    log = []
+    flow = Flow()
+    flow.add_operator('split', RecordingOperator('split', log, 'many'))
+    flow.add_operator('batch', BatchOperator(log))
+    flow.add_operator('end', RecordingOperator('end', log))
+    flow.link_operators('split', 'batch')
+    flow.link_operators('batch', 'end')
+
+    flow.run_batch(range(5), batch_size=3, trace_sample_rate=0)
+
+    # the operator without execute_batch runs execute for each message
+    assert [data for name, data in log if name == 'split'] == [0, 1, 2, 3, 4]
+    # each batch of messages is sent to execute_batch once
+    assert [data for name, data in log if name == 'batch'] == [6, 4]
+    assert [data for name, data in log if name == 'end'] == [
+        '0.0!', '0.1!', '1.0!', '1.1!', '2.0!', '2.1!',
+        '3.0!', '3.1!', '4.0!', '4.1!'], log
+    assert flow.get_operator('batch').read_sensors()['records_processed'] == 10
+
+
+def test_flow_run_batch_failure():
+    """
+    When a batch fails, the messages are run one at a time
+    """
+    log = []
+    flow = Flow()
+    flow.add_operator('batch', BatchOperator(log, fail_batches=True, retry_count=1))
+    flow.add_operator('end', RecordingOperator('end', log))
+    flow.link_operators('batch', 'end')
+
+    flow.run_batch(range(5), trace_sample_rate=0)
+
+    assert [data for name, data in log if name == 'end'] == ['0!', '1!', '2!', '4!']
+    # the failed batch isn't counted as well as the failed message
+    assert flow.get_operator('batch').read_sensors()['error_count'] == 1
+
+
+class SideEffectOperator(BaseOperator):
+
+    def __init__(self, log, **kwargs):
+        self.log = log
+        super().__init__(**kwargs)
+
+    def execute(self, data={}, context={}):
+        if data == 3:
+            raise ValueError('three')
+        self.log.append(data)
+        return data, context
+
+
+def test_flow_run_batch_no_repeats():
+    """
+    Operators without execute_batch don't run the messages before a failure
+    again when the failing message is retried
+    """
+    log = []
+    flow = Flow()
+    flow.add_operator('save', SideEffectOperator(log, retry_count=2, retry_wait=1))
+    flow.run_batch(range(5), trace_sample_rate=0)
+
+    assert log == [0, 1, 2, 4], log
+    # message 3 failed on both attempts
+    assert flow.get_operator('save').read_sensors()['error_count'] == 2
+
+
+def test_flow_run_batch_validator():
+
+    log = []
+    flow = Flow()
+    flow.add_operator('validate', ValidatorOperator({"fields": [{"name": "id", "type": "numeric", "max": 5}]}))
+    flow.add_operator('end', RecordingOperator('end', log))
+    flow.link_operators('validate', 'end')
+
+    flow.run_batch(({"id": i} for i in range(10)), trace_sample_rate=0)
+
+    assert [data['id'] for name, data in log] == [0, 1, 2, 3, 4, 5]
+    assert flow.get_operator('validate').errors == 4
+
+
+class WorkerRecordingOperator(BaseOperator):
+
+    def __init__(self, log, stateful=False):
+        self.log = log
+        self.stateful = stateful
+        super().__init__()
+
+    def execute(self, data={}, context={}):
+        self.log.append((data, os.getpid(), threading.get_ident()))
+        return data, context
+
+
+def build_concurrent_flow(log):
+    flow = Flow()
+    flow.add_operator('noop', NoOpOperator())
+    flow.add_operator('split', RecordingOperator('split', [], 'many'))
+    flow.add_operator('writer', WorkerRecordingOperator(log, stateful=True))
+    flow.add_operator('end', EndOperator())
+    flow.link_operators('noop', 'split')
+    flow.link_operators('split', 'writer')
+    flow.link_operators('writer', 'end')
+    return flow
+
+
+def test_flow_run_many_threads():
+
+    log = []
+    flow = build_concurrent_flow(log)
+    flow.run_many(range(100), workers=4, trace_sample_rate=0)
+
+    assert sorted(data for data, pid, thread in log) == sorted(f"{i}.{j}" for i in range(100) for j in range(2))
+    # the stateful operator is pinned to one thread
+    assert len({thread for data, pid, thread in log}) == 1
+    assert flow.get_operator('noop').read_sensors()['records_processed'] == 100
+    assert flow.get_operator('writer').read_sensors()['records_processed'] == 200
+
+
+def test_flow_run_many_processes():
+
+    log = []
+    flow = build_concurrent_flow(log)
+    flow.run_many(range(100), workers=2, mode='process', chunk_size=10, trace_sample_rate=0)
+
+    # the stateful operator is run in this process
+    assert len(log) == 200
+    assert {pid for data, pid, thread in log} == {os.getpid()}
+    # the sensors are collected from the processes
+    assert flow.get_operator('noop').read_sensors()['records_processed'] == 100
+    assert flow.get_operator('split').read_sensors()['records_processed'] == 100
+    assert flow.get_operator('writer').read_sensors()['records_processed'] == 200
+
+    failed = False
+    try:
+        flow.run_many(range(10), mode='fibres')
+    except ValueError:
+        failed = True
+    assert failed
+
+
 if __name__ == "__main__":
 
     test_flow_runner()
+    test_flow_runner_order()
+    test_flow_runner_long_flow()
+    test_flow_runner_cycle()
+    test_flow_run_batch()
+    test_flow_run_batch_failure()
+    test_flow_run_batch_no_repeats()
+    test_flow_run_batch_validator()
+    test_flow_run_many_threads()
+    test_flow_run_many_processes()
 
     print('okay')
@@ -0,0 +1,45 @@
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.utils import HyperLogLog
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:
+    pass
+
+
+def test_hyper_log_log_estimates():
+    for cardinality in [0, 10, 1000, 100000]:
+        sketch = HyperLogLog()
+        for i in range(cardinality):
+            sketch.add(i)
+            sketch.add(i)     # duplicates don't change the estimate
+        sketch.add(None)      # nulls aren't counted
+        # the standard error at precision 12 is about 1.6%
+        assert abs(sketch.count() - cardinality) <= cardinality * 0.05, sketch.count()
+
+
+def test_hyper_log_log_merge():
+    first = HyperLogLog()
+    second = HyperLogLog()
+    for i in range(50000):
+        first.add(i)
+        second.add(i + 25000)
+
+    # the sketches survive being saved and loaded
+    second = HyperLogLog.from_bytes(second.to_bytes())
+    assert abs(first.merge(second).count() - 75000) <= 75000 * 0.05
+
+    try:
+        first.merge(HyperLogLog(precision=10))
+        assert False, 'sketches with different precisions should not merge'
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_hyper_log_log_estimates()
+    test_hyper_log_log_merge()
+
+    print('okay')
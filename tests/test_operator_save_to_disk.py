@@ -1,5 +1,6 @@
 import os
 import sys
+import glob
 import shutil
 sys.path.insert(1, os.path.join(sys.path[0], '..'))
 from gva.flows.operators import SaveToDiskOperator
@@ -12,10 +13,7 @@ except ImportError:
 
 def test_save_to_disk_operator():
 
-    try:
-        os.remove("_test/save_to_disk_operator-0000.jsonl")
-    except:
-        pass
+    shutil.rmtree("_test", ignore_errors=True)
 
     n = SaveToDiskOperator(
             to_path="_test/save_to_disk_operator.jsonl",
@@ -23,12 +21,10 @@ def test_save_to_disk_operator():
     n.execute(data={"this":"is", "a":"record"}, context={})
     n.finalize()
 
-    assert os.path.exists("_test/save_to_disk_operator-0000.jsonl")
+    partitions = glob.glob("_test/save_to_disk_operator-*.jsonl")
+    shutil.rmtree("_test", ignore_errors=True)
 
-    try:
-        os.remove("_test/save_to_disk_operator-0000.jsonl")
-    except:
-        pass
+    assert len(partitions) == 1, partitions
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+Tests for the Query, the optimized plan should return the same records as
+running the steps in the order they were written.
+"""
+import sys
+import os
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.formats import dictset
+from gva.data.formats.query import Query
+from gva.data.readers import Reader, FileReader
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:   # pragma: no cover
+    pass
+
+
+USERS = [
+    {'user': 1, 'name': 'alice', 'country': 'NZ'},
+    {'user': 2, 'name': 'bob', 'country': 'UK'},
+    {'user': 3, 'name': 'carol', 'country': 'NZ'}]
+SCORES = [{'user': i % 4, 'score': (i * 7) % 23, 'game': i} for i in range(100)]
+
+
+def test_query_matches_dictset():
+    query = Query(SCORES).join(USERS, 'user').where('country', '==', 'NZ').order_by('score', descending=True).limit(5)
+
+    joined = dictset.join(SCORES, USERS, 'user')
+    filtered = dictset.select_from(joined, where=lambda r: r['country'] == 'NZ')
+    expected = list(dictset.limit(dictset.sort(filtered, 'score', 1000, descending=True), 5))
+
+    assert list(query) == expected
+    # the query can be run again
+    assert list(query) == expected
+
+
+def test_query_plan():
+    right = Query(USERS).select(['user', 'country'])
+    query = Query(SCORES).join(right, 'user').where('score', '>', 10).where('country', '==', 'NZ')
+    query = query.order_by('score').limit(3).select(['game', 'country'])
+
+    plan = query.explain().split('\n')
+    # the filter on the left columns is below the join, the right filter is
+    # in the right query, the sort and limit are fused
+    assert plan[1] == 'Filter(score > 10)'
+    assert plan[2] == 'Prune(country, game, score, user)'
+    assert plan[3].startswith('Join(INNER on user') and "Filter(country == 'NZ')" in plan[3]
+    assert plan[4] == 'TopK(3 by score)'
+    assert plan[5] == 'Select(game, country)'
+
+    # a function filter isn't moved unless its columns are known
+    unknown = Query(SCORES).join(USERS, 'user').where(lambda r: r['user'] > 1)
+    assert unknown.explain().split('\n')[1].startswith('Join')
+    known = Query(SCORES).join(USERS, 'user').where(lambda r: r['user'] > 1, columns=['user'])
+    assert known.explain().split('\n')[1].startswith('Filter')
+
+    joined = dictset.join(SCORES, USERS, 'user')
+    filtered = [r for r in joined if r['score'] > 10 and r['country'] == 'NZ']
+    expected = sorted(filtered, key=lambda r: r['score'])[:3]
+    assert list(query) == [{'game': r['game'], 'country': r['country']} for r in expected]
+
+
+def test_query_filters_after_pushed_filter():
+    # the right columns are still known once a filter has been pushed into
+    # the right side of the join
+    right = Query(USERS).select(['user', 'name'])
+    query = Query(SCORES).join(right, 'user').where('name', '>', 'alice').where('name', '<', 'carol')
+    plan = query.explain().split('\n')
+    assert len(plan) == 2, plan
+    assert "Filter(name > 'alice')" in plan[1] and "Filter(name < 'carol')" in plan[1]
+
+    joined = dictset.join(SCORES, dictset.select_from(USERS, columns=['user', 'name']), 'user')
+    expected = [r for r in joined if 'alice' < r['name'] < 'carol']
+    assert len(expected) == 25
+    assert list(query) == expected
+
+
+def test_query_outer_join_filters():
+    # a filter on the left columns of a right join can't be moved below it
+    query = Query(USERS).join(Query(SCORES).select(['user', 'score']), 'user', join_type='RIGHT').where('name', '==', 'bob')
+    assert query.explain().split('\n')[1].startswith('Join')
+    assert len(list(query)) == 25
+
+
+def test_query_reader_pushdown():
+    reader = Reader(inner_reader=FileReader, from_path='tests/data/tweets')
+    query = Query(reader).where('username', '==', 'BBCNews').select(['username', 'followers']).order_by('followers', descending=True).limit(3)
+    results = list(query)
+
+    # the filter and the columns were passed to a copy of the Reader, the
+    # Reader isn't changed so it can be queried again
+    assert reader.where is None
+    assert reader.select == ['*']
+    assert list(query) == results
+
+    expected = [r for r in Reader(inner_reader=FileReader, from_path='tests/data/tweets') if r['username'] == 'BBCNews']
+    expected = sorted(expected, key=lambda r: r['followers'], reverse=True)[:3]
+    assert results == [{'username': r['username'], 'followers': r['followers']} for r in expected]
+
+
+if __name__ == "__main__":
+    test_query_matches_dictset()
+    test_query_plan()
+    test_query_filters_after_pushed_filter()
+    test_query_outer_join_filters()
+    test_query_reader_pushdown()
+
+    print('okay')
@@ -73,6 +73,29 @@ def test_multiprocess_reader():
     assert len(df) == 50
 
 
+def test_sampled_reader():
+    sample = list(Reader(
+            sample_fraction=0.2,
+            sample_seed=1,
+            inner_reader=FileReader,
+            from_path='tests/data/tweets'))
+    assert 0 < len(sample) < 50
+    # the same seed returns the same sample, when threaded too
+    threaded = Reader(
+            sample_fraction=0.2,
+            sample_seed=1,
+            thread_count=2,
+            inner_reader=FileReader,
+            from_path='tests/data/tweets')
+    assert sorted(r['tweet'] for r in threaded) == sorted(r['tweet'] for r in sample)
+
+    try:
+        Reader(sample_fraction=0, inner_reader=FileReader, from_path='tests/data/tweets')
+        assert False  # pragma: no cover
+    except ValueError:
+        pass
+
+
 if __name__ == "__main__":
     test_reader_can_read()
     test_unknown_format()
@@ -80,6 +103,7 @@ if __name__ == "__main__":
     test_reader_to_pandas()
     test_threaded_reader()
     test_multiprocess_reader()
+    test_sampled_reader()
 
     print('okay')
     
\ No newline at end of file
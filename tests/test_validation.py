@@ -5,7 +5,7 @@ import datetime
 import os
 import sys
 sys.path.insert(1, os.path.join(sys.path[0], '..'))
-from gva.data.validator import Schema
+from gva.data.validator import Schema, infer_schema
 from gva.utils.json import serialize
 from gva.errors import ValidationError
 try:
@@ -201,6 +201,17 @@ def test_validator_enum():
     assert (test.validate(VALID_TEST_DATA))
 
 
+def test_validator_enum_values():
+
+    TEST_SCHEMA = {"fields": [{"name": "key", "type": "enum", "symbols": [f'symbol_{i}' for i in range(500)]}]}
+
+    test = Schema(TEST_SCHEMA)
+    assert test.validate({"key": "symbol_499"})
+    assert not test.validate({"key": "symbol_500"})
+    assert not test.validate({"key": ["symbol_1"]})
+    assert not test.validate({"key": None})
+
+
 def test_validator_date():
 
     INVALID_TEST_DATA = {"key": "tomorrow"}
@@ -294,6 +305,100 @@ def test_validator_cve_format():
     assert (test.validate(VALID_TEST_DATA)), test.last_error
 
 
+def test_validator_last_error():
+
+    TEST_DATA = {"number": "one", "string": 1, "other": "x"}
+    TEST_SCHEMA = {"fields": [
+        {"name": "number", "type": "numeric"},
+        {"name": "string", "type": ["string", "nullable"]},
+        {"name": "other", "type": "other"}]}
+
+    test = Schema(TEST_SCHEMA)
+    assert not test.validate(TEST_DATA)
+    assert "'number' (one)" in test.last_error
+    assert "'string' (1)" in test.last_error
+    assert "'other'" not in test.last_error
+    assert test.validate({"number": 1, "string": None})
+    assert test.last_error == ''
+
+
+def test_validator_pickle():
+
+    import pickle
+
+    TEST_SCHEMA = {"fields": [{"name": "key", "type": "enum", "symbols": ['north', 'south']}]}
+
+    test = pickle.loads(pickle.dumps(Schema(TEST_SCHEMA)))
+    assert test.validate({"key": "north"})
+    assert not test.validate({"key": "left"})
+
+
+def test_validate_many():
+
+    TEST_SCHEMA = {"fields": [
+        {"name": "number", "type": ["numeric", "nullable"], "min": 0, "max": 10},
+        {"name": "color", "type": "enum", "symbols": ['RED', 'GREEN']},
+        {"name": "cve", "type": "cve"},
+        {"name": "date", "type": "date"}]}
+    VALUES = {
+        "number": [1, 5.5, 11, None, "3", "three", -1, True],
+        "color": ['RED', 'GREEN', 'BLUE', None, ['RED']],
+        "cve": ["CVE-2017-0144", "eternalblue", None],
+        "date": ["2020-01-01", "tomorrow", datetime.date(2020, 1, 1), None]}
+
+    records = [
+        {"number": number, "color": color, "cve": cve, "date": date}
+        for number in VALUES["number"]
+        for color in VALUES["color"]
+        for cve in VALUES["cve"]
+        for date in VALUES["date"]]
+
+    test = Schema(TEST_SCHEMA)
+    results = test.validate_many(records, chunk_size=100)
+    assert len(results) == len(records)
+    assert any(valid for valid, error in results)
+    for record, (valid, error) in zip(records, results):
+        assert test.validate(record) == valid, record
+        assert test.last_error == error, record
+
+    assert test.validate_many(records, workers=2, chunk_size=100) == results
+
+
+def test_infer_schema():
+
+    records = [{
+            "id": i,
+            "cve": f"CVE-2020-{i:04}",
+            "color": ['RED', 'GREEN', 'BLUE'][i % 3],
+            "score": i / 10,
+            "flag": i % 2 == 0,
+            "date": f"2020-01-{(i % 28) + 1:02}",
+            "text": f"value {i}",
+            "tags": ["a"]}
+        for i in range(100)]
+    records[5]["score"] = None
+    del records[6]["text"]
+
+    definition = infer_schema(records)
+    fields = {field['name']: field for field in definition['fields']}
+    assert fields['id']['type'] == 'numeric'
+    assert fields['id']['min'] == 0 and fields['id']['max'] == 99
+    assert fields['cve']['type'] == 'cve'
+    assert fields['color']['type'] == 'enum'
+    assert fields['color']['symbols'] == ['BLUE', 'GREEN', 'RED']
+    assert fields['score']['type'] == ['numeric', 'nullable']
+    assert fields['flag']['type'] == 'boolean'
+    assert fields['date']['type'] == 'date'
+    assert fields['text']['type'] == ['string', 'nullable']
+    assert fields['tags']['type'] == 'list'
+
+    test = Schema(definition)
+    assert all(valid for valid, error in test.validate_many(records))
+
+    assert infer_schema(records, workers=2, chunk_size=30) == definition
+    assert len(infer_schema(records, sample=0.5, seed=1)['fields']) == 8
+
+
 if __name__ == "__main__":
     test_validator_all_valid_values()
     test_validator_invalid_string()
@@ -306,6 +411,7 @@ if __name__ == "__main__":
     test_validator_loaders()
     test_validator_list()
     test_validator_enum()
+    test_validator_enum_values()
     test_validator_number_ranges()
     test_validator_string_format()
     test_validator_date()
@@ -313,5 +419,9 @@ if __name__ == "__main__":
     test_raise_exception()
     test_call_alias()
     test_validator_cve_format()
+    test_validator_last_error()
+    test_validator_pickle()
+    test_validate_many()
+    test_infer_schema()
 
     print('okay')
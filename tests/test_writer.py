@@ -6,6 +6,8 @@ import glob
 sys.path.insert(1, os.path.join(sys.path[0], '..'))
 from gva.data.writers import Writer, NullWriter, FileWriter
 from gva.data.readers import Reader, FileReader
+from gva.data.validator import Schema
+from gva.errors import ValidationError
 try:
     from rich import traceback
     traceback.install()
@@ -71,6 +73,56 @@ def test_reader_writer_compressed():
     assert l == 200000, l
 
 
+def test_reader_writer_spooled_to_disk():
+    # a tiny spool forces the partitions to roll over to temporary files
+    w = Writer(
+        inner_writer=FileWriter,
+        to_path='_tests/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        partition_size=1024 * 1024,
+        spool_size=1024
+    )
+    for i in range(int(1e5)):
+        w.append({"test":i})
+    w.finalize()
+
+    r = Reader(
+        inner_reader=FileReader,
+        from_path='_tests/year_%Y/'
+    )
+    l = len(list(r))
+    shutil.rmtree("_tests", ignore_errors=True)
+    assert l == 100000, l
+
+
+def test_writer_append_many():
+    w = Writer(
+        inner_writer=FileWriter,
+        to_path='_tests/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        schema=Schema({"fields": [{"name": "test", "type": "numeric", "max": 1000}]})
+    )
+    assert w.append_many({"test": i} for i in range(1000)) == 1000
+
+    # none of the records are written if any fail
+    failed = False
+    try:
+        w.append_many([{"test": 1}, {"test": 2000}])
+    except ValidationError as err:
+        failed = True
+        assert 'record 1' in str(err)
+    assert failed
+    w.finalize()
+
+    r = Reader(
+        inner_reader=FileReader,
+        from_path='_tests/year_%Y/'
+    )
+    l = len(list(r))
+    shutil.rmtree("_tests", ignore_errors=True)
+    assert l == 1000, l
+
+
 def get_data():
     r = Reader(
         inner_reader=FileReader,
@@ -81,5 +133,7 @@ def get_data():
 if __name__ == "__main__":
     test_reader_writer()
     test_reader_writer_compressed()
+    test_reader_writer_spooled_to_disk()
+    test_writer_append_many()
 
     print('okay')
\ No newline at end of file
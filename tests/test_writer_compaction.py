@@ -0,0 +1,134 @@
+import shutil
+import datetime
+import glob
+import io
+import os
+import re
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.writers import Writer, FileWriter, NullWriter, compact_partitions
+from gva.data.writers.internals.base_writer import BaseWriter
+from gva.data.readers import Reader, FileReader
+from gva.errors import InvalidCombinationError
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:
+    pass
+
+from gva.logging import get_logger
+get_logger().setLevel(5)
+
+
+def _read_values():
+    r = Reader(
+        inner_reader=FileReader,
+        from_path='_tests_compaction/year_%Y/'
+    )
+    return sorted(record['value'] for record in r)
+
+
+def test_compact_partitions():
+    shutil.rmtree("_tests_compaction", ignore_errors=True)
+
+    w = Writer(
+        inner_writer=FileWriter,
+        to_path='_tests_compaction/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        compress=True,
+        partition_size=1000
+    )
+    for i in range(2000):
+        w.append({"value": i})
+    w.finalize()
+    assert len(glob.glob('_tests_compaction/**/*.lzma', recursive=True)) > 20
+
+    summaries = compact_partitions(
+        inner_writer=FileWriter,
+        to_path='_tests_compaction/year_%Y/test.jsonl',
+        compress=True,
+        workers=2
+    )
+
+    # one partition from each worker, and the records are unchanged
+    partitions = glob.glob('_tests_compaction/**/*.lzma', recursive=True)
+    values = _read_values()
+    assert len(summaries) == 2
+    assert len(partitions) == 2, partitions
+    assert values == list(range(2000))
+    # the names start with the timestamp, so they sort in write order
+    for partition in partitions:
+        assert re.match(r'test-[0-9a-f]{16}-[0-9a-f]{8}-c[0-9a-f]{12}\.jsonl\.lzma$', os.path.basename(partition)), partition
+
+    # partitions which are large enough aren't rewritten again
+    summaries = compact_partitions(
+        inner_writer=FileWriter,
+        to_path='_tests_compaction/year_%Y/test.jsonl',
+        compress=True,
+        minimum_size=100
+    )
+    shutil.rmtree("_tests_compaction", ignore_errors=True)
+    assert summaries == []
+
+
+def test_manifest_hides_partitions():
+    shutil.rmtree("_tests_compaction", ignore_errors=True)
+
+    w = FileWriter(to_path=datetime.date.today().strftime('_tests_compaction/year_%Y/test.jsonl'))
+    w.commit(io.BytesIO(b'{"value": 1}\n'))
+    replaced = w.commit(io.BytesIO(b'{"value": 2}\n'))
+    orphan = FileWriter(to_path=datetime.date.today().strftime('_tests_compaction/year_%Y/test.jsonl'), compaction_id='0123456789ab')
+    orphan.commit(io.BytesIO(b'{"value": 3}\n'))
+
+    # an interrupted compaction, the readers skip the partitions in flight
+    # and the partitions which have been replaced
+    w.write_manifest({"pending": ["0123456789ab"], "replaced": [os.path.basename(replaced)]})
+    assert _read_values() == [1]
+
+    # the next compaction removes the partitions left behind, the replaced
+    # partition stays in the manifest for readers which have listed it
+    compact_partitions(
+        inner_writer=FileWriter,
+        to_path='_tests_compaction/year_%Y/test.jsonl'
+    )
+    partitions = glob.glob('_tests_compaction/**/*.jsonl', recursive=True)
+    manifest = w.read_manifest()
+    values = _read_values()
+    assert len(partitions) == 1
+    assert manifest == {"pending": [], "replaced": [os.path.basename(replaced)]}
+    assert values == [1]
+
+    # once it is no longer listed, a later compaction clears it
+    compact_partitions(
+        inner_writer=FileWriter,
+        to_path='_tests_compaction/year_%Y/test.jsonl'
+    )
+    manifest = w.read_manifest()
+    shutil.rmtree("_tests_compaction", ignore_errors=True)
+    assert manifest == {"pending": [], "replaced": []}
+
+
+def test_compaction_needs_rewrite_support():
+
+    class ListOnlyWriter(BaseWriter):
+        def commit(self, source_file, partition_name=None):
+            pass
+
+        def get_partition_list(self):
+            return []
+
+    assert NullWriter.supports_rewrite()
+    assert not ListOnlyWriter.supports_rewrite()
+    try:
+        compact_partitions(inner_writer=ListOnlyWriter, to_path='_tests_compaction/test.jsonl')
+        assert False, 'the writer does not support rewriting partitions'
+    except InvalidCombinationError:
+        pass
+
+
+if __name__ == "__main__":
+    test_compact_partitions()
+    test_manifest_hides_partitions()
+    test_compaction_needs_rewrite_support()
+
+    print('okay')
@@ -1,5 +1,7 @@
+import io
 import os
 import sys
+import shutil
 sys.path.insert(1, os.path.join(sys.path[0], '..'))
 from gva.data.writers import FileWriter
 try:
@@ -17,7 +19,26 @@ def test_get_partition_list():
     assert len(f.get_partition_list()) == 2
 
 
+def test_partition_names_are_ordered_and_unique():
+    f = FileWriter(to_path='_tests/partitions/test.jsonl')
+    g = FileWriter(to_path='_tests/partitions/test.jsonl')
+
+    names = []
+    for i in range(50):
+        names.append(f.commit(io.BytesIO(b'{}')))
+        names.append(g.commit(io.BytesIO(b'{}')))
+    partitions = f.get_partition_list()
+    shutil.rmtree("_tests", ignore_errors=True)
+
+    assert len(set(names)) == 100
+    assert len(partitions) == 100
+    # names from each writer sort in the order they were committed
+    assert names[0::2] == sorted(names[0::2])
+    assert names[1::2] == sorted(names[1::2])
+
+
 if __name__ == "__main__":
     test_get_partition_list()
+    test_partition_names_are_ordered_and_unique()
 
     print('okay')
@@ -0,0 +1,95 @@
+import shutil
+import datetime
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.writers import Writer, FileWriter
+from gva.data.readers import Reader, FileReader
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:
+    pass
+
+from gva.logging import get_logger
+get_logger().setLevel(5)
+
+
+def _create_writer():
+    return Writer(
+        inner_writer=FileWriter,
+        to_path='_tests_journal/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        journal_path='_tests_journal/journal'
+    )
+
+
+def _crash(writer):
+    # lose the open partitions, as if the process had stopped
+    for partition_writer in writer.writer_pool.writers:
+        partition_writer['writer'].discard()
+    writer.writer_pool.writers = []
+    writer.journal.close()
+
+
+def _read_values():
+    r = Reader(
+        inner_reader=FileReader,
+        from_path='_tests_journal/year_%Y/'
+    )
+    return sorted(record['value'] for record in r)
+
+
+def test_journal_recovers_open_partitions():
+    shutil.rmtree("_tests_journal", ignore_errors=True)
+
+    w = _create_writer()
+    for i in range(100):
+        w.append({"value": i}, token=i)
+    _crash(w)
+    assert _read_values() == []
+
+    # the new writer commits the records from the journal
+    w = _create_writer()
+    assert w.resume_token == 99
+    for i in range(100, 150):
+        w.append({"value": i}, token=i)
+    w.finalize()
+
+    values = _read_values()
+    resume_token = _create_writer().resume_token
+    shutil.rmtree("_tests_journal", ignore_errors=True)
+    assert values == list(range(150))
+    assert resume_token == 149
+
+
+def test_journal_does_not_duplicate_committed_partitions():
+    shutil.rmtree("_tests_journal", ignore_errors=True)
+
+    def _fail(*args):
+        raise RuntimeError('stopped')
+
+    # stop after the partition is committed but before the journal is updated
+    w = _create_writer()
+    for i in range(100):
+        w.append({"value": i}, token=i)
+    w.journal.committed = _fail
+    try:
+        w.writer_pool.writers[0]['writer'].commit()
+    except RuntimeError:
+        pass
+    _crash(w)
+    assert _read_values() == list(range(100))
+
+    w = _create_writer()
+    w.finalize()
+    values = _read_values()
+    shutil.rmtree("_tests_journal", ignore_errors=True)
+    assert values == list(range(100))
+
+
+if __name__ == "__main__":
+    test_journal_recovers_open_partitions()
+    test_journal_does_not_duplicate_committed_partitions()
+
+    print('okay')
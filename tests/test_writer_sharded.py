@@ -0,0 +1,50 @@
+import shutil
+import datetime
+import glob
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.writers import ShardedWriter, FileWriter
+from gva.data.readers import Reader, FileReader
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:
+    pass
+
+from gva.logging import get_logger
+get_logger().setLevel(5)
+
+
+def test_sharded_writer():
+    shutil.rmtree("_tests_sharded", ignore_errors=True)
+
+    w = ShardedWriter(
+        inner_writer=FileWriter,
+        to_path='_tests_sharded/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        compress=True,
+        shards=3,
+        batch_size=500
+    )
+    for i in range(int(1e4)):
+        w.append({"value": i})
+    w.finalize()
+
+    # each shard writes its own partitions
+    partitions = glob.glob('_tests_sharded/**/*.lzma', recursive=True)
+    assert len(partitions) == 3, partitions
+
+    r = Reader(
+        inner_reader=FileReader,
+        from_path='_tests_sharded/year_%Y/'
+    )
+    values = sorted(record['value'] for record in r)
+    shutil.rmtree("_tests_sharded", ignore_errors=True)
+    assert values == list(range(int(1e4)))
+
+
+if __name__ == "__main__":
+    test_sharded_writer()
+
+    print('okay')
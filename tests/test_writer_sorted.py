@@ -0,0 +1,84 @@
+import shutil
+import datetime
+import random
+import glob
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '..'))
+from gva.data.writers import Writer, FileWriter, merge_sorted_partitions
+from gva.utils.json import parse
+try:
+    from rich import traceback
+    traceback.install()
+except ImportError:
+    pass
+
+from gva.logging import get_logger
+get_logger().setLevel(5)
+
+
+def _read_partitions():
+    partitions = {}
+    for partition in sorted(glob.glob('_tests_sorted/**/*.jsonl', recursive=True)):
+        with open(partition, 'r') as f:
+            partitions[partition] = [parse(line)['value'] for line in f]
+    return partitions
+
+
+def test_sorted_writer_and_merge():
+    shutil.rmtree("_tests_sorted", ignore_errors=True)
+
+    values = list(range(5000)) + [None] * 10
+    random.shuffle(values)
+
+    w = Writer(
+        inner_writer=FileWriter,
+        to_path='_tests_sorted/year_%Y/test.jsonl',
+        date_exchange=datetime.date.today(),
+        sort_by='value',
+        buffer_records=1000
+    )
+    for value in values:
+        w.append({"value": value})
+    summaries = w.finalize()
+
+    # each buffer is written as its own sorted partition
+    partitions = _read_partitions()
+    assert len(partitions) == 6, partitions.keys()
+    for partition in partitions.values():
+        keys = [(v is None, v) for v in partition]
+        assert keys == sorted(keys)
+
+    # the key range of each partition is returned when the writer closes
+    assert len(summaries) == 6
+    for summary in summaries:
+        partition = partitions[summary['partition']]
+        assert summary['records'] == len(partition)
+        assert summary['minimum'] == partition[0]
+        assert summary['maximum'] == partition[-1]
+
+    key_ranges = merge_sorted_partitions(
+        inner_writer=FileWriter,
+        to_path='_tests_sorted/year_%Y/test.jsonl',
+        date=datetime.date.today(),
+        sort_by='value',
+        partition_size=10000
+    )
+
+    partitions = _read_partitions()
+    shutil.rmtree("_tests_sorted", ignore_errors=True)
+
+    # the merged partitions are globally sorted and don't overlap
+    assert len(partitions) == len(key_ranges) > 1
+    merged = [value for partition in partitions.values() for value in partition]
+    assert merged == list(range(5000)) + [None] * 10
+    for key_range in key_ranges:
+        assert partitions[key_range['partition']][0] == key_range['minimum']
+        assert partitions[key_range['partition']][-1] == key_range['maximum']
+    assert sum(key_range['records'] for key_range in key_ranges) == 5010
+
+
+if __name__ == "__main__":
+    test_sorted_writer_and_merge()
+
+    print('okay')
@@ -0,0 +1,51 @@
+"""
+Partition Compactor
+
+Rewrites a day's partitions into partitions of the target size.
+"""
+import argparse
+import sys
+import os
+sys.path.insert(1, os.path.join(sys.path[0], '../..'))
+from dateutil import parser
+from gva.data.writers import compact_partitions, FileWriter, GoogleCloudStorageWriter, MinIoWriter
+
+
+def get_target_parameters(target):
+    if target == 'minio':
+        return {
+            "inner_writer": MinIoWriter,
+            "end_point": os.getenv('MINIO_END_POINT'),
+            "access_key": os.getenv('MINIO_ACCESS_KEY'),
+            "secret_key": os.getenv('MINIO_SECRET_KEY'),
+            "secure": False}
+    if target == 'gcs':
+        return {
+            "inner_writer": GoogleCloudStorageWriter,
+            "project": os.getenv('GCP_PROJECT')}
+    return {"inner_writer": FileWriter}
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Compact small partitions into target-size partitions')
+    arguments.add_argument('-to_path', required=True, help='the path the partitions were written to')
+    arguments.add_argument('-date', help='the date to compact, the default is today')
+    arguments.add_argument('-target', choices=['file', 'gcs', 'minio'], default='file')
+    arguments.add_argument('-partition_size', type=int, default=32*1024*1024)
+    arguments.add_argument('-minimum_size', type=int, help='partitions of at least this size are not rewritten, the default is half the partition_size')
+    arguments.add_argument('-workers', type=int, default=4)
+    arguments.add_argument('-compress', action='store_true')
+    args = arguments.parse_args()
+
+    summaries = compact_partitions(
+            to_path=args.to_path,
+            date=parser.parse(args.date, yearfirst=True) if args.date else None,
+            partition_size=args.partition_size,
+            minimum_size=args.minimum_size,
+            workers=args.workers,
+            compress=args.compress,
+            **get_target_parameters(args.target))
+
+    for summary in summaries:
+        print(summary['partition'], summary['records'])
+    print('complete')
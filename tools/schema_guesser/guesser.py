@@ -1,35 +1,27 @@
 """
 Schema Guesser
 
-Reads through a dataset to 'guess' the schema.
+Reads through a dataset to 'guess' the schema, see
+gva.data.validator.infer_schema.
 
-Current implementation only lists all the values in a set of fields to
-work out the set of symbols for an enumerated type.
+usage: python guesser.py <from_path> [<project>] [<sample fraction>]
 """
-from gva.data import Reader
-from gva.data.formats import dictset
+import sys
 import json
+from gva.data import Reader
+from gva.data.validator import infer_schema
+
+if __name__ == "__main__":
 
-reader = Reader(
-        project='dcsgva-da-prd',
-        from_path='dcsgva-da-prd-ai-notebook/02_INTERMEDIATE/VIEWS/NVD_CVE_SUMMARY/%datefolders/')
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
 
-values = {}
+    reader = Reader(
+            from_path=sys.argv[1],
+            project=sys.argv[2] if len(sys.argv) > 2 else None)
+    sample = float(sys.argv[3]) if len(sys.argv) > 3 else None
 
-for record in reader:
-    
-    for k,v in record.items():
-        
-        if k not in ['CVE', 'CWE', 'publishedDate', 'Description', 'v2.0:vectorString', 'v2.0:baseScore', 'v2.0:exploitabilityScore', 'v2.0:impactScore', 'v3.0:vectorString', 'v3.0:baseScore', 'v3.0:exploitabilityScore', 'v3.0:impactScore']:
-    
-            e = values.get(k, [])
-            if not v in e:
-                e.append(v)
-                values[k] = e
-    
-schema = []
-for k, v in values.items():
-    row = { 'name': k, 'type': 'enum', 'symbols': v }
-    schema.append(row)
+    schema = infer_schema(reader, sample=sample)
 
-print(json.dumps(schema, sort_keys=False, indent=4))
\ No newline at end of file
+    print(json.dumps(schema, sort_keys=False, indent=4, default=str))